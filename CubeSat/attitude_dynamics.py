@@ -0,0 +1,353 @@
+import time
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# Earth / orbit constants
+MU_EARTH = 3.986004418e14      # Gravitational parameter (m³/s²)
+R_EARTH = 6.371e6              # Mean Earth radius (m)
+OMEGA_EARTH = 7.2921159e-5     # Earth rotation rate (rad/s)
+B0 = 3.12e-5                   # Dipole field strength at the equator, surface (T)
+DIPOLE_TILT = np.radians(9.4)  # Geomagnetic dipole tilt from the spin axis (IGRF-lite)
+
+# 3U CubeSat: 4 kg, 0.1 x 0.1 x 0.34 m, uniform density, long axis = body z
+CUBESAT_MASS = 4.0
+CUBESAT_SIZE = (0.1, 0.1, 0.34)
+M_MAX = 0.2                    # Magnetorquer dipole per axis at |action| = 1 (A·m²)
+
+
+def box_inertia(mass=CUBESAT_MASS, size=CUBESAT_SIZE):
+    """Diagonal inertia tensor (kg·m²) of a uniform box."""
+    x, y, z = size
+    return np.diag([mass * (y**2 + z**2) / 12, mass * (x**2 + z**2) / 12, mass * (x**2 + y**2) / 12])
+
+
+INERTIA_3U = box_inertia()
+
+
+# ============================================================
+# VECTORIZED HELPERS (rows = environments)
+# ============================================================
+def _cross(a, b):
+    out = np.empty((len(a), 3))
+    out[:, 0] = a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1]
+    out[:, 1] = a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2]
+    out[:, 2] = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    return out
+
+
+def _to_body(q, v):
+    """Rotate inertial vectors into the body frame (q = body→inertial, scalar first)."""
+    qv = -q[:, 1:]
+    t = 2.0 * _cross(qv, v)
+    return v + q[:, :1] * t + _cross(qv, t)
+
+
+def dipole_field(r, t):
+    """Tilted dipole field (T) at inertial positions r (N, 3) and times t (N,) s."""
+    lon = OMEGA_EARTH * t
+    # Dipole moment points to the southern geomagnetic pole, rotating with the Earth
+    m_hat = np.stack([
+        np.sin(DIPOLE_TILT) * np.cos(lon),
+        np.sin(DIPOLE_TILT) * np.sin(lon),
+        np.full_like(lon, np.cos(DIPOLE_TILT)),
+    ], axis=1) * -1.0
+    r_norm = np.linalg.norm(r, axis=1, keepdims=True)
+    r_hat = r / r_norm
+    dot = np.sum(m_hat * r_hat, axis=1, keepdims=True)
+    return B0 * (R_EARTH / r_norm) ** 3 * (3.0 * dot * r_hat - m_hat)
+
+
+def circular_orbit(t, radius, inclination, raan, u0):
+    """Inertial position (N, 3) on a circular orbit at times t (N,)."""
+    u = u0 + np.sqrt(MU_EARTH / radius**3) * t
+    cu, su = np.cos(u), np.sin(u)
+    cO, sO = np.cos(raan), np.sin(raan)
+    ci, si = np.cos(inclination), np.sin(inclination)
+    return radius * np.stack([cu * cO - su * ci * sO, cu * sO + su * ci * cO, su * si], axis=1)
+
+
+# ============================================================
+# RK4 KERNELS
+# ============================================================
+def _derivatives(q, w, B_i, dipole, r_i, I, I_inv, gg_gain):
+    B_b = _to_body(q, B_i)
+    torque = _cross(dipole, B_b)
+    Iw = w @ I
+    if gg_gain:
+        r_b = _to_body(q, r_i)
+        torque += gg_gain * _cross(r_b, r_b @ I)
+    w_dot = (torque - _cross(w, Iw)) @ I_inv
+
+    # q̇ = ½ q ⊗ [0, ω]
+    q_dot = np.empty_like(q)
+    q_dot[:, 0] = -0.5 * np.sum(q[:, 1:] * w, axis=1)
+    q_dot[:, 1:] = 0.5 * (q[:, :1] * w + _cross(q[:, 1:], w))
+    return q_dot, w_dot
+
+
+def rk4_numpy(q, w, B_i, dipole, r_i, I, I_inv, gg_gain, h, substeps):
+    for _ in range(substeps):
+        k1q, k1w = _derivatives(q, w, B_i, dipole, r_i, I, I_inv, gg_gain)
+        k2q, k2w = _derivatives(q + 0.5 * h * k1q, w + 0.5 * h * k1w, B_i, dipole, r_i, I, I_inv, gg_gain)
+        k3q, k3w = _derivatives(q + 0.5 * h * k2q, w + 0.5 * h * k2w, B_i, dipole, r_i, I, I_inv, gg_gain)
+        k4q, k4w = _derivatives(q + h * k3q, w + h * k3w, B_i, dipole, r_i, I, I_inv, gg_gain)
+        q = q + h / 6.0 * (k1q + 2 * k2q + 2 * k3q + k4q)
+        w = w + h / 6.0 * (k1w + 2 * k2w + 2 * k3w + k4w)
+        q /= np.linalg.norm(q, axis=1, keepdims=True)
+    return q, w
+
+
+def _build_numba_kernel():
+    """Same RK4 loop written in scalars, one environment at a time, compiled with Numba."""
+    njit = numba.njit(cache=True, fastmath=True)
+
+    @njit
+    def to_body(q0, q1, q2, q3, vx, vy, vz):
+        # conjugate rotation: qv → -qv
+        tx = 2.0 * (-q2 * vz + q3 * vy)
+        ty = 2.0 * (-q3 * vx + q1 * vz)
+        tz = 2.0 * (-q1 * vy + q2 * vx)
+        return (vx + q0 * tx - q2 * tz + q3 * ty,
+                vy + q0 * ty - q3 * tx + q1 * tz,
+                vz + q0 * tz - q1 * ty + q2 * tx)
+
+    @njit
+    def derivatives(q0, q1, q2, q3, wx, wy, wz, B, d, r, I, I_inv, gg_gain):
+        bx, by, bz = to_body(q0, q1, q2, q3, B[0], B[1], B[2])
+        tx = d[1] * bz - d[2] * by
+        ty = d[2] * bx - d[0] * bz
+        tz = d[0] * by - d[1] * bx
+        if gg_gain != 0.0:
+            rx, ry, rz = to_body(q0, q1, q2, q3, r[0], r[1], r[2])
+            irx = I[0, 0] * rx + I[0, 1] * ry + I[0, 2] * rz
+            iry = I[1, 0] * rx + I[1, 1] * ry + I[1, 2] * rz
+            irz = I[2, 0] * rx + I[2, 1] * ry + I[2, 2] * rz
+            tx += gg_gain * (ry * irz - rz * iry)
+            ty += gg_gain * (rz * irx - rx * irz)
+            tz += gg_gain * (rx * iry - ry * irx)
+        hx = I[0, 0] * wx + I[0, 1] * wy + I[0, 2] * wz
+        hy = I[1, 0] * wx + I[1, 1] * wy + I[1, 2] * wz
+        hz = I[2, 0] * wx + I[2, 1] * wy + I[2, 2] * wz
+        ex = tx - (wy * hz - wz * hy)
+        ey = ty - (wz * hx - wx * hz)
+        ez = tz - (wx * hy - wy * hx)
+        return (
+            -0.5 * (q1 * wx + q2 * wy + q3 * wz),
+            0.5 * (q0 * wx + q2 * wz - q3 * wy),
+            0.5 * (q0 * wy + q3 * wx - q1 * wz),
+            0.5 * (q0 * wz + q1 * wy - q2 * wx),
+            I_inv[0, 0] * ex + I_inv[0, 1] * ey + I_inv[0, 2] * ez,
+            I_inv[1, 0] * ex + I_inv[1, 1] * ey + I_inv[1, 2] * ez,
+            I_inv[2, 0] * ex + I_inv[2, 1] * ey + I_inv[2, 2] * ez,
+        )
+
+    @njit
+    def rk4(q, w, B_i, dipole, r_i, I, I_inv, gg_gain, h, substeps):
+        q_out = np.empty_like(q)
+        w_out = np.empty_like(w)
+        for n in range(q.shape[0]):
+            x = (q[n, 0], q[n, 1], q[n, 2], q[n, 3], w[n, 0], w[n, 1], w[n, 2])
+            B, d, r = B_i[n], dipole[n], r_i[n]
+            for _ in range(substeps):
+                k1 = derivatives(*x, B, d, r, I, I_inv, gg_gain)
+                x2 = (x[0] + 0.5 * h * k1[0], x[1] + 0.5 * h * k1[1], x[2] + 0.5 * h * k1[2], x[3] + 0.5 * h * k1[3],
+                      x[4] + 0.5 * h * k1[4], x[5] + 0.5 * h * k1[5], x[6] + 0.5 * h * k1[6])
+                k2 = derivatives(*x2, B, d, r, I, I_inv, gg_gain)
+                x3 = (x[0] + 0.5 * h * k2[0], x[1] + 0.5 * h * k2[1], x[2] + 0.5 * h * k2[2], x[3] + 0.5 * h * k2[3],
+                      x[4] + 0.5 * h * k2[4], x[5] + 0.5 * h * k2[5], x[6] + 0.5 * h * k2[6])
+                k3 = derivatives(*x3, B, d, r, I, I_inv, gg_gain)
+                x4 = (x[0] + h * k3[0], x[1] + h * k3[1], x[2] + h * k3[2], x[3] + h * k3[3],
+                      x[4] + h * k3[4], x[5] + h * k3[5], x[6] + h * k3[6])
+                k4 = derivatives(*x4, B, d, r, I, I_inv, gg_gain)
+                q0 = x[0] + h / 6.0 * (k1[0] + 2 * k2[0] + 2 * k3[0] + k4[0])
+                q1 = x[1] + h / 6.0 * (k1[1] + 2 * k2[1] + 2 * k3[1] + k4[1])
+                q2 = x[2] + h / 6.0 * (k1[2] + 2 * k2[2] + 2 * k3[2] + k4[2])
+                q3 = x[3] + h / 6.0 * (k1[3] + 2 * k2[3] + 2 * k3[3] + k4[3])
+                norm = np.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+                x = (q0 / norm, q1 / norm, q2 / norm, q3 / norm,
+                     x[4] + h / 6.0 * (k1[4] + 2 * k2[4] + 2 * k3[4] + k4[4]),
+                     x[5] + h / 6.0 * (k1[5] + 2 * k2[5] + 2 * k3[5] + k4[5]),
+                     x[6] + h / 6.0 * (k1[6] + 2 * k2[6] + 2 * k3[6] + k4[6]))
+            q_out[n, 0], q_out[n, 1], q_out[n, 2], q_out[n, 3] = x[0], x[1], x[2], x[3]
+            w_out[n, 0], w_out[n, 1], w_out[n, 2] = x[4], x[5], x[6]
+        return q_out, w_out
+
+    return rk4
+
+
+_numba_rk4 = None
+
+
+def _get_numba_kernel():
+    global _numba_rk4
+    if _numba_rk4 is None:
+        _numba_rk4 = _build_numba_kernel()
+    return _numba_rk4
+
+
+# ============================================================
+# RIGID-BODY DYNAMICS FOR CubeSatBatchSim
+# ============================================================
+class RigidBodyDynamics:
+    """
+    Rigid-body attitude dynamics for N CubeSats, plugged into CubeSatBatchSim.
+
+        I ω̇ = m × B_body (+ gravity gradient) − ω × Iω,    q̇ = ½ q ⊗ [0, ω]
+
+    m = action · m_max is the magnetorquer dipole (A·m²) and B comes from a tilted
+    dipole evaluated along a circular orbit (one orbit phase per environment).
+    Each control step (dt) is integrated with `substeps` fixed RK4 steps, all
+    environments at once; B_inertial and the orbit position are held over dt.
+
+    Observation stays [ωx, ωy, ωz, Bx, By, Bz]: ω in rad/s and the body-frame field
+    divided by its largest possible magnitude at the orbit radius (2·B0·(R_E/r)³).
+
+    use_numba=None compiles the RK4 loop with Numba when it is installed.
+    """
+
+    def __init__(self, num_envs, inertia=INERTIA_3U, m_max=M_MAX, dt=1.0, substeps=4,
+                 max_steps=2000, altitude=500e3, inclination=np.radians(51.6),
+                 omega_range=0.2, gravity_gradient=True, field_noise=0.0, use_numba=None):
+        self.num_envs = num_envs
+        self.I = np.asarray(inertia, dtype=np.float64)
+        if self.I.ndim == 1:
+            self.I = np.diag(self.I)
+        self.I_inv = np.linalg.inv(self.I)
+        self.m_max = m_max
+        self.dt = dt
+        self.substeps = substeps
+        self.max_steps = max_steps
+        self.radius = R_EARTH + altitude
+        self.inclination = inclination
+        self.omega_range = omega_range
+        # τ_gg = 3μ/r³ · r̂ × (I r̂), applied to the unit position vector _r_i
+        self.gg_gain = 3.0 * MU_EARTH / self.radius**3 if gravity_gradient else 0.0
+        self.field_noise = field_noise
+        self.B_scale = 2.0 * B0 * (R_EARTH / self.radius) ** 3
+
+        if use_numba is None:
+            use_numba = numba is not None
+        if use_numba and numba is None:
+            raise ImportError("use_numba=True requires numba (pip install numba)")
+        self.integrate = _get_numba_kernel() if use_numba else rk4_numpy
+
+        self.q = np.tile([1.0, 0.0, 0.0, 0.0], (num_envs, 1))
+        self.w = np.zeros((num_envs, 3))
+        self.t = np.zeros(num_envs)
+        self.raan = np.zeros(num_envs)
+        self.u0 = np.zeros(num_envs)
+        self.state = np.zeros((num_envs, 6), dtype=np.float32)
+        self._B_i = np.zeros((num_envs, 3))
+        self._r_i = np.zeros((num_envs, 3))
+
+    @property
+    def omega(self):
+        return self.state[:, :3]
+
+    def observation(self):
+        return self.state
+
+    def reset(self, idx, rng):
+        n = len(idx)
+        q = rng.normal(size=(n, 4))
+        self.q[idx] = q / np.linalg.norm(q, axis=1, keepdims=True)
+        self.w[idx] = rng.uniform(-self.omega_range, self.omega_range, (n, 3))
+        self.t[idx] = rng.uniform(0, 86400.0, n)
+        self.raan[idx] = rng.uniform(0, 2 * np.pi, n)
+        self.u0[idx] = rng.uniform(0, 2 * np.pi, n)
+        self._update_environment(idx)
+        self._observe(idx, rng)
+
+    def set_omega(self, idx, omega):
+        """Override the initial body rates (rad/s), e.g. for Monte Carlo campaigns."""
+        self.w[idx] = omega
+        self.state[idx, :3] = omega
+
+    def step(self, actions, rng):
+        dipole = np.asarray(actions, dtype=np.float64) * self.m_max
+        self.q, self.w = self.integrate(
+            self.q, self.w, self._B_i, dipole, self._r_i,
+            self.I, self.I_inv, self.gg_gain, self.dt / self.substeps, self.substeps,
+        )
+        self.t += self.dt
+        self._update_environment(slice(None))
+        self._observe(slice(None), rng)
+
+    def _update_environment(self, idx):
+        r = circular_orbit(self.t[idx], self.radius, self.inclination, self.raan[idx], self.u0[idx])
+        self._r_i[idx] = r / self.radius
+        self._B_i[idx] = dipole_field(r, self.t[idx])
+
+    def _observe(self, idx, rng):
+        B_b = _to_body(self.q[idx], self._B_i[idx]) / self.B_scale
+        if self.field_noise:
+            B_b = B_b + rng.normal(0, self.field_noise, B_b.shape)
+        self.state[idx, :3] = self.w[idx]
+        self.state[idx, 3:] = B_b
+
+
+# ============================================================
+# BENCHMARK: env-steps/s on one core
+# ============================================================
+if __name__ == "__main__":
+    from cubesat_env import CubeSatBatchSim
+
+    rng = np.random.default_rng(0)
+    backends = [("NumPy", False)] + ([("Numba", True)] if numba is not None else [])
+    for name, use_numba in backends:
+        print(f"⏱️ RigidBodyDynamics ({name}, RK4 × 4 substeps), physics-only reward")
+        for n in (1, 64, 1024):
+            sim = CubeSatBatchSim(n, seed=0, dynamics=RigidBodyDynamics(n, use_numba=use_numba))
+            sim.reset()
+            sim.step(np.zeros((n, 3), dtype=np.float32))  # JIT warm-up
+            n_steps = min(2000, max(20, 50000 // n))
+            actions = rng.uniform(-1, 1, (n_steps, n, 3)).astype(np.float32)
+            t0 = time.perf_counter()
+            for k in range(n_steps):
+                sim.step(actions[k])
+            sps = n_steps * n / (time.perf_counter() - t0)
+            status = "✅" if sps >= 100_000 else "  "
+            print(f"  {status} N={n:5d}: {sps:12,.0f} env-steps/s")
+
+    # Numba kernel parity against the NumPy kernel
+    if numba is not None:
+        dyn = RigidBodyDynamics(256, use_numba=False)
+        dyn.reset(np.arange(256), rng)
+        args = (dyn.q, dyn.w, dyn._B_i, rng.uniform(-M_MAX, M_MAX, (256, 3)), dyn._r_i,
+                dyn.I, dyn.I_inv, dyn.gg_gain, 0.25, 4)
+        (q_np, w_np), (q_nb, w_nb) = rk4_numpy(*args), _get_numba_kernel()(*args)
+        print(f"🔎 Numba vs NumPy: max |Δq| = {np.abs(q_np - q_nb).max():.1e}, max |Δω| = {np.abs(w_np - w_nb).max():.1e}")
+
+    # Gravity-gradient torque against the analytic 3μ/r³ · r̂_b × (I r̂_b), r̂_b from the rotation matrix
+    dyn = RigidBodyDynamics(8, use_numba=False)
+    dyn.reset(np.arange(8), rng)
+    q0, q1, q2, q3 = dyn.q.T
+    R = np.stack([  # body → inertial
+        np.stack([1 - 2 * (q2**2 + q3**2), 2 * (q1 * q2 - q0 * q3), 2 * (q1 * q3 + q0 * q2)], axis=1),
+        np.stack([2 * (q1 * q2 + q0 * q3), 1 - 2 * (q1**2 + q3**2), 2 * (q2 * q3 - q0 * q1)], axis=1),
+        np.stack([2 * (q1 * q3 - q0 * q2), 2 * (q2 * q3 + q0 * q1), 1 - 2 * (q1**2 + q2**2)], axis=1),
+    ], axis=1)
+    r_b = np.einsum("nji,nj->ni", R, dyn._r_i)
+    expected = 3 * MU_EARTH / dyn.radius**3 * np.cross(r_b, r_b @ dyn.I)
+    _, w_dot = _derivatives(dyn.q, np.zeros((8, 3)), np.zeros((8, 3)), np.zeros((8, 3)), dyn._r_i,
+                            dyn.I, dyn.I_inv, dyn.gg_gain)
+    torque = w_dot @ dyn.I
+    print(f"🔎 gravity gradient: |τ| up to {np.linalg.norm(torque, axis=1).max():.2e} N·m, "
+          f"max rel. error vs analytic {np.abs(torque - expected).max() / np.abs(expected).max():.1e}")
+
+    # Sanity: torque-free, field-free spin conserves kinetic energy and |H|
+    dyn = RigidBodyDynamics(1, gravity_gradient=False, use_numba=False)
+    dyn.reset(np.arange(1), rng)
+    dyn._B_i[:] = 0.0
+    w0 = dyn.w.copy()
+    H0, T0 = np.linalg.norm(w0 @ dyn.I), 0.5 * np.sum((w0 @ dyn.I) * w0)
+    q, w = dyn.q, dyn.w
+    for _ in range(1000):
+        q, w = rk4_numpy(q, w, dyn._B_i, np.zeros((1, 3)), dyn._r_i, dyn.I, dyn.I_inv, 0.0, 0.25, 4)
+    H1, T1 = np.linalg.norm(w @ dyn.I), 0.5 * np.sum((w @ dyn.I) * w)
+    print(f"🔎 free spin over 1000 s: ΔH/H = {abs(H1 - H0) / H0:.1e}, ΔT/T = {abs(T1 - T0) / T0:.1e}")
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from cubesat_env import CubeSatBatchSim, load_detector
+from fast_detector import DETECTOR_PATH
+from policy_runtime import BASE_DIR, ACTOR_PATH, load_policy
+
+CACHE_DIR = os.path.join(BASE_DIR, "campaign_cache")
+# Simulator code behind every cached episode: a change to any of them invalidates the cache
+SIMULATOR_SOURCES = ["campaign.py", "cubesat_env.py", "attitude_dynamics.py", "fast_detector.py", "policy_runtime.py"]
+PERCENTILES = (5, 25, 50, 75, 95)
+METRICS = ["reward", "length", "final_speed", "control_effort", "stabilized"]
+
+
+# ============================================================
+# POLICY LOADING + HASHING
+# ============================================================
+def policy_hash(policy_path):
+    """sha256 of a weights file (policy, detector): results are cached per exact set of weights."""
+    h = hashlib.sha256()
+    with open(policy_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def simulator_digest(sources=SIMULATOR_SOURCES):
+    """sha256 over the simulator source files (dynamics, env, detector, policy runtime)."""
+    h = hashlib.sha256()
+    for name in sources:
+        with open(os.path.join(BASE_DIR, name), "rb") as f:
+            h.update(name.encode() + b"\0" + f.read())
+    return h.hexdigest()[:16]
+
+
+def load_campaign_policy(policy_path):
+    """Batched policy callable (N, 6) → (N, 3) from an exported .npz actor or an SB3 .zip."""
+    if policy_path.endswith(".npz"):
+        return load_policy(policy_path)
+    from stable_baselines3 import SAC
+    model = SAC.load(policy_path, device="cpu")
+    return lambda obs: model.predict(obs, deterministic=True)[0]
+
+
+def make_dynamics(name, num_envs):
+    if name == "toy":
+        return None  # CubeSatBatchSim default (LinearDampingDynamics)
+    if name == "rigid":
+        from attitude_dynamics import RigidBodyDynamics
+        return RigidBodyDynamics(num_envs)
+    raise ValueError(f"Unknown dynamics: {name}")
+
+
+# ============================================================
+# ONE BATCH OF EPISODES (one scenario seed)
+# ============================================================
+def run_episode_batch(policy, seed, n_episodes, dynamics="toy", tumble_range=(0.05, 0.5),
+                      detector=None):
+    """
+    Run `n_episodes` episodes side by side until each one terminates or truncates.
+
+    The scenario seed fixes every initial condition: tumble rate drawn uniformly in
+    `tumble_range` (rad/s) along a random axis, field orientation and sim noise.
+    Returns a dict of per-episode metric arrays.
+    """
+    sim = CubeSatBatchSim(n_episodes, detector, seed, make_dynamics(dynamics, n_episodes))
+    sim.reset()
+    rng = np.random.default_rng([seed, 1])
+    axis = rng.normal(size=(n_episodes, 3))
+    axis /= np.linalg.norm(axis, axis=1, keepdims=True)
+    sim.dynamics.set_omega(np.arange(n_episodes), axis * rng.uniform(*tumble_range, (n_episodes, 1)))
+    obs = sim.state
+
+    reward = np.zeros(n_episodes)
+    control_effort = np.zeros(n_episodes)  # Σ ||action||² over the episode
+    length = np.zeros(n_episodes, dtype=np.int64)
+    final_speed = np.linalg.norm(obs[:, :3], axis=1).astype(np.float64)
+    stabilized = np.zeros(n_episodes, dtype=bool)
+    active = np.ones(n_episodes, dtype=bool)
+
+    # Finished episodes keep stepping with the batch; their metrics are frozen by `active`
+    while active.any():
+        actions = np.asarray(policy(obs), dtype=np.float32)
+        obs, r, terminated, truncated, speed, _ = sim.step(actions)
+        reward[active] += r[active]
+        control_effort[active] += np.einsum("ij,ij->i", actions, actions)[active]
+        length[active] += 1
+        final_speed[active] = speed[active]
+        stabilized[active] = terminated[active]
+        active &= ~(terminated | truncated)
+
+    return {"reward": reward, "length": length, "final_speed": final_speed,
+            "control_effort": control_effort, "stabilized": stabilized}
+
+
+def _worker(args):
+    policy_path, seed, n_episodes, config, cache_path = args
+    detector = load_detector() if config["use_detector"] else None
+    result = run_episode_batch(load_campaign_policy(policy_path), seed, n_episodes,
+                               config["dynamics"], tuple(config["tumble_range"]), detector)
+    # Write then rename so an interrupted run never leaves a truncated cache entry
+    tmp_path = cache_path[:-len(".npz")] + ".tmp.npz"
+    np.savez(tmp_path, seed=np.full(n_episodes, seed), **result)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+# ============================================================
+# CAMPAIGN RUNNER
+# ============================================================
+def run_campaign(policy_path=ACTOR_PATH, n_batches=32, episodes_per_batch=64, base_seed=0,
+                 dynamics="toy", tumble_range=(0.05, 0.5), use_detector=False,
+                 max_workers=None, cache_dir=CACHE_DIR):
+    """
+    Monte Carlo detumbling campaign: n_batches scenario seeds × episodes_per_batch episodes.
+
+    Each batch is cached as campaign_cache/<policy hash>/<config hash>/seed_<k>.npz, so a
+    rerun (or a larger n_batches) only simulates the seeds that are missing. The config
+    hash covers the simulator sources, and the detector weights when use_detector is set:
+    editing the dynamics or retraining the detector re-simulates everything. Missing batches
+    are spread over a process pool (max_workers=0 runs them in this process).
+    Returns a DataFrame with one row per episode.
+    """
+    config = {"dynamics": dynamics, "tumble_range": list(tumble_range), "use_detector": use_detector,
+              "episodes_per_batch": episodes_per_batch}
+    keyed = {**config, "simulator": simulator_digest()}
+    if use_detector:
+        keyed["detector"] = policy_hash(DETECTOR_PATH)
+    config_key = hashlib.sha256(json.dumps(keyed, sort_keys=True).encode()).hexdigest()[:12]
+    out_dir = os.path.join(cache_dir, policy_hash(policy_path), config_key)
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "config.json"), "w") as f:
+        json.dump(keyed, f, indent=2)
+
+    seeds = [base_seed + k for k in range(n_batches)]
+    paths = {s: os.path.join(out_dir, f"seed_{s}.npz") for s in seeds}
+    missing = [(policy_path, s, episodes_per_batch, config, paths[s]) for s in seeds if not os.path.exists(paths[s])]
+
+    if missing:
+        if max_workers == 0:
+            for job in missing:
+                _worker(job)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                list(pool.map(_worker, missing))
+
+    frames = []
+    for s in seeds:
+        with np.load(paths[s]) as f:
+            frames.append(pd.DataFrame({k: f[k] for k in ["seed"] + METRICS}))
+    results = pd.concat(frames, ignore_index=True)
+    results.attrs["simulated_batches"] = len(missing)
+    return results
+
+
+def percentile_table(results, percentiles=PERCENTILES):
+    """Mean and percentiles of every metric (rows) across episodes."""
+    values = results[METRICS].astype(float)
+    table = pd.DataFrame({"mean": values.mean()})
+    for p in percentiles:
+        table[f"p{p}"] = values.quantile(p / 100)
+    table["max"] = values.max()
+    return table
+
+
+# ============================================================
+# EXAMPLE CAMPAIGN
+# ============================================================
+if __name__ == "__main__":
+    n_batches, episodes_per_batch = 32, 64
+
+    t0 = time.perf_counter()
+    results = run_campaign(n_batches=n_batches, episodes_per_batch=episodes_per_batch)
+    first = time.perf_counter() - t0
+    print(f"🚀 {len(results):,} episodes ({results.attrs['simulated_batches']} batches simulated) in {first:.2f} s")
+
+    t0 = time.perf_counter()
+    results = run_campaign(n_batches=n_batches * 2, episodes_per_batch=episodes_per_batch)
+    second = time.perf_counter() - t0
+    print(f"♻️ {len(results):,} episodes ({results.attrs['simulated_batches']} new batches, rest cached) in {second:.2f} s")
+
+    print("\n📊 Detumbling campaign (toy dynamics, physics-only reward):")
+    print(percentile_table(results).round(4).to_string())
+    print(f"\n✅ Stabilized: {results['stabilized'].mean() * 100:.1f}% of episodes")
+
+    # Serial notebook-style evaluation for comparison (one env, one episode at a time)
+    from cubesat_env import CubeSatEnv
+    policy = load_policy()
+    env = CubeSatEnv(use_detector=False)
+    n_serial = 100
+    t0 = time.perf_counter()
+    for _ in range(n_serial):
+        obs, _ = env.reset()
+        done = False
+        while not done:
+            obs, reward, terminated, truncated, info = env.step(policy(obs))
+            done = terminated or truncated
+    serial = (time.perf_counter() - t0) / n_serial
+    print(f"🐢 Serial evaluation: {serial * 1e3:.2f} ms/episode vs {first / (n_batches * episodes_per_batch) * 1e3:.3f} ms/episode batched")
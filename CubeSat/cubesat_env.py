@@ -0,0 +1,374 @@
+import os
+import time
+import numpy as np
+import gymnasium as gym
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from fast_detector import DETECTOR_PATH, load_numpy_detector
+
+
+# Physical / episode parameters shared by the scalar and batched environments
+DT = 0.1                 # Time step (s)
+LAMBDA_ENERGY = 0.01     # Energy consumption weight
+MAX_STEPS = 200          # Max steps to avoid infinite episodes
+DAMPING = 0.1
+CONTROL_GAIN = 0.05
+STABLE_SPEED = 0.05      # rad/s, full stabilization
+STABLE_PREDICTION = 0.1  # detector probability below which the CubeSat is considered stable
+
+
+def load_detector(model_path=DETECTOR_PATH, backend="numpy"):
+    """
+    Load the tumbling detector trained in cubesat.ipynb (None if missing).
+
+    backend="numpy" extracts the Dense weights into a NumpyDetector (no TensorFlow,
+    batched, same outputs within float32 tolerance); backend="keras" loads the Keras model.
+    """
+    if not os.path.exists(model_path):
+        print(f"⚠️ Warning: model not found at path: {model_path}")
+        print("💡 Please train the model first in cubesat.ipynb")
+        return None
+    if backend == "numpy":
+        return load_numpy_detector(model_path)
+    from tensorflow import keras
+    return keras.models.load_model(model_path)
+
+
+def _observation_space():
+    # Observation space: [ωx, ωy, ωz, Bx, By, Bz]
+    return spaces.Box(low=-1.0, high=1.0, shape=(6,), dtype=np.float32)
+
+
+def _action_space():
+    # Action space: [ux, uy, uz] (control torques)
+    return spaces.Box(low=-1.0, high=1.0, shape=(3,), dtype=np.float32)
+
+
+# ============================================================
+# SCALAR ENVIRONMENT (same as rl-cubesat.ipynb)
+# ============================================================
+class CubeSatEnv(gym.Env):
+    """
+    Simulation environment for controlling CubeSat attitude using magnetic torques.
+
+    Observation:
+        - ωx, ωy, ωz: Angular velocity (rad/s)
+        - Bx, By, Bz: Magnetic field (normalized)
+
+    Actions:
+        - ux, uy, uz: Control torques (normalized)
+    """
+
+    def __init__(self, use_detector=True, detector=None):
+        super(CubeSatEnv, self).__init__()
+        self.observation_space = _observation_space()
+        self.action_space = _action_space()
+
+        self.dt = DT
+        self.lambda_energy = LAMBDA_ENERGY
+        self.max_steps = MAX_STEPS
+        self.current_step = 0
+        self.state = np.zeros(6, dtype=np.float32)
+
+        if use_detector and detector is None:
+            detector = load_detector()
+        self.detector = detector
+        self.use_detector = use_detector and (detector is not None)
+        if not self.use_detector:
+            print("⚠️ Environment running without detector model (physics-based reward only)")
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        # Random initialization of angular velocity (simulate tumbling)
+        ω = np.random.uniform(-0.5, 0.5, 3)
+
+        # Initialize magnetic field
+        B = np.random.uniform(-1.0, 1.0, 3)
+        B = B / (np.linalg.norm(B) + 1e-8)
+
+        self.state = np.concatenate([ω, B]).astype(np.float32)
+        self.current_step = 0
+        return self.state, {}
+
+    def step(self, action):
+        ω = self.state[:3]
+        B = self.state[3:]
+        action = np.clip(action, -1.0, 1.0)
+
+        # Simplified dynamics simulation: dω/dt = -damping*ω + control_gain*action
+        ω_next = ω + self.dt * (-DAMPING * ω + CONTROL_GAIN * action)
+
+        # Small random change in magnetic field (in reality depends on orbit)
+        B_next = B + np.random.normal(0, 0.01, 3)
+        B_next = np.clip(B_next, -1.0, 1.0)
+
+        self.state = np.concatenate([ω_next, B_next]).astype(np.float32)
+        self.current_step += 1
+
+        # Reduce angular velocity while minimizing energy usage
+        angular_velocity_penalty = np.linalg.norm(ω_next) ** 2
+        energy_penalty = self.lambda_energy * np.linalg.norm(action) ** 2
+        reward_physique = -(angular_velocity_penalty + energy_penalty)
+
+        prediction = 0.0
+        if self.use_detector:
+            try:
+                prediction = self.detector.predict(ω_next.reshape(1, -1), verbose=0)[0][0]
+                reward = reward_physique - 2.0 * prediction
+            except Exception as e:
+                print(f"⚠️ Detector model error: {e}")
+                reward = reward_physique
+        else:
+            reward = reward_physique
+
+        angular_speed = np.linalg.norm(ω_next)
+        terminated = bool(
+            angular_speed < STABLE_SPEED or
+            (self.use_detector and prediction < STABLE_PREDICTION)
+        )
+        truncated = bool(self.current_step >= self.max_steps)
+
+        info = {
+            "prediction": float(prediction),
+            "angular_speed": float(angular_speed),
+            "step": self.current_step
+        }
+        return self.state, float(reward), terminated, truncated, info
+
+    def render(self, mode='human'):
+        ω = self.state[:3]
+        print(f"Step {self.current_step}: ω = [{ω[0]:.3f}, {ω[1]:.3f}, {ω[2]:.3f}], ||ω|| = {np.linalg.norm(ω):.3f}")
+
+
+# ============================================================
+# BATCHED SIMULATION CORE
+# ============================================================
+class LinearDampingDynamics:
+    """
+    Toy model from CubeSatEnv: dω/dt = -damping*ω + control_gain*action and a
+    random-walk magnetic field. Holds the (N, 6) observation state directly.
+    """
+
+    max_steps = MAX_STEPS
+
+    def __init__(self, num_envs):
+        self.num_envs = num_envs
+        self.state = np.zeros((num_envs, 6), dtype=np.float32)
+
+    @property
+    def omega(self):
+        return self.state[:, :3]
+
+    def observation(self):
+        return self.state
+
+    def reset(self, idx, rng):
+        n = len(idx)
+        ω = rng.uniform(-0.5, 0.5, (n, 3))
+        B = rng.uniform(-1.0, 1.0, (n, 3))
+        B = B / (np.linalg.norm(B, axis=1, keepdims=True) + 1e-8)
+        self.state[idx, :3] = ω
+        self.state[idx, 3:] = B
+
+    def set_omega(self, idx, omega):
+        self.state[idx, :3] = omega
+
+    def step(self, actions, rng):
+        ω = self.state[:, :3]
+        B = self.state[:, 3:]
+        ω_next = ω + DT * (-DAMPING * ω + CONTROL_GAIN * actions)
+        B_next = np.clip(B + rng.normal(0, 0.01, B.shape), -1.0, 1.0)
+        self.state[:, :3] = ω_next
+        self.state[:, 3:] = B_next
+
+
+class CubeSatBatchSim:
+    """
+    N CubeSatEnv simulations advanced together as (N, 6) arrays.
+
+    `detector` is any callable mapping (N, 3) angular velocities to (N,) tumbling
+    probabilities, evaluated once per batch step (or None for physics-only reward).
+    `dynamics` advances the attitude state (default: LinearDampingDynamics, the
+    notebook's toy model; see attitude_dynamics.RigidBodyDynamics).
+    """
+
+    def __init__(self, num_envs, detector=None, seed=None, dynamics=None):
+        self.num_envs = num_envs
+        self.detector = detector
+        self.rng = np.random.default_rng(seed)
+        self.dynamics = dynamics if dynamics is not None else LinearDampingDynamics(num_envs)
+        if self.dynamics.num_envs != num_envs:
+            raise ValueError(f"dynamics built for {self.dynamics.num_envs} envs, expected {num_envs}")
+        self.max_steps = self.dynamics.max_steps
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    @property
+    def state(self):
+        return self.dynamics.observation()
+
+    def reset(self, mask=None):
+        """Re-initialize all environments, or only those where `mask` is True."""
+        idx = np.arange(self.num_envs) if mask is None else np.flatnonzero(mask)
+        if len(idx):
+            self.dynamics.reset(idx, self.rng)
+            self.steps[idx] = 0
+        return self.state
+
+    def step(self, actions):
+        actions = np.clip(actions, -1.0, 1.0)
+        self.dynamics.step(actions, self.rng)
+        self.steps += 1
+
+        ω_next = self.dynamics.omega
+        speed_sq = np.einsum("ij,ij->i", ω_next, ω_next, dtype=np.float64)
+        energy = LAMBDA_ENERGY * np.einsum("ij,ij->i", actions, actions, dtype=np.float64)
+        reward = -(speed_sq + energy)
+        angular_speed = np.sqrt(speed_sq)
+
+        if self.detector is not None:
+            prediction = np.asarray(self.detector(ω_next), dtype=np.float64).reshape(-1)
+            reward -= 2.0 * prediction
+            terminated = (angular_speed < STABLE_SPEED) | (prediction < STABLE_PREDICTION)
+        else:
+            prediction = np.zeros(self.num_envs)
+            terminated = angular_speed < STABLE_SPEED
+        truncated = self.steps >= self.max_steps
+        return self.state, reward, terminated, truncated, angular_speed, prediction
+
+
+def keras_batch_detector(model):
+    """Wrap a Keras detector so the whole batch goes through one predict call."""
+    def detect(omega):
+        return model.predict(omega, verbose=0)[:, 0]
+    return detect
+
+
+# ============================================================
+# STABLE-BASELINES3 VEC ENV
+# ============================================================
+class VecCubeSatEnv(VecEnv):
+    """
+    Natively batched CubeSatEnv for stable-baselines3 (drop-in for DummyVecEnv).
+
+    Finished environments are reset individually; their last observation is kept in
+    info["terminal_observation"] and truncation is flagged as "TimeLimit.truncated",
+    as SB3 expects. With detailed_info=False, per-step info dicts are left empty
+    (except on episode end) to save Python overhead at large N.
+    """
+
+    def __init__(self, num_envs, detector=None, seed=None, detailed_info=True, dynamics=None):
+        super().__init__(num_envs, _observation_space(), _action_space())
+        self.sim = CubeSatBatchSim(num_envs, detector, seed, dynamics)
+        self.detailed_info = detailed_info
+        self._actions = None
+
+    def reset(self):
+        seeds = [s for s in self._seeds if s is not None] if getattr(self, "_seeds", None) else []
+        if seeds:
+            self.sim.rng = np.random.default_rng(seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+        return self.sim.reset().copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.float32).reshape(self.num_envs, 3)
+
+    def step_wait(self):
+        state, reward, terminated, truncated, speed, prediction = self.sim.step(self._actions)
+        dones = terminated | truncated
+        steps = self.sim.steps.copy()
+
+        if self.detailed_info:
+            infos = [
+                {"prediction": p, "angular_speed": s, "step": int(k)}
+                for p, s, k in zip(prediction.tolist(), speed.tolist(), steps)
+            ]
+        else:
+            infos = [{} for _ in range(self.num_envs)]
+
+        if dones.any():
+            for i in np.flatnonzero(dones):
+                infos[i]["terminal_observation"] = state[i].copy()
+                infos[i]["TimeLimit.truncated"] = bool(truncated[i] and not terminated[i])
+            self.sim.reset(dones)
+
+        return self.sim.state.copy(), reward.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def _per_env(self, attr_name):
+        value = getattr(self.sim, attr_name)
+        return isinstance(value, np.ndarray) and value.ndim >= 1 and len(value) == self.num_envs
+
+    def get_attr(self, attr_name, indices=None):
+        """Per-env arrays (steps, state…) are indexed; shared attributes are the same for every env."""
+        value = getattr(self.sim, attr_name)
+        if self._per_env(attr_name):
+            return [value[i] for i in self._get_indices(indices)]
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        idx = list(self._get_indices(indices))
+        if self._per_env(attr_name):
+            getattr(self.sim, attr_name)[idx] = value
+        elif len(idx) == self.num_envs:
+            setattr(self.sim, attr_name, value)
+        else:
+            raise NotImplementedError(f"{attr_name} is shared by all envs of the batched simulator")
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """Only "reset" exists per env here: it resets the selected envs and returns (obs, info) for each."""
+        if method_name != "reset":
+            raise NotImplementedError(f"VecCubeSatEnv has no per-env method {method_name!r}")
+        idx = list(self._get_indices(indices))
+        mask = np.zeros(self.num_envs, dtype=bool)
+        mask[idx] = True
+        state = self.sim.reset(mask)
+        return [(state[i].copy(), {}) for i in idx]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+
+# ============================================================
+# BENCHMARK: steps/s vs DummyVecEnv over the scalar env
+# ============================================================
+def _steps_per_second(vec_env, n_steps):
+    vec_env.reset()
+    rng = np.random.default_rng(0)
+    actions = rng.uniform(-1, 1, (n_steps, vec_env.num_envs, 3)).astype(np.float32)
+    t0 = time.perf_counter()
+    for k in range(n_steps):
+        vec_env.step(actions[k])
+    return n_steps * vec_env.num_envs / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    # Physics-only reward so both paths are comparable without TensorFlow
+    print("⏱️ env-steps/s (physics-only reward)")
+    for n in (1, 64, 1024):
+        n_steps = max(20, 20000 // n)
+        dummy = DummyVecEnv([lambda: CubeSatEnv(use_detector=False) for _ in range(n)])
+        batched = VecCubeSatEnv(n, seed=42)
+        lean = VecCubeSatEnv(n, seed=42, detailed_info=False)
+        sps_dummy = _steps_per_second(dummy, n_steps)
+        sps_vec = _steps_per_second(batched, n_steps)
+        sps_lean = _steps_per_second(lean, n_steps)
+        print(f"  N={n:5d}: DummyVecEnv {sps_dummy:12,.0f} | VecCubeSatEnv {sps_vec:12,.0f} "
+              f"| detailed_info=False {sps_lean:12,.0f}  (×{sps_lean / sps_dummy:.0f})")
+
+    # Detector-shaped reward: NumPy detector evaluated once per batch step
+    detector = load_detector()
+    if detector is not None:
+        print("⏱️ env-steps/s (detector reward, NumPy detector)")
+        for n in (1, 64, 1024):
+            n_steps = max(20, 20000 // n)
+            dummy = DummyVecEnv([lambda: CubeSatEnv(detector=detector) for _ in range(n)])
+            lean = VecCubeSatEnv(n, detector=detector, seed=42, detailed_info=False)
+            sps_dummy = _steps_per_second(dummy, n_steps)
+            sps_lean = _steps_per_second(lean, n_steps)
+            print(f"  N={n:5d}: DummyVecEnv {sps_dummy:12,.0f} | VecCubeSatEnv {sps_lean:12,.0f}")
@@ -0,0 +1,153 @@
+import os
+import time
+import tempfile
+import numpy as np
+
+from policy_runtime import BASE_DIR, ACTOR_PATH, DetumblingPolicy, load_policy
+
+POLICY_PATH = os.path.join(BASE_DIR, "sac_cubesat_policy.zip")
+ONNX_PATH = os.path.join(BASE_DIR, "sac_cubesat_actor.onnx")
+
+# torch.nn activation classes the NumPy runtime implements (with its fixed parameters)
+ACTIVATION_NAMES = {"ReLU": "relu", "Tanh": "tanh", "ELU": "elu", "LeakyReLU": "leaky_relu"}
+
+
+# ============================================================
+# READ THE SAC ZIP (torch + SB3 only needed here, not at runtime)
+# ============================================================
+def _activation_name(module):
+    """Runtime name of a latent_pi activation module; raises if the runtime would compute something else."""
+    name = ACTIVATION_NAMES.get(type(module).__name__) if type(module).__module__.startswith("torch.nn") else None
+    if name is None \
+            or (name == "elu" and module.alpha != 1.0) \
+            or (name == "leaky_relu" and module.negative_slope != 0.01):
+        raise ValueError(f"Unsupported actor activation: {module!r} (runtime supports {sorted(ACTIVATION_NAMES)})")
+    return name
+
+
+def read_sac_actor(policy_path=POLICY_PATH):
+    """Extract the deterministic actor (latent_pi layers, mu, action bounds) from an SB3 SAC zip."""
+    from torch import nn
+    from stable_baselines3 import SAC
+
+    actor = SAC.load(policy_path, device="cpu").policy.actor
+    if actor.use_sde:
+        raise ValueError("gSDE actors are not supported (deterministic action is not tanh(mu))")
+
+    # latent_pi is Linear/activation pairs; the runtime applies one activation to every hidden layer
+    weights, biases, activations = [], [], set()
+    for module in actor.latent_pi:
+        if isinstance(module, nn.Linear):
+            weights.append(module.weight.detach().numpy().T.copy())
+            biases.append(module.bias.detach().numpy().copy())
+        else:
+            activations.add(_activation_name(module))
+    if len(activations) > 1:
+        raise ValueError(f"Mixed actor activations are not supported: {sorted(activations)}")
+    weights.append(actor.mu.weight.detach().numpy().T.copy())
+    biases.append(actor.mu.bias.detach().numpy().copy())
+
+    space = actor.action_space
+    return DetumblingPolicy(weights, biases, activations.pop() if activations else "relu",
+                            space.low.astype(np.float32), space.high.astype(np.float32))
+
+
+# ============================================================
+# EXPORTERS
+# ============================================================
+def export_numpy(policy, path=ACTOR_PATH):
+    """Save the actor as a flat .npz (float32 weights, activation, action bounds)."""
+    arrays = {"n_layers": np.int64(len(policy.weights)), "activation": np.array(policy.activation_name)}
+    for i, (W, b) in enumerate(zip(policy.weights, policy.biases)):
+        arrays[f"W{i}"], arrays[f"b{i}"] = W, b
+    np.savez(path, action_low=policy.action_low, action_high=policy.action_high, **arrays)
+    return path
+
+
+def export_onnx(policy, path=ONNX_PATH, opset=17):
+    """Export obs (N, 6) → action (N, 3) as ONNX, for onnxruntime or onboard C runtimes."""
+    import torch
+    from torch import nn
+
+    act = {"relu": nn.ReLU, "tanh": nn.Tanh, "elu": nn.ELU, "leaky_relu": nn.LeakyReLU}[policy.activation_name]
+    layers = []
+    for i, (W, b) in enumerate(zip(policy.weights, policy.biases)):
+        linear = nn.Linear(*W.shape)
+        linear.weight.data = torch.from_numpy(W.T.copy())
+        linear.bias.data = torch.from_numpy(b.copy())
+        layers += [linear, act()] if i < len(policy.weights) - 1 else [linear, nn.Tanh()]
+
+    class Actor(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.net = nn.Sequential(*layers)
+            self.register_buffer("low", torch.from_numpy(policy.action_low))
+            self.register_buffer("high", torch.from_numpy(policy.action_high))
+
+        def forward(self, obs):
+            a = self.low + 0.5 * (self.net(obs) + 1.0) * (self.high - self.low)
+            return torch.clamp(a, self.low, self.high)
+
+    dummy = torch.zeros(1, policy.weights[0].shape[0])
+    torch.onnx.export(
+        Actor().eval(), dummy, path, input_names=["obs"], output_names=["action"],
+        dynamic_axes={"obs": {0: "batch"}, "action": {0: "batch"}}, opset_version=opset, dynamo=False,
+    )
+    return path
+
+
+# ============================================================
+# EXPORT + PARITY TEST AGAINST SB3
+# ============================================================
+if __name__ == "__main__":
+    policy = read_sac_actor()
+    print(f"✅ NumPy actor saved: {export_numpy(policy)}")
+
+    # Import cost of the runtime alone (fresh interpreter)
+    import subprocess
+    import sys
+    cmd = "import time; t0 = time.perf_counter(); import numpy; t1 = time.perf_counter(); " \
+          "import policy_runtime; policy_runtime.load_policy(); t2 = time.perf_counter(); " \
+          "print((t1 - t0) * 1e3, (t2 - t1) * 1e3)"
+    numpy_ms, runtime_ms = map(float, subprocess.check_output([sys.executable, "-c", cmd], cwd=BASE_DIR, text=True).split())
+    print(f"⚡ import policy_runtime + load_policy: {runtime_ms:.1f} ms (+ {numpy_ms:.0f} ms for numpy itself)")
+
+    runtime = load_policy()
+    rng = np.random.default_rng(0)
+    obs = rng.uniform(-1, 1, (10_000, 6)).astype(np.float32)
+
+    t0 = time.perf_counter()
+    from stable_baselines3 import SAC
+    model = SAC.load(POLICY_PATH, device="cpu")
+    print(f"🐢 import stable_baselines3 + SAC.load     : {(time.perf_counter() - t0) * 1e3:.1f} ms")
+
+    ref = model.predict(obs, deterministic=True)[0]
+    diff = np.abs(runtime(obs) - ref).max()
+    single = max(np.abs(runtime(o) - model.predict(o, deterministic=True)[0]).max() for o in obs[:200])
+    print(f"🔎 max |Δaction| vs SAC.predict: batch {diff:.2e}, single obs {single:.2e}")
+    assert diff < 1e-5 and single < 1e-5
+
+    n = 2000
+    t0 = time.perf_counter()
+    for o in obs[:n]:
+        model.predict(o, deterministic=True)
+    sb3_us = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    for o in obs[:n]:
+        runtime(o)
+    np_us = (time.perf_counter() - t0) / n * 1e6
+    print(f"⏱️ per action: SAC.predict {sb3_us:.1f} µs | NumPy runtime {np_us:.1f} µs (×{sb3_us / np_us:.0f})")
+
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        ort = None
+        print("⚠️ onnxruntime not installed — skipping ONNX export check")
+    if ort is not None:
+        # Parity check only: export_onnx(policy) writes sac_cubesat_actor.onnx when it is needed
+        with tempfile.TemporaryDirectory() as tmp:
+            onnx_path = export_onnx(policy, os.path.join(tmp, os.path.basename(ONNX_PATH)))
+            session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        onnx_diff = np.abs(session.run(None, {"obs": obs})[0] - ref).max()
+        print(f"✅ ONNX export matches SAC.predict (max |Δaction| {onnx_diff:.2e})")
+        assert onnx_diff < 1e-5
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import zipfile
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DETECTOR_PATH = os.path.join(BASE_DIR, "model_supervised.keras")
+
+ACTIVATIONS = {
+    "linear": lambda z: z,
+    "relu": lambda z: np.maximum(z, 0.0),
+    "sigmoid": lambda z: 1.0 / (1.0 + np.exp(-z)),
+    "tanh": np.tanh,
+}
+
+
+# ============================================================
+# PURE-NUMPY DENSE DETECTOR
+# ============================================================
+class NumpyDetector:
+    """
+    Forward pass of the Keras tumbling detector (3→16→8→1 Dense MLP) in NumPy.
+
+    Calling it on an (N, 3) array of angular velocities returns N probabilities in
+    one vectorized pass. `predict` mirrors keras.Model.predict so it can replace the
+    Keras model in CubeSatEnv without touching the reward code.
+    """
+
+    def __init__(self, layers):
+        # layers: list of (kernel (in, out), bias (out,), activation name)
+        self.layers = [
+            (np.asarray(W, dtype=np.float32), np.asarray(b, dtype=np.float32), ACTIVATIONS[act])
+            for W, b, act in layers
+        ]
+
+    def __call__(self, x):
+        out = np.asarray(x, dtype=np.float32)
+        if out.ndim == 1:
+            out = out[None, :]
+        for W, b, act in self.layers:
+            out = act(out @ W + b)
+        return out[:, 0]
+
+    def predict(self, x, verbose=0):
+        return self(x)[:, None]
+
+
+def load_numpy_detector(model_path=DETECTOR_PATH):
+    """Read Dense weights straight from the .keras archive (config.json + model.weights.h5), no TensorFlow."""
+    import h5py
+
+    with zipfile.ZipFile(model_path) as archive:
+        config = json.loads(archive.read("config.json"))
+        with archive.open("model.weights.h5") as f, h5py.File(f, "r") as weights:
+            layers = []
+            for layer in config["config"]["layers"]:
+                if layer["class_name"] == "InputLayer":
+                    continue
+                if layer["class_name"] != "Dense":
+                    raise ValueError(f"Unsupported layer type: {layer['class_name']}")
+                name = layer["config"]["name"]
+                vars_ = weights[f"layers/{name}/vars"]
+                W = vars_["0"][()]
+                b = vars_["1"][()] if layer["config"]["use_bias"] else np.zeros(W.shape[1])
+                layers.append((W, b, layer["config"]["activation"]))
+    return NumpyDetector(layers)
+
+
+def from_keras_model(model):
+    """Build a NumpyDetector from an already loaded Keras model."""
+    layers = []
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if not weights:
+            continue
+        W, b = weights if len(weights) == 2 else (weights[0], np.zeros(weights[0].shape[1]))
+        layers.append((W, b, layer.activation.__name__))
+    return NumpyDetector(layers)
+
+
+# ============================================================
+# PARITY + SPEED CHECK AGAINST KERAS
+# ============================================================
+if __name__ == "__main__":
+    fast = load_numpy_detector()
+    rng = np.random.default_rng(42)
+    omega = np.concatenate([
+        rng.uniform(-0.5, 0.5, (50_000, 3)),      # env range
+        rng.normal(0, 2.0, (50_000, 3)),          # tumbling range used to train the detector
+    ]).astype(np.float32)
+
+    try:
+        from tensorflow import keras
+    except ImportError:
+        keras = None
+        print("⚠️ TensorFlow not installed — skipping Keras parity check")
+
+    if keras is not None:
+        model = keras.models.load_model(DETECTOR_PATH)
+        ref = model.predict(omega, verbose=0, batch_size=8192)[:, 0]
+        diff = np.abs(fast(omega) - ref)
+        print(f"🔎 max |Δ| vs Keras = {diff.max():.2e} over {len(omega):,} states")
+        assert diff.max() < 1e-5
+
+        t0 = time.perf_counter()
+        for i in range(200):
+            model.predict(omega[i:i + 1], verbose=0)
+        keras_single = (time.perf_counter() - t0) / 200
+        print(f"🐢 Keras predict, 1 state      : {keras_single * 1e6:10.1f} µs/state")
+
+    t0 = time.perf_counter()
+    for i in range(10_000):
+        fast(omega[i])
+    numpy_single = (time.perf_counter() - t0) / 10_000
+    print(f"⚡ NumPy, 1 state              : {numpy_single * 1e6:10.1f} µs/state")
+
+    t0 = time.perf_counter()
+    for _ in range(100):
+        fast(omega[:1024])
+    numpy_batch = (time.perf_counter() - t0) / (100 * 1024)
+    print(f"⚡ NumPy, batch of 1024 states : {numpy_batch * 1e6:10.3f} µs/state")
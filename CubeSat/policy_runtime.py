@@ -0,0 +1,61 @@
+"""
+Minimal detumbling policy runtime: NumPy only (no stable-baselines3, torch or gymnasium).
+
+    from policy_runtime import load_policy
+    policy = load_policy()              # sac_cubesat_actor.npz, written by export_policy.py
+    action = policy(obs)                # deterministic SAC action, same as model.predict(obs, deterministic=True)[0]
+"""
+import os
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ACTOR_PATH = os.path.join(BASE_DIR, "sac_cubesat_actor.npz")
+
+ACTIVATIONS = {
+    "relu": lambda z: np.maximum(z, 0.0),
+    "tanh": np.tanh,
+    "elu": lambda z: np.where(z > 0, z, np.expm1(np.minimum(z, 0.0))),
+    "leaky_relu": lambda z: np.where(z > 0, z, 0.01 * z),
+}
+
+
+class DetumblingPolicy:
+    """
+    Deterministic SAC actor: latent MLP → mu → tanh, rescaled to the action bounds.
+
+    Accepts one observation (6,) or a batch (N, 6) and returns actions of the same
+    rank. `predict` mirrors SB3's signature and returns (action, None).
+    """
+
+    def __init__(self, weights, biases, activation, action_low, action_high):
+        self.weights = [np.ascontiguousarray(W, dtype=np.float32) for W in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activation_name = activation
+        self.activation = ACTIVATIONS[activation]
+        self.action_low = np.asarray(action_low, dtype=np.float32)
+        self.action_high = np.asarray(action_high, dtype=np.float32)
+        # SB3 unscale_action: low + ½(a + 1)(high − low), folded into one affine map
+        self.action_scale = 0.5 * (self.action_high - self.action_low)
+        self.action_offset = self.action_low + self.action_scale
+        self.unit_bounds = bool(np.all(self.action_low == -1.0) and np.all(self.action_high == 1.0))
+
+    def __call__(self, obs):
+        x = np.asarray(obs, dtype=np.float32)
+        for W, b in zip(self.weights[:-1], self.biases[:-1]):
+            x = self.activation(x @ W + b)
+        a = np.tanh(x @ self.weights[-1] + self.biases[-1])
+        if self.unit_bounds:
+            return a
+        return self.action_offset + self.action_scale * a
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        return self(obs), None
+
+
+def load_policy(path=ACTOR_PATH):
+    """Load an actor exported by export_policy.export_numpy."""
+    with np.load(path) as f:
+        n_layers = int(f["n_layers"])
+        weights = [f[f"W{i}"] for i in range(n_layers)]
+        biases = [f[f"b{i}"] for i in range(n_layers)]
+        return DetumblingPolicy(weights, biases, str(f["activation"]), f["action_low"], f["action_high"])
@@ -1,32 +1,52 @@
+import os
 import subprocess
 from PIL import Image
 import lz4.frame
 import zstandard as zstd
+try:
+    from instrumentation import timed, count, count_file_bytes
+except ImportError:  # instrumentation.py sits at the repo root; without it the hooks are no-ops
+    def timed(name=None, **labels):
+        return lambda fn: fn
+
+    def count(name, value=1, **labels):
+        pass
+
+    def count_file_bytes(input_path, output_path, **labels):
+        pass
 
 # IMAGE COMPRESSION (JPEG)
+@timed("compress", codec="jpeg")
 def compress_image_jpeg(input_path, output_path, quality):
     img = Image.open(input_path)
     img.save(output_path, "JPEG", quality=quality)
+    count_file_bytes(input_path, output_path, codec="jpeg")
     return output_path
 
 
 # LZ4 (fast lossless)
+@timed("compress", codec="lz4")
 def compress_lz4(input_path, output_path, level=1):
     with open(input_path, "rb") as f_in:
         data = f_in.read()
     compressed = lz4.frame.compress(data, compression_level=level)
+    count("bytes_in", len(data), codec="lz4")
+    count("bytes_out", len(compressed), codec="lz4")
     with open(output_path, "wb") as f_out:
         f_out.write(compressed)
     return output_path
 
 
 # ZSTD (lossless, high ratio)
+@timed("compress", codec="zstd")
 def compress_zstd(input_path, output_path, level=3):
     with open(input_path, "rb") as f_in:
         data = f_in.read()
 
     compressor = zstd.ZstdCompressor(level=level)
     compressed = compressor.compress(data)
+    count("bytes_in", len(data), codec="zstd")
+    count("bytes_out", len(compressed), codec="zstd")
 
     with open(output_path, "wb") as f_out:
         f_out.write(compressed)
@@ -35,10 +55,13 @@ def compress_zstd(input_path, output_path, level=3):
 
 
 # VIDEO COMPRESSION (H.264, Pi hardware accelerated)
+@timed("compress", codec="h264")
 def compress_h264(input_path, output_path, bitrate="1000k"):
     subprocess.run([
         "ffmpeg", "-i", input_path, 
         "-vcodec", "h264_omx",   # Raspberry Pi hardware encoder
         "-b:v", bitrate, output_path
     ])
+    if os.path.exists(output_path):
+        count_file_bytes(input_path, output_path, codec="h264")
     return output_path
@@ -1,10 +1,30 @@
 import pandas as pd
 import numpy as np
+try:
+    from instrumentation import timer, count
+except ImportError:  # instrumentation.py sits at the repo root; without it the hooks are no-ops
+    from contextlib import nullcontext
+
+    class timer(nullcontext):
+        def __init__(self, name, **labels):
+            super().__init__()
+
+        def start(self):
+            return self
+
+        def stop(self):
+            return 0.0
+
+    def count(name, value=1, **labels):
+        pass
 
 # --------------------------
 # Load time-series dataset 3
 # --------------------------
+load_timer = timer("ts_features.load").start()
 df = pd.read_csv("generated_dataset/timeseries_passes_profiles.csv")
+load_timer.stop()
+count("ts_features.samples", len(df))
 
 # Group by pass_id
 groups = df.groupby("pass_id")
@@ -12,6 +32,8 @@ groups = df.groupby("pass_id")
 # Output list
 rows = []
 
+extract_timer = timer("ts_features.extract").start()
+
 for pid, g in groups:
     g = g.sort_values("t_s")
 
@@ -41,33 +63,16 @@ for pid, g in groups:
 
     rows.append(row)
 
+extract_timer.stop()
+count("ts_features.passes", len(rows))
+
 # Create dataframe
 df_out = pd.DataFrame(rows)
 
 # Save features
+save_timer = timer("ts_features.save").start()
 df_out.to_csv("generated_dataset/ts_features.csv", index=False)
+save_timer.stop()
 
 print("✅ Time-series features extracted → ts_features.csv")
-
-
-import pandas as pd
-
-# Load aggregated dataset
-df_agg = pd.read_csv("generated_dataset/aggregated_passes.csv")
-
-# Load time-series statistical features
-df_ts = pd.read_csv("generated_dataset/ts_features.csv")
-
-# Merge on pass_id
-df_merged = df_agg.merge(df_ts, on="pass_id", how="left")
-
-# Fill missing values for passes that were not included in time-series
-for col in df_ts.columns:
-    if col != "pass_id":
-        df_merged[col] = df_merged[col].fillna(df_merged[col].mean())
-
-# Save new enriched dataset
-df_merged.to_csv("generated_dataset/aggregated_passes_enriched.csv", index=False)
-
-print("✅ Enhanced dataset created: aggregated_passes_enriched.csv")
-print("✅ You can now use this file for higher-accuracy ML training!")
+print("ℹ️ Run merge_ts_into_aggregated.py to build aggregated_passes_enriched.csv")
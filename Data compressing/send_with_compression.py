@@ -2,6 +2,26 @@ import pandas as pd
 import joblib
 import os
 from datetime import datetime
+try:
+    from instrumentation import timer, timed, count
+except ImportError:  # instrumentation.py sits at the repo root; without it the hooks are no-ops
+    from contextlib import nullcontext
+
+    class timer(nullcontext):
+        def __init__(self, name, **labels):
+            super().__init__()
+
+        def start(self):
+            return self
+
+        def stop(self):
+            return 0.0
+
+    def timed(name=None, **labels):
+        return lambda fn: fn
+
+    def count(name, value=1, **labels):
+        pass
 from data_classifier import detect_data_type
 from compression_selector import select_compression_protocol
 from compression_settings import *
@@ -11,15 +31,17 @@ from compression_engine import *
 # Load ML models
 # ================================
 print("📥 Loading ML models...")
-model_can = joblib.load("xgboost_can_send_all_model.pkl")
-model_comp = joblib.load("xgboost_recommended_compression_ratio_model.pkl")
+with timer("load.models"):
+    model_can = joblib.load("xgboost_can_send_all_model.pkl")
+    model_comp = joblib.load("xgboost_recommended_compression_ratio_model.pkl")
 
 # ================================
 # Load dataset
 # ================================
-df = pd.read_csv("generated_dataset/aggregated_passes_enriched.csv")
-df["pass_start_utc"] = pd.to_datetime(df["pass_start_utc"], utc=True)
-df["pass_end_utc"] = pd.to_datetime(df["pass_end_utc"], utc=True)
+with timer("load.dataset"):
+    df = pd.read_csv("generated_dataset/aggregated_passes_enriched.csv")
+    df["pass_start_utc"] = pd.to_datetime(df["pass_start_utc"], utc=True)
+    df["pass_end_utc"] = pd.to_datetime(df["pass_end_utc"], utc=True)
 
 # Recreate numeric time features
 df["pass_start_ts"] = df["pass_start_utc"].astype("int64") // 10**9
@@ -38,41 +60,47 @@ feature_cols = [c for c in df.columns if c not in exclude]
 # ================================
 # MAIN FUNCTION
 # ================================
+@timed("send.total")
 def send_file_with_ml(input_file, date_str):
     print(f"\n✅ Processing file: {input_file}")
 
     # ------------------------------------
     # 1. Detect data type
     # ------------------------------------
-    data_type = detect_data_type(input_file)
+    with timer("send.classify"):
+        data_type = detect_data_type(input_file)
     print(f"📄 Data type detected: {data_type}")
 
     # ------------------------------------
     # 2. Select compression protocol
     # ------------------------------------
-    protocol = select_compression_protocol(data_type)
+    with timer("send.select_protocol"):
+        protocol = select_compression_protocol(data_type)
     print(f"🗜️ Compression protocol selected: {protocol}")
 
     # ------------------------------------
     # 3. Find closest pass
     # ------------------------------------
-    input_date = pd.to_datetime(date_str, utc=True)
-    idx = (df["pass_start_utc"] - input_date).abs().idxmin()
-    row = df.loc[idx]
+    with timer("send.closest_pass"):
+        input_date = pd.to_datetime(date_str, utc=True)
+        idx = (df["pass_start_utc"] - input_date).abs().idxmin()
+        row = df.loc[idx]
     print(f"🛰️ Closest pass: {row['pass_start_utc']}")
 
     # Build feature vector
-    X = row[feature_cols].to_frame().T
-    X = X.apply(pd.to_numeric, errors="coerce").fillna(0)
+    with timer("send.features"):
+        X = row[feature_cols].to_frame().T
+        X = X.apply(pd.to_numeric, errors="coerce").fillna(0)
 
-    # Align with model input features
-    model_features = model_can.get_booster().feature_names
-    X = X.reindex(columns=model_features, fill_value=0)
+        # Align with model input features
+        model_features = model_can.get_booster().feature_names
+        X = X.reindex(columns=model_features, fill_value=0)
 
     # ------------------------------------
     # 4. Predict if full data can be sent
     # ------------------------------------
-    can_val = model_can.predict(X)[0]
+    with timer("inference", model="can_send_all"):
+        can_val = model_can.predict(X)[0]
     can_binary = 1 if can_val >= 0.5 else 0
 
     print(f"📤 Sendability prediction: {can_val:.3f} → Binary: {can_binary}")
@@ -80,12 +108,14 @@ def send_file_with_ml(input_file, date_str):
     # If full send is possible → no compression
     if can_binary == 1:
         print("✅ Full transmission possible — no compression needed.")
+        count("send.files", protocol="none")
         return input_file
 
     # ------------------------------------
     # 5. Predict compression ratio
     # ------------------------------------
-    ratio = model_comp.predict(X)[0]
+    with timer("inference", model="recommended_compression_ratio"):
+        ratio = model_comp.predict(X)[0]
     ratio = max(0.05, min(ratio, 1.0))  # clamp for safety
 
     print(f"⚠️ Required compression ratio: {ratio:.3f}")
@@ -133,6 +163,7 @@ def send_file_with_ml(input_file, date_str):
     # ------------------------------------
     # 8. Return compressed file path
     # ------------------------------------
+    count("send.files", protocol=protocol)
     print(f"✅ File ready for transmission: {out}")
     return out
 
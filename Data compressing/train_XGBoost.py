@@ -4,16 +4,36 @@ import joblib
 from xgboost import XGBRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 from datetime import datetime
+try:
+    from instrumentation import timer, count
+except ImportError:  # instrumentation.py sits at the repo root; without it the hooks are no-ops
+    from contextlib import nullcontext
+
+    class timer(nullcontext):
+        def __init__(self, name, **labels):
+            super().__init__()
+
+        def start(self):
+            return self
+
+        def stop(self):
+            return 0.0
+
+    def count(name, value=1, **labels):
+        pass
 
 # ============================================================
 # 1. Load Dataset
 # ============================================================
-df = pd.read_csv("generated_dataset/aggregated_passes_enriched.csv")
+with timer("train.load"):
+    df = pd.read_csv("generated_dataset/aggregated_passes_enriched.csv")
+count("train.rows", df.shape[0])
 print(f"✅ Dataset loaded: {df.shape[0]} rows × {df.shape[1]} columns")
 
 # ============================================================
 # 2. Preprocess columns
 # ============================================================
+preprocess_timer = timer("train.preprocess").start()
 # Drop identifier column if present
 if "pass_id" in df.columns:
     df = df.drop(columns=["pass_id"])
@@ -47,6 +67,7 @@ df[feature_cols] = df[feature_cols].apply(pd.to_numeric, errors="coerce").fillna
 
 # Remove rows missing targets
 df = df.dropna(subset=target_cols).reset_index(drop=True)
+preprocess_timer.stop()
 
 # ============================================================
 # 4. Temporal train/test split (80/20)
@@ -86,10 +107,12 @@ def train_and_evaluate(X_tr, y_tr, X_te, y_te, name):
         random_state=42,
         enable_categorical=False
     )
-    model.fit(X_tr, y_tr)
+    with timer("train.fit", model=name):
+        model.fit(X_tr, y_tr)
 
-    y_tr_pred = model.predict(X_tr)
-    y_te_pred = model.predict(X_te)
+    with timer("train.predict", model=name):
+        y_tr_pred = model.predict(X_tr)
+        y_te_pred = model.predict(X_te)
 
     mse_tr = mean_squared_error(y_tr, y_tr_pred)
     mse_te = mean_squared_error(y_te, y_te_pred)
@@ -98,7 +121,8 @@ def train_and_evaluate(X_tr, y_tr, X_te, y_te, name):
     r2_te = r2_score(y_te, y_te_pred)
 
     model_path = f"xgboost_{name}_model.pkl"
-    joblib.dump(model, model_path)
+    with timer("train.save", model=name):
+        joblib.dump(model, model_path)
     print(f"💾 Saved model: {model_path}")
     print(f"📈 {name}: Train R²={r2_tr:.4f}, Test R²={r2_te:.4f}, RMSE(Test)={rmse_te:.4f}")
 
@@ -0,0 +1,286 @@
+import os
+import sys
+import time
+import json
+import resource
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+import pandas as pd
+import joblib
+import xgboost as xgb
+from xgboost import XGBRegressor
+
+# ============================================================
+# Same data contract and hyper-parameters as train_XGBoost.py
+# ============================================================
+DATA_PATH = "generated_dataset/aggregated_passes_enriched.csv"
+TARGET_COLS = ["can_send_all", "recommended_compression_ratio"]
+LEAKAGE_COLS = ["max_bytes_transferable", "historical_max_bytes", "predicted_mean_snr_db"]
+EXCLUDE = set(TARGET_COLS + LEAKAGE_COLS + ["pass_id", "timestamp", "pass_start_utc", "pass_end_utc"])
+# train_XGBoost.py uses astype("category").cat.codes, i.e. codes of the sorted categories.
+# Chunks may not see every modcod, so the categories are fixed here.
+MODCODS = ["BPSK-1/2", "QPSK-1/2", "QPSK-3/4"]
+
+PARAMS = {
+    "learning_rate": 0.07,
+    "max_depth": 6,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "reg_lambda": 2.0,
+    "reg_alpha": 1.0,
+    "seed": 42,
+    "tree_method": "hist",
+    "objective": "reg:squarederror",
+}
+NUM_BOOST_ROUND = 300
+TRAIN_FRACTION = 0.8
+
+
+# ============================================================
+# 1. Chunk preprocessing (identical features to train_XGBoost.py)
+# ============================================================
+def _epoch_seconds(values):
+    t = pd.to_datetime(values, errors="coerce", utc=True)
+    return (t - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+
+
+def prepare_chunk(df):
+    """Raw CSV chunk → (features DataFrame, targets DataFrame, pass_start_ts)."""
+    df = df.dropna(subset=TARGET_COLS)
+    df = df.assign(pass_start_ts=_epoch_seconds(df["pass_start_utc"]),
+                   pass_end_ts=_epoch_seconds(df["pass_end_utc"]))
+    if "modem_modcod" in df.columns:
+        df["modem_modcod"] = pd.Categorical(df["modem_modcod"], categories=MODCODS).codes
+    feature_cols = [c for c in df.columns if c not in EXCLUDE]
+    X = df[feature_cols].apply(pd.to_numeric, errors="coerce").fillna(0).astype(np.float32)
+    return X, df[TARGET_COLS].astype(np.float64), df["pass_start_ts"].to_numpy()
+
+
+def temporal_cutoff(path, train_fraction=TRAIN_FRACTION, chunksize=500_000):
+    """
+    pass_start_ts splitting the store into train/test like the sorted 80/20 split.
+
+    Only the start column is read, and only hourly counts are kept, so the split costs
+    O(hours spanned) memory instead of a sort of the whole store. Passes in the hour that
+    crosses the fraction go to the test side.
+    """
+    counts = {}
+    for chunk in pd.read_csv(path, usecols=["pass_start_utc"], chunksize=chunksize):
+        hours, n = np.unique(_epoch_seconds(chunk["pass_start_utc"]).dropna() // 3600, return_counts=True)
+        for h, c in zip(hours.astype(np.int64), n):
+            counts[h] = counts.get(h, 0) + int(c)
+    hours = np.array(sorted(counts))
+    cumulative = np.cumsum([counts[h] for h in hours])
+    k = np.searchsorted(cumulative, train_fraction * cumulative[-1])
+    return int(hours[k]) * 3600
+
+
+# ============================================================
+# 2. Streaming iterator over the store
+# ============================================================
+class PassChunks(xgb.DataIter):
+    """
+    Feeds one side of the temporal split to XGBoost chunk by chunk.
+
+    XGBoost calls next() until it returns False, possibly several times (sketching,
+    quantization, external-memory pages). Targets are kept from the first full pass
+    only: 16 bytes per pass, the one O(n) buffer besides XGBoost's own gradients.
+    """
+
+    def __init__(self, path, cutoff, train=True, chunksize=100_000, cache_prefix=None):
+        self.path = path
+        self.cutoff = cutoff
+        self.train = train
+        self.chunksize = chunksize
+        self._reader = None
+        self._targets = []
+        self.targets = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def chunks(self):
+        """(X, y) chunks on this side of the split (also used for streamed evaluation)."""
+        for raw in pd.read_csv(self.path, chunksize=self.chunksize):
+            X, y, start = prepare_chunk(raw)
+            keep = (start < self.cutoff) if self.train else (start >= self.cutoff)
+            if keep.any():
+                yield X[keep], y[keep]
+
+    def next(self, input_data):
+        if self._reader is None:
+            self._reader = self.chunks()
+        try:
+            X, y = next(self._reader)
+        except StopIteration:
+            if self.targets is None:
+                self.targets = pd.concat(self._targets, ignore_index=True)
+                self._targets = None
+            return False
+        if self.targets is None:
+            self._targets.append(y)
+        input_data(data=X)
+        return True
+
+    def reset(self):
+        self._reader = None
+
+
+# ============================================================
+# 3. Two boosters on one quantized matrix
+# ============================================================
+def build_matrix(path, cutoff, chunksize=100_000, external_memory=False, cache_dir=None, max_bin=256):
+    """
+    Quantize the training side once. In-memory: QuantileDMatrix (1 byte per value).
+    external_memory=True: ExtMemQuantileDMatrix, pages cached on disk under cache_dir
+    (the caller owns the directory and removes it once training is done).
+    """
+    if external_memory:
+        if cache_dir is None:
+            raise ValueError("external_memory=True needs a cache_dir for the quantized pages")
+        cache_prefix = os.path.join(cache_dir, "passes")
+        it = PassChunks(path, cutoff, True, chunksize, cache_prefix=cache_prefix)
+        return xgb.ExtMemQuantileDMatrix(it, max_bin=max_bin), it
+    it = PassChunks(path, cutoff, True, chunksize)
+    return xgb.QuantileDMatrix(it, max_bin=max_bin), it
+
+
+def _squared_error(y):
+    """reg:squarederror gradients against an external label (the matrix carries none)."""
+    def objective(predt, dtrain):
+        return predt - y, np.ones_like(predt)
+    return objective
+
+
+def train_boosters(dtrain, targets, params=PARAMS, num_boost_round=NUM_BOOST_ROUND, nthread=None):
+    """
+    Fit one booster per target column, one after another, on the shared quantized matrix.
+
+    Each booster gets its labels through a squared-error objective, and base_score is set
+    to the label mean as reg:squarederror would estimate it, so each model is the same
+    as an XGBRegressor fit on that target alone. Each uses all `nthread` threads.
+    """
+    nthread = nthread or os.cpu_count()
+    boosters = {}
+    for name in TARGET_COLS:
+        y = targets[name].to_numpy(np.float32)
+        objective = _squared_error(y)
+        booster = xgb.Booster(dict(params, base_score=float(y.mean()), nthread=nthread), [dtrain])
+        for i in range(num_boost_round):
+            booster.update(dtrain, i, fobj=objective)
+        boosters[name] = booster
+    return boosters
+
+
+def evaluate(booster, chunks, target):
+    """Streamed RMSE and R² over (X, y) chunks."""
+    n = sse = s = s2 = 0.0
+    for X, y in chunks:
+        y = y[target].to_numpy()
+        pred = booster.inplace_predict(X)
+        n += len(y)
+        sse += float(np.sum((y - pred) ** 2))
+        s += float(y.sum())
+        s2 += float(np.sum(y ** 2))
+    sst = s2 - s * s / n
+    return np.sqrt(sse / n), 1.0 - sse / sst
+
+
+def to_regressor(booster):
+    """Wrap a Booster as the XGBRegressor send_with_compression.py and tree_inference.py load."""
+    model = XGBRegressor(n_estimators=NUM_BOOST_ROUND, **{k: v for k, v in PARAMS.items() if k != "seed"},
+                         random_state=PARAMS["seed"])
+    model.load_model(bytearray(booster.save_raw("json")))
+    return model
+
+
+def train_streaming(path=DATA_PATH, out_dir=".", chunksize=100_000, external_memory=False, nthread=None):
+    t0 = time.perf_counter()
+    cutoff = temporal_cutoff(path)
+    # External-memory pages only live as long as the training matrix
+    with tempfile.TemporaryDirectory(prefix="xgb_cache_") as cache_dir:
+        dtrain, it = build_matrix(path, cutoff, chunksize, external_memory, cache_dir)
+        t_matrix = time.perf_counter() - t0
+        print(f"✅ Quantized {dtrain.num_row():,} training rows × {dtrain.num_col()} features once "
+              f"({'external memory' if external_memory else 'in memory'}) in {t_matrix:.1f} s")
+
+        boosters = train_boosters(dtrain, it.targets, nthread=nthread)
+        print(f"🚀 Trained {', '.join(boosters)} on the shared matrix in {time.perf_counter() - t0 - t_matrix:.1f} s")
+        del dtrain
+
+    test = PassChunks(path, cutoff, train=False, chunksize=chunksize)
+    metrics = {}
+    for name, booster in boosters.items():
+        rmse, r2 = evaluate(booster, test.chunks(), name)
+        model_path = os.path.join(out_dir, f"xgboost_{name}_model.pkl")
+        joblib.dump(to_regressor(booster), model_path)
+        metrics[name] = {"rmse": rmse, "r2": r2}
+        print(f"💾 Saved model: {model_path}")
+        print(f"📈 {name}: Test R²={r2:.4f}, RMSE(Test)={rmse:.4f}")
+    print("ℹ️ Re-export the onboard .trees.npz copies with tree_inference.py after retraining")
+    return metrics
+
+
+# ============================================================
+# 4. In-memory baseline (what train_XGBoost.py does) for the benchmark
+# ============================================================
+def train_in_memory(path=DATA_PATH, out_dir="."):
+    df = pd.read_csv(path)
+    X, y, start = prepare_chunk(df)
+    cutoff = temporal_cutoff(path)
+    train = start < cutoff
+    for name in TARGET_COLS:
+        model = XGBRegressor(n_estimators=NUM_BOOST_ROUND, random_state=PARAMS["seed"],
+                             **{k: v for k, v in PARAMS.items() if k != "seed"})
+        model.fit(X[train], y.loc[train, name])
+        joblib.dump(model, os.path.join(out_dir, f"xgboost_{name}_model.pkl"))
+
+
+def scale_store(src, dst, n_rows, chunksize=100_000):
+    """Write an n_rows store by cycling the rows of `src` (RAM-scaling benchmarks only)."""
+    written, header = 0, True
+    while written < n_rows:
+        for chunk in pd.read_csv(src, chunksize=chunksize):
+            chunk = chunk.iloc[:n_rows - written]
+            chunk.to_csv(dst, mode="w" if header else "a", header=header, index=False)
+            written += len(chunk)
+            header = False
+            if written >= n_rows:
+                break
+    return dst
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Out-of-core training of the link-prediction XGBoost models")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--external-memory", action="store_true", help="page the quantized matrix to disk")
+    parser.add_argument("--in-memory", action="store_true", help="train_XGBoost.py-style baseline")
+    parser.add_argument("--benchmark", type=int, nargs="*", metavar="ROWS",
+                        help="compare peak RAM / time on stores of ROWS rows cycled from --data")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        with tempfile.TemporaryDirectory(prefix="xgb_bench_") as work:
+            for n_rows in args.benchmark:
+                store = scale_store(args.data, os.path.join(work, f"passes_{n_rows}.csv"), n_rows)
+                for mode in (["--in-memory"], [], ["--external-memory"]):
+                    t0 = time.perf_counter()
+                    out = subprocess.run([sys.executable, __file__, "--data", store, "--out-dir", work] + mode,
+                                         capture_output=True, text=True, check=True).stdout
+                    rss = json.loads(out.strip().splitlines()[-1])["peak_rss_mb"]
+                    label = mode[0][2:] if mode else "streaming"
+                    print(f"⏱️ {n_rows:>10,} rows | {label:15s}: {time.perf_counter() - t0:7.1f} s, "
+                          f"peak RSS {rss:7.0f} MB")
+    else:
+        if args.in_memory:
+            train_in_memory(args.data, args.out_dir)
+        else:
+            train_streaming(args.data, args.out_dir, args.chunksize, args.external_memory)
+        print(json.dumps({"peak_rss_mb": _peak_rss_mb()}))
@@ -0,0 +1,268 @@
+import os
+import time
+import pickle
+from collections import namedtuple
+import numpy as np
+
+from streaming_fdir import (BASE_DIR, MODEL_PATH, WINDOW, SENSORS, SENSOR_LOW, SENSOR_HIGH,
+                            StreamingFDIR, inference_timer, load_fdir_model, predict_windows)
+
+ISOLATION_MODEL_PATH = os.path.join(BASE_DIR, "fault_isolation_model.pkl")
+COMPILED_DETECTOR_PATH = os.path.join(BASE_DIR, "lgb_anomaly_model.trees.npz")
+
+# Fault classes of the isolation model: one per sensor / subsystem group
+FAULT_GROUPS = {
+    "gyro": ["Gx", "Gy", "Gz"],
+    "accelerometer": ["Ax", "Ay", "Az"],
+    "magnetometer": ["MagX", "MagY", "MagZ"],
+    "thermal": ["Temp_cpu", "Temp_batt", "Temp_panels"],
+    "battery": ["V_batt", "I_batt"],
+    "solar": ["V_solar", "I_solar"],
+    "adc": ["ADC"],
+    "pressure": ["Temp_BMP", "Press_BMP"],
+    "light": ["Light"],
+}
+FAULT_CLASSES = ["nominal"] + list(FAULT_GROUPS)  # "nominal" = false alarm of the detector
+
+Fault = namedtuple("Fault", ["stream", "sample", "probability", "fault_class", "confidence", "action", "latency"])
+
+
+# ============================================================
+# RECOVERY TABLE (README: MOSFET switches, redundancies, software substitutes)
+# ============================================================
+RecoveryAction = namedtuple("RecoveryAction", ["switch", "action", "fallback"])
+
+RECOVERY_TABLE = {
+    "gyro": RecoveryAction("IMU_PWR", "power-cycle IMU", "propagate attitude from magnetometer"),
+    "accelerometer": RecoveryAction("IMU_PWR", "power-cycle IMU", "drop accelerometer from attitude estimate"),
+    "magnetometer": RecoveryAction("MAG_PWR", "power-cycle magnetometer", "use model field, pause magnetorquers"),
+    "thermal": RecoveryAction("PAYLOAD_PWR", "power off payload", "thermal safe profile"),
+    "battery": RecoveryAction("BATT_STRING", "isolate battery string", "redundant string + load shedding"),
+    "solar": RecoveryAction("SOLAR_STRING", "disconnect solar string", "MPPT on remaining strings"),
+    "adc": RecoveryAction("ADC_PWR", "power-cycle ADC", "redundant ADC channel"),
+    "pressure": RecoveryAction("BMP_PWR", "power-cycle BMP sensor", "thermal model estimate"),
+    "light": RecoveryAction("LIGHT_PWR", "power-cycle light sensor", "sun vector from solar currents"),
+}
+SAFE_MODE = RecoveryAction("NON_ESSENTIAL_PWR", "enter safe mode", "wait for ground contact")
+
+
+def lookup_recovery(fault_class, table=RECOVERY_TABLE):
+    """Recovery action of an isolated fault class; unknown classes fall back to safe mode."""
+    return table.get(fault_class, SAFE_MODE)
+
+
+# ============================================================
+# MODELS
+# ============================================================
+def load_detector(compiled=False):
+    """
+    Binary detector: the booster from lgb_anomaly_model.pkl, or with compiled=True its
+    tree_inference export (NumPy/Numba, no LightGBM import; faster on single windows,
+    slightly slower than the booster on micro-batches). Falls back to the booster when the
+    export is missing or tree_inference (repo root) is not importable.
+    """
+    if compiled and os.path.exists(COMPILED_DETECTOR_PATH):
+        try:
+            from tree_inference import load_ensemble
+        except ImportError:
+            print("⚠️ tree_inference not importable (put the repo root on PYTHONPATH) — using the booster")
+        else:
+            return load_ensemble(COMPILED_DETECTOR_PATH), list(SENSORS)
+    return load_fdir_model(MODEL_PATH)
+
+
+def load_isolation_model(model_path=ISOLATION_MODEL_PATH):
+    """Return (multiclass LightGBM booster, class names) from a {'model', 'features', 'classes'} pickle."""
+    with open(model_path, "rb") as f:
+        bundle = pickle.load(f)
+    return bundle["model"].booster_, list(bundle.get("classes", FAULT_CLASSES))
+
+
+# ============================================================
+# CASCADED FDIR ENGINE
+# ============================================================
+class FDIRCascade(StreamingFDIR):
+    """
+    Detection → isolation → recovery on streaming sensor windows.
+
+    Every window is scored by the cheap binary detector (StreamingFDIR micro-batches).
+    Only the windows it flags are passed, as one batch per flush, to the multiclass
+    isolation model; the isolated class picks a recovery action from `recovery_table`.
+    Flags isolated as "nominal" are dismissed as false alarms. Build the models with
+    load_detector() and load_or_train_isolation_model().
+    """
+
+    def __init__(self, detector, isolator, classes=None, sensors=None, recovery_table=RECOVERY_TABLE, **kwargs):
+        super().__init__(detector, sensors or list(SENSORS), **kwargs)
+        self.isolator = isolator
+        self.classes = list(classes or FAULT_CLASSES)
+        self.recovery_table = recovery_table
+        self.windows_isolated = 0
+        self.dismissed = 0
+
+    def _report(self, flagged, proba, now):
+        if len(flagged) == 0:
+            return []
+        with inference_timer(self.isolator, "fdir_isolator"):
+            class_proba = np.asarray(predict_windows(self.isolator, self.pending[flagged], self.num_threads))
+        class_proba = class_proba.reshape(len(flagged), -1)
+        best = class_proba.argmax(axis=1)
+        self.windows_isolated += len(flagged)
+
+        faults = []
+        for j, (i, k) in enumerate(zip(flagged, best)):
+            fault_class = self.classes[k]
+            if fault_class == "nominal":
+                self.dismissed += 1
+                continue
+            faults.append(Fault(int(self.pending_stream[i]), int(self.pending_sample[i]), float(proba[i]),
+                                fault_class, float(class_proba[j, k]),
+                                lookup_recovery(fault_class, self.recovery_table),
+                                float(now - self.pending_time[i])))
+        return faults
+
+    def stats(self):
+        s = super().stats()
+        s.update(windows_isolated=self.windows_isolated, dismissed=self.dismissed,
+                 isolated_fraction=self.windows_isolated / max(self.windows_scored, 1))
+        return s
+
+
+# ============================================================
+# SYNTHETIC STREAMS WITH INJECTED FAULTS (sensor_data.csv is not shipped)
+# ============================================================
+def nominal_baselines(detector, n, rng, max_probability=0.1):
+    """
+    Per-stream operating points the detector scores as nominal.
+
+    Points are drawn uniformly inside the model's sensor ranges and kept when a constant
+    window at that point scores below `max_probability`, so that streams built around
+    them give a low false-alarm rate instead of the ~97% flag rate of an uncalibrated walk.
+    """
+    kept = []
+    while sum(len(k) for k in kept) < n:
+        points = rng.uniform(SENSOR_LOW, SENSOR_HIGH, (4096, len(SENSORS)))
+        windows = np.repeat(points[:, None, :], WINDOW, axis=1).reshape(len(points), -1)
+        kept.append(points[predict_windows(detector, windows) < max_probability])
+    return np.concatenate(kept)[:n]
+
+
+def synthetic_fault_streams(detector, n_samples, n_streams, fault_rate, rng, noise=0.003,
+                            duration=(20, 60), magnitude=(0.2, 0.4)):
+    """
+    Sensor streams (n_samples, n_streams, 20) with step faults on one sensor group.
+
+    About `fault_rate` of all samples lie inside a fault episode. An episode lasts
+    `duration` samples and offsets every sensor of a random FAULT_GROUPS group by
+    `magnitude` × its range, towards the middle of the range. Returns the streams and
+    per-sample labels (index into FAULT_CLASSES, 0 = nominal).
+    """
+    span = SENSOR_HIGH - SENSOR_LOW
+    base = nominal_baselines(detector, n_streams, rng)
+    streams = base + noise * span * rng.normal(size=(n_samples, n_streams, len(SENSORS)))
+    labels = np.zeros((n_samples, n_streams), dtype=np.int64)
+    columns = [[SENSORS.index(c) for c in group] for group in FAULT_GROUPS.values()]
+
+    p_start = fault_rate / np.mean(duration)
+    for s in range(n_streams):
+        t = 0
+        for start in np.flatnonzero(rng.random(n_samples) < p_start):
+            if start < t:
+                continue  # one fault at a time per stream
+            t = min(start + rng.integers(*duration), n_samples)
+            k = rng.integers(len(columns))
+            cols = columns[k]
+            towards_middle = np.where(base[s, cols] > 0.5 * (SENSOR_LOW + SENSOR_HIGH)[cols], -1.0, 1.0)
+            streams[start:t, s, cols] += towards_middle * rng.uniform(*magnitude) * span[cols]
+            labels[start:t, s] = k + 1
+    return streams, labels
+
+
+def train_isolation_model(detector, rng, n_samples=300, n_streams=128, model_path=None):
+    """
+    Stand-in multiclass LightGBM trained on synthetic fault windows.
+
+    Only for benchmarks: the README's fault_isolation_model.pkl is not shipped. The
+    bundle has the same {'model', 'features', 'classes'} layout that load_isolation_model
+    reads; it is written to `model_path` when given. Many short streams are used because
+    raw windows carry no per-stream baseline: with few baselines the model memorizes them.
+    """
+    from lightgbm import LGBMClassifier
+
+    streams, labels = synthetic_fault_streams(detector, n_samples, n_streams, 0.5, rng)
+    windows = np.lib.stride_tricks.sliding_window_view(streams, WINDOW, axis=0)  # (T-W+1, S, F, W)
+    X = windows.transpose(0, 1, 3, 2).reshape(-1, WINDOW * len(SENSORS))
+    y = labels[WINDOW - 1:].reshape(-1)  # class of the newest sample of each window
+
+    model = LGBMClassifier(objective="multiclass", n_estimators=30, num_leaves=15, learning_rate=0.2,
+                           n_jobs=1, verbose=-1)
+    model.fit(X, y)
+    if model_path is not None:
+        with open(model_path, "wb") as f:
+            pickle.dump({"model": model, "features": list(SENSORS), "classes": FAULT_CLASSES}, f)
+    return model.booster_, list(FAULT_CLASSES)
+
+
+def load_or_train_isolation_model(detector, rng=None, model_path=ISOLATION_MODEL_PATH):
+    """The shipped isolation model when it exists, otherwise the synthetic stand-in above."""
+    if os.path.exists(model_path):
+        return load_isolation_model(model_path)
+    t0 = time.perf_counter()
+    model = train_isolation_model(detector, np.random.default_rng(0) if rng is None else rng)
+    print(f"⚠️ {os.path.basename(model_path)} not found — trained a synthetic stand-in isolation model "
+          f"in {time.perf_counter() - t0:.1f} s (timings only, not flight accuracy)")
+    return model
+
+
+def run_cascade(engine, streams):
+    """Replay (T, n_streams, F) streams through an engine; returns (records, elapsed s)."""
+    records = []
+    t0 = time.perf_counter()
+    for t in range(len(streams)):
+        records += engine.push_tick(streams[t])
+    records += engine.flush()
+    return records, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    booster, sensors = load_detector()
+    compiled, _ = load_detector(compiled=True)
+
+    isolator, classes = load_or_train_isolation_model(booster, rng)
+
+    n_streams, n_samples = 64, 1000
+    for fault_rate in (0.01, 0.05):
+        streams, labels = synthetic_fault_streams(booster, n_samples, n_streams, fault_rate, rng)
+        faulty_windows = (labels[WINDOW - 1:] > 0).mean()
+        print(f"\n🛰️ {n_streams} streams × {n_samples} samples, {fault_rate:.0%} of samples faulty "
+              f"({faulty_windows:.1%} of windows end in a fault)")
+
+        runs = [("cascade, LightGBM detector", booster, 0.5),
+                ("cascade, compiled detector", compiled, 0.5),
+                ("isolate every window      ", booster, 0.0)]
+        for name, model, threshold in runs:
+            engine = FDIRCascade(model, isolator, classes, sensors, n_streams=n_streams, batch_size=64,
+                                 max_delay=0.01, threshold=threshold)
+            faults, elapsed = run_cascade(engine, streams)
+            s = engine.stats()
+            print(f"⏱️ {name}: {s['samples'] / elapsed:9,.0f} samples/s | isolated {s['isolated_fraction']:6.1%} "
+                  f"of windows, {s['dismissed']:5d} dismissed | latency p50 {s['latency_p50_ms']:.2f} ms "
+                  f"p99 {s['latency_p99_ms']:.2f} ms")
+
+            if threshold > 0:
+                # Reports against the injected labels: precision / false alarms, recall over faulty
+                # windows, and isolation accuracy on the true detections only
+                truth = labels[[f.sample for f in faults], [f.stream for f in faults]]
+                predicted = np.array([classes.index(f.fault_class) for f in faults])
+                hit = truth > 0
+                n_faulty = int((labels[WINDOW - 1:] > 0).sum())
+                print(f"   🔎 {len(faults)} faults reported: precision {hit.mean() if len(hit) else 0:.0%} "
+                      f"({int((~hit).sum())} false alarms), recall {hit.sum() / max(n_faulty, 1):.0%} of faulty "
+                      f"windows, isolation accuracy on true detections "
+                      f"{(predicted[hit] == truth[hit]).mean() if hit.any() else 0:.0%}")
+
+    print("\n🛠️ Recovery table:")
+    for fault_class in FAULT_CLASSES[1:]:
+        action = lookup_recovery(fault_class)
+        print(f"   {fault_class:14s} → {action.switch:13s} {action.action} (fallback: {action.fallback})")
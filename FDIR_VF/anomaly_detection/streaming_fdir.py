@@ -0,0 +1,254 @@
+import os
+import time
+import pickle
+from collections import namedtuple
+from contextlib import nullcontext
+import numpy as np
+
+try:
+    from instrumentation import timer
+except ImportError:  # instrumentation.py sits at the repo root; without it the hooks are no-ops
+    def timer(name, **labels):
+        return nullcontext()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "lgb_anomaly_model.pkl")
+WINDOW = 10  # samples per sliding window (see README, Objective 4)
+
+# Column order of the model's sensor windows (the 'features' entry of the pickle)
+SENSORS = ["Gx", "Gy", "Gz", "Ax", "Ay", "Az", "MagX", "MagY", "MagZ", "Temp_cpu", "Temp_batt",
+           "Temp_panels", "V_batt", "I_batt", "V_solar", "I_solar", "ADC", "Temp_BMP", "Press_BMP", "Light"]
+# Range covered by the model's split thresholds, per sensor
+SENSOR_LOW = np.array([-300, -300, -300, -2, -2, -2, -900, -900, -900, -20, -20, -20,
+                       3.0, 0.0, 0.0, 0.0, 0.0, -20, 1000, 90000], dtype=np.float64)
+SENSOR_HIGH = np.array([300, 300, 300, 2, 2, 2, 900, 900, 900, 50, 50, 50,
+                        4.2, 5.0, 20.0, 2.5, 3.5, 50, 1100, 110000], dtype=np.float64)
+
+Detection = namedtuple("Detection", ["stream", "sample", "probability", "latency"])
+
+
+def load_fdir_model(model_path=MODEL_PATH):
+    """Return (LightGBM booster, sensor names) from the pickled {'model', 'features'} dict."""
+    with open(model_path, "rb") as f:
+        bundle = pickle.load(f)
+    return bundle["model"].booster_, list(bundle["features"])
+
+
+def n_model_features(model):
+    """Input width of a LightGBM Booster or a compiled tree_inference.TreeEnsemble."""
+    return model.num_feature() if hasattr(model, "num_feature") else model.n_features
+
+
+def predict_windows(model, X, num_threads=1):
+    """Booster.predict with a thread count, or plain predict for compiled ensembles."""
+    if hasattr(model, "num_feature"):
+        return model.predict(X, num_threads=num_threads)
+    return model.predict(X)
+
+
+def inference_timer(model, label):
+    """timer("inference", model=label) around a Booster call; compiled ensembles time themselves."""
+    return timer("inference", model=label) if hasattr(model, "num_feature") else nullcontext()
+
+
+# ============================================================
+# STREAMING DETECTION ENGINE
+# ============================================================
+class StreamingFDIR:
+    """
+    Streaming fault detection with the LightGBM anomaly model (a Booster, or the same
+    model compiled with tree_inference).
+
+    The model scores a window of WINDOW samples × 20 sensors flattened time-major
+    (200 features). Each stream keeps one ring buffer of 2·WINDOW rows and every
+    sample is written twice (at pos and pos + WINDOW), so the latest window is always
+    the contiguous slice buf[pos + 1 : pos + 1 + WINDOW]: O(1) work per sample and no
+    window rebuild.
+
+    Ready windows are copied into a pending micro-batch and scored together when
+    `batch_size` windows are queued or the oldest has waited `max_delay` seconds.
+    `push_tick` updates every stream of a telemetry tick in one vectorized step.
+    """
+
+    def __init__(self, booster=None, sensors=None, n_streams=1, window=WINDOW, batch_size=32,
+                 max_delay=0.05, threshold=0.5, num_threads=1):
+        if booster is None:
+            booster, sensors = load_fdir_model()
+        self.booster = booster
+        self.sensors = sensors
+        self.n_sensors = len(sensors)
+        if n_model_features(booster) != window * self.n_sensors:
+            raise ValueError(f"Model expects {n_model_features(booster)} features, "
+                             f"window {window} × {self.n_sensors} sensors gives {window * self.n_sensors}")
+        self.window = window
+        self.n_streams = n_streams
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.threshold = threshold
+        self.num_threads = num_threads
+
+        self.buffers = np.zeros((n_streams, 2 * window, self.n_sensors), dtype=np.float64)
+        self.pos = np.zeros(n_streams, dtype=np.int64)
+        self.counts = np.zeros(n_streams, dtype=np.int64)
+        self.last_probability = np.full(n_streams, np.nan)
+
+        # A full tick can overshoot batch_size by up to n_streams - 1 windows
+        capacity = batch_size + n_streams - 1
+        self.pending = np.empty((capacity, window * self.n_sensors), dtype=np.float64)
+        self.pending_stream = np.empty(capacity, dtype=np.int64)
+        self.pending_sample = np.empty(capacity, dtype=np.int64)
+        self.pending_time = np.empty(capacity)
+        self.n_pending = 0
+
+        self.samples_seen = 0
+        self.windows_scored = 0
+        self.latencies = []
+
+    def window_view(self, stream=0):
+        """Latest window of a stream, (window, n_sensors), oldest sample first (no copy)."""
+        start = self.pos[stream] + 1
+        return self.buffers[stream, start:start + self.window]
+
+    def push(self, sample, stream=0, timestamp=None):
+        """Add one sample (n_sensors,) to a stream; returns the detections flushed by this call."""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        w = self.window
+        p = (self.pos[stream] + 1) % w
+        self.buffers[stream, p] = sample
+        self.buffers[stream, p + w] = sample
+        self.pos[stream] = p
+        self.counts[stream] += 1
+        self.samples_seen += 1
+
+        if self.counts[stream] >= w:
+            i = self.n_pending
+            # Time-ordered window, flattened time-major like the training windows
+            self.pending[i] = self.window_view(stream).ravel()
+            self.pending_stream[i] = stream
+            self.pending_sample[i] = self.counts[stream] - 1
+            self.pending_time[i] = timestamp
+            self.n_pending += 1
+        return self._maybe_flush()
+
+    def push_tick(self, samples, timestamp=None):
+        """Add one sample for every stream at once: samples (n_streams, n_sensors)."""
+        if self.n_streams == 1:
+            return self.push(samples[0], 0, timestamp)
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        w = self.window
+        rows = np.arange(self.n_streams)
+        p = (self.pos + 1) % w
+        self.buffers[rows, p] = samples
+        self.buffers[rows, p + w] = samples
+        self.pos = p
+        self.counts += 1
+        self.samples_seen += self.n_streams
+
+        ready = np.flatnonzero(self.counts >= w)
+        if len(ready):
+            i, n = self.n_pending, len(ready)
+            idx = (p[ready] + 1)[:, None] + np.arange(w)
+            self.pending[i:i + n] = self.buffers[ready[:, None], idx].reshape(n, -1)
+            self.pending_stream[i:i + n] = ready
+            self.pending_sample[i:i + n] = self.counts[ready] - 1
+            self.pending_time[i:i + n] = timestamp
+            self.n_pending += n
+        return self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self.n_pending and (self.n_pending >= self.batch_size
+                               or time.perf_counter() - self.pending_time[0] >= self.max_delay):
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Score every pending window in one booster call."""
+        n = self.n_pending
+        if n == 0:
+            return []
+        with inference_timer(self.booster, "fdir_detector"):
+            proba = predict_windows(self.booster, self.pending[:n], self.num_threads)
+        now = time.perf_counter()
+        self.last_probability[self.pending_stream[:n]] = proba
+        self.latencies.extend(now - self.pending_time[:n])
+        self.windows_scored += n
+        self.n_pending = 0
+
+        return self._report(np.flatnonzero(proba >= self.threshold), proba, now)
+
+    def _report(self, flagged, proba, now):
+        """Records for the flagged rows of the batch just scored (still in self.pending)."""
+        return [
+            Detection(int(self.pending_stream[i]), int(self.pending_sample[i]), float(proba[i]),
+                      float(now - self.pending_time[i]))
+            for i in flagged
+        ]
+
+    def stats(self):
+        """Detection latency percentiles (ms) from sample arrival to score."""
+        lat = np.asarray(self.latencies) * 1e3
+        p50, p99 = np.percentile(lat, [50, 99]) if len(lat) else (np.nan, np.nan)
+        return {"samples": self.samples_seen, "windows_scored": self.windows_scored,
+                "latency_p50_ms": p50, "latency_p99_ms": p99}
+
+
+# ============================================================
+# SYNTHETIC SENSOR STREAM (sensor_data.csv is not shipped)
+# ============================================================
+def synthetic_sensor_stream(n_samples, n_streams, rng):
+    """
+    Random-walk readings inside the range covered by the model's split thresholds.
+
+    Only for parity and throughput checks: the values are not calibrated to the
+    training distribution, so detection counts on this stream mean nothing.
+    """
+    low, high = SENSOR_LOW, SENSOR_HIGH
+    start = rng.uniform(low, high, (n_streams, len(low)))
+    steps = 0.01 * (high - low) * rng.normal(size=(n_samples, n_streams, len(low)))
+    return np.clip(start + np.cumsum(steps, axis=0), low, high)
+
+
+if __name__ == "__main__":
+    booster, sensors = load_fdir_model()
+    rng = np.random.default_rng(0)
+
+    # --- Parity: streamed windows score exactly like windows built from the full history
+    n_streams, n_samples = 4, 500
+    stream = synthetic_sensor_stream(n_samples, n_streams, rng)
+    windows = np.lib.stride_tricks.sliding_window_view(stream, WINDOW, axis=0)  # (T-W+1, S, F, W)
+    ref = booster.predict(windows.transpose(0, 1, 3, 2).reshape(-1, WINDOW * len(sensors))).reshape(-1, n_streams)
+
+    check = StreamingFDIR(booster, sensors, n_streams=n_streams, batch_size=16, max_delay=1e9, threshold=0.0)
+    got = np.full_like(ref, np.nan)
+    for t in range(n_samples):
+        for d in check.push_tick(stream[t]):
+            got[d.sample - WINDOW + 1, d.stream] = d.probability
+    for d in check.flush():
+        got[d.sample - WINDOW + 1, d.stream] = d.probability
+    print(f"🔎 max |Δp| streamed vs recomputed windows: {np.abs(got - ref).max():.1e}")
+    assert np.allclose(got, ref, atol=1e-12)
+
+    # --- Throughput / latency: one spacecraft at 10 Hz vs many streams in a replay
+    for n_streams, batch_size in [(1, 1), (1, 16), (64, 64), (64, 256)]:
+        stream = synthetic_sensor_stream(2000, n_streams, rng)
+        engine = StreamingFDIR(booster, sensors, n_streams=n_streams, batch_size=batch_size, max_delay=0.01)
+        t0 = time.perf_counter()
+        for t in range(len(stream)):
+            engine.push_tick(stream[t])
+        engine.flush()
+        elapsed = time.perf_counter() - t0
+        s = engine.stats()
+        print(f"⏱️ {n_streams:3d} stream(s), batch {batch_size:3d}: {s['samples'] / elapsed:10,.0f} samples/s | "
+              f"latency p50 {s['latency_p50_ms']:.2f} ms p99 {s['latency_p99_ms']:.2f} ms")
+
+    # Naive baseline: rebuild the window and call predict_proba per sample
+    with open(MODEL_PATH, "rb") as f:
+        model = pickle.load(f)["model"]
+    stream = synthetic_sensor_stream(300, 1, rng)[:, 0]
+    t0 = time.perf_counter()
+    for t in range(WINDOW - 1, len(stream)):
+        model.predict_proba(np.array(stream[t - WINDOW + 1:t + 1]).reshape(1, -1))
+    naive = (len(stream) - WINDOW + 1) / (time.perf_counter() - t0)
+    print(f"🐢 per-sample predict_proba: {naive:10,.0f} samples/s")
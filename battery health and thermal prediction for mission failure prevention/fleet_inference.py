@@ -0,0 +1,148 @@
+import time
+import numpy as np
+import pandas as pd
+import torch
+from torch.nn.utils.rnn import pack_padded_sequence
+
+from gru_inference import (
+    load_battery_gru, load_scalers, load_model_params, configure_cpu, TARGET_COLS
+)
+try:
+    from instrumentation import timed
+except ImportError:  # instrumentation.py sits at the repo root; without it the hooks are no-ops
+    def timed(name=None, **labels):
+        return lambda fn: fn
+
+
+# ============================================================
+# FLEET FORECASTER
+# ============================================================
+class FleetBatteryForecaster:
+    """
+    Battery temperature/voltage/current forecaster for many spacecraft at once.
+
+    Every telemetry tick, `push` appends one sample per satellite (NaN = no sample)
+    into a shared (n_satellites, seq_length, 7) window buffer. `forecast` runs
+    BatteryGRU once on the whole batch and inverse-transforms with scaler_y in a
+    single vectorized operation.
+
+    Satellites that have not yet filled a window are padded and packed so the GRU
+    only sees their real samples.
+    """
+
+    def __init__(self, satellite_ids, model=None, scaler_X=None, scaler_y=None, seq_length=None):
+        if model is None:
+            model = load_battery_gru()
+        if scaler_X is None or scaler_y is None:
+            scaler_X, scaler_y = load_scalers()
+        if seq_length is None:
+            seq_length = load_model_params()['seq_length']
+
+        self.satellite_ids = list(satellite_ids)
+        self.model = model.eval()
+        self.seq_length = seq_length
+
+        self.x_scale = scaler_X.scale_.astype(np.float32)
+        self.x_min = scaler_X.min_.astype(np.float32)
+        self.y_scale = scaler_y.scale_
+        self.y_min = scaler_y.min_
+
+        n = len(self.satellite_ids)
+        # Windows are right-aligned: the newest sample is always at index -1
+        self.windows = np.zeros((n, seq_length, len(self.x_scale)), dtype=np.float32)
+        self.prev = np.full((n, 3), np.nan)
+        self.counts = np.zeros(n, dtype=np.int64)
+
+    def push(self, temperature, voltage, current):
+        """Append one tick of telemetry: three arrays of length n_satellites (NaN = missing)."""
+        raw = np.column_stack([temperature, voltage, current]).astype(np.float64)
+        has = ~np.isnan(raw).any(axis=1)
+        if not has.any():
+            return
+
+        # delta_* = diff against the satellite's previous sample (0 on its first sample)
+        deltas = np.where(np.isnan(self.prev[has]), 0.0, raw[has] - self.prev[has])
+        power = raw[has, 1] * raw[has, 2]
+        x = np.column_stack([raw[has], power, deltas]).astype(np.float32)
+        x = x * self.x_scale + self.x_min
+
+        rows = np.flatnonzero(has)
+        self.windows[rows, :-1] = self.windows[rows, 1:]
+        self.windows[rows, -1] = x
+        self.prev[rows] = raw[has]
+        self.counts[rows] += 1
+
+    @timed("inference", model="battery_gru_fleet")
+    def forecast(self):
+        """Return a DataFrame of next-step forecasts indexed by satellite id (ready satellites only)."""
+        ready = self.counts > 0
+        lengths = np.minimum(self.counts[ready], self.seq_length)
+        x = self.windows[ready]
+
+        with torch.inference_mode():
+            if (lengths == self.seq_length).all():
+                y = self.model(torch.from_numpy(x)).numpy()
+            else:
+                y = self._forecast_padded(x, lengths)
+
+        y = (y - self.y_min) / self.y_scale
+        index = [sid for sid, r in zip(self.satellite_ids, ready) if r]
+        return pd.DataFrame(y, index=pd.Index(index, name="satellite_id"), columns=TARGET_COLS)
+
+    def _forecast_padded(self, x, lengths):
+        # Move each partial window's samples to the front, then pack so the GRU
+        # stops at each satellite's real length.
+        shift = self.seq_length - lengths
+        idx = np.minimum(np.arange(self.seq_length)[None, :] + shift[:, None], self.seq_length - 1)
+        x_front = np.take_along_axis(x, idx[:, :, None], axis=1)
+        packed = pack_padded_sequence(
+            torch.from_numpy(x_front), torch.from_numpy(lengths), batch_first=True, enforce_sorted=False
+        )
+        _, h_n = self.model.gru(packed)
+        m = self.model
+        return m.fc2(torch.relu(m.fc1(h_n[-1]))).numpy()
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+def synthetic_fleet_tick(n, t, rng):
+    temperature = 25 + 10 * np.sin((t + np.arange(n)) / 200) + rng.normal(0, 0.2, n)
+    voltage = np.clip(4.2 - 0.0005 * t + rng.normal(0, 0.0005, n), 3.0, 4.2)
+    current = np.clip(0.5 + rng.normal(0, 0.02, n), 0.1, 2.0)
+    return temperature, voltage, current
+
+
+if __name__ == "__main__":
+    configure_cpu(num_threads=1)
+    budget_ms = 50.0
+    model = load_battery_gru()
+    scaler_X, scaler_y = load_scalers()
+    seq_length = load_model_params()['seq_length']
+    rng = np.random.default_rng(42)
+
+    for n in (1, 100, 1000, 5000):
+        fleet = FleetBatteryForecaster([f"SAT_{i:05d}" for i in range(n)], model, scaler_X, scaler_y, seq_length)
+        for t in range(seq_length):
+            fleet.push(*synthetic_fleet_tick(n, t, rng))
+
+        times = []
+        for t in range(seq_length, seq_length + 20):
+            tick = synthetic_fleet_tick(n, t, rng)
+            t0 = time.perf_counter()
+            fleet.push(*tick)
+            forecasts = fleet.forecast()
+            times.append(time.perf_counter() - t0)
+        p50, p99 = np.percentile(times, [50, 99]) * 1e3
+        status = "✅" if p99 < budget_ms else "⚠️"
+        print(f"{status} {n:5d} satellites: tick p50={p50:.2f} ms p99={p99:.2f} ms "
+              f"({n / (p50 / 1e3):,.0f} forecasts/s, budget {budget_ms:.0f} ms)")
+
+    # Per-satellite loop for comparison (what running the notebook path per spacecraft costs)
+    n = 1000
+    x = torch.from_numpy(fleet.windows[:n])
+    t0 = time.perf_counter()
+    with torch.inference_mode():
+        for i in range(n):
+            scaler_y.inverse_transform(model(x[i:i + 1]).numpy())
+    print(f"🐢 {n} satellites one by one: {(time.perf_counter() - t0) * 1e3:.1f} ms")
@@ -1,70 +1,176 @@
+import time
 import numpy as np
 import pandas as pd
 
 # -----------------------
 # Parameters
 # -----------------------
-n_samples = 2000       # number of time steps
+n_samples = 2000       # number of time steps per cell
+n_cells = 1            # independent battery traces generated in parallel
 dt = 1                 # seconds per step
 temp_base = 25         # initial temperature (°C)
 volt_base = 4.2        # initial voltage (V)
 curr_base = 0.5        # initial current (A)
+fault_rate = 0.0       # probability that a cell receives one injected fault
+seed = None            # set an int for reproducible traces
+
+save_csv = True        # synthetic_battery_prediction_data.csv (first cell, notebook format)
+save_npy = False       # battery_*.npy for all cells (memory-mappable, see sequence_dataset.py)
+
+FEATURE_COLS = ['temperature', 'voltage', 'current', 'power', 'delta_temp', 'delta_voltage', 'delta_current']
+TARGET_COLS = ['temperature_next', 'voltage_next', 'current_next']
+
+# Fault codes stored alongside each sample (0 = nominal)
+FAULT_TYPES = {1: "overheating", 2: "voltage_sag", 3: "current_spike"}
+
 
 # -----------------------
-# Initialize arrays
+# Clipped random walk (vectorized)
 # -----------------------
-temperature = [temp_base]
-voltage = [volt_base]
-current = [curr_base]
+def clipped_random_walk(x0, steps, low, high, max_iter=100):
+    """
+    x[t] = clip(x[t-1] + steps[t], low, high) for every row of `steps`, computed with
+    cumulative sums instead of a Python loop over time.
+
+    The clamps are the pushes a reflected walk needs to stay in [low, high]; each
+    one-sided push is a running max of the barrier violation (Lindley recursion).
+    Lower and upper pushes are refined alternately until neither barrier is crossed.
+    That converges in a few passes for walks with small steps relative to the band
+    (the generator's). Every row is then checked step by step (one vectorized pass)
+    and rows that do not satisfy the recursion, i.e. did not converge within
+    `max_iter`, are recomputed with the exact loop.
+    """
+    free = x0 + np.cumsum(steps, axis=1)
+    push_low = np.zeros_like(free)
+    push_high = np.zeros_like(free)
+    for _ in range(max_iter):
+        new_low = np.maximum.accumulate(np.maximum(low - (free - push_high), 0.0), axis=1)
+        new_high = np.maximum.accumulate(np.maximum((free + new_low) - high, 0.0), axis=1)
+        converged = np.array_equal(new_low, push_low) and np.array_equal(new_high, push_high)
+        push_low, push_high = new_low, new_high
+        if converged:
+            break
+    walk = np.clip(free + push_low - push_high, low, high)
+
+    prev = np.concatenate([np.full((len(walk), 1), x0, dtype=walk.dtype), walk[:, :-1]], axis=1)
+    bad = np.abs(np.clip(prev + steps, low, high) - walk).max(axis=1, initial=0.0) > 1e-9 * (high - low)
+    if bad.any():
+        walk[bad] = clipped_random_walk_loop(x0, steps[bad], low, high)
+    return walk
+
+
+def clipped_random_walk_loop(x0, steps, low, high):
+    """Reference: the step-by-step clip, looping over time (vectorized over rows)."""
+    walk = np.empty_like(steps, dtype=np.float64)
+    x = np.full(len(steps), x0, dtype=np.float64)
+    for t in range(steps.shape[1]):
+        x = np.clip(x + steps[:, t], low, high)
+        walk[:, t] = x
+    return walk
+
 
 # -----------------------
 # Generate synthetic time-series (realistic ranges)
 # -----------------------
-for i in range(1, n_samples):
+def generate_traces(n_cells, n_samples, rng, fault_rate=0.0):
+    i = np.arange(1, n_samples)
+
     # Temperature: slow oscillation + noise
+    temperature = np.empty((n_cells, n_samples))
+    temperature[:, 0] = temp_base
     temp_trend = 25 + 10 * np.sin(i / 200)  # periodic variation
-    temp_noise = np.random.normal(0, 0.2)
-    temperature.append(np.clip(temp_trend + temp_noise, 20, 60))  # clamp range
+    temperature[:, 1:] = np.clip(temp_trend + rng.normal(0, 0.2, (n_cells, n_samples - 1)), 20, 60)
 
     # Voltage: gradual discharge with random noise
-    volt_change = -0.0005 + np.random.normal(0, 0.0005)
-    voltage.append(np.clip(voltage[-1] + volt_change, 3.0, 4.2))
+    volt_steps = -0.0005 + rng.normal(0, 0.0005, (n_cells, n_samples - 1))
+    voltage = np.empty((n_cells, n_samples))
+    voltage[:, 0] = volt_base
+    voltage[:, 1:] = clipped_random_walk(volt_base, volt_steps, 3.0, 4.2)
 
     # Current: small fluctuations within operational limits
-    curr_change = np.random.normal(0, 0.02)
-    current.append(np.clip(current[-1] + curr_change, 0.1, 2.0))
+    curr_steps = rng.normal(0, 0.02, (n_cells, n_samples - 1))
+    current = np.empty((n_cells, n_samples))
+    current[:, 0] = curr_base
+    current[:, 1:] = clipped_random_walk(curr_base, curr_steps, 0.1, 2.0)
 
-# -----------------------
-# Create DataFrame
-# -----------------------
-df = pd.DataFrame({
-    'timestamp': np.arange(n_samples) * dt,
-    'temperature': temperature,
-    'voltage': voltage,
-    'current': current
-})
+    fault = inject_faults(temperature, voltage, current, rng, fault_rate)
+    return temperature, voltage, current, fault
 
-# -----------------------
-# Derived features
-# -----------------------
-df['power'] = df['voltage'] * df['current']
-df['delta_temp'] = df['temperature'].diff().fillna(0)
-df['delta_voltage'] = df['voltage'].diff().fillna(0)
-df['delta_current'] = df['current'].diff().fillna(0)
 
-# -----------------------
-# Next-step targets (y)
-# -----------------------
-df['temperature_next'] = df['temperature'].shift(-1)
-df['voltage_next'] = df['voltage'].shift(-1)
-df['current_next'] = df['current'].shift(-1)
+def inject_faults(temperature, voltage, current, rng, fault_rate):
+    n_cells, n_samples = temperature.shape
+    fault = np.zeros((n_cells, n_samples), dtype=np.int8)
+    if fault_rate <= 0:
+        return fault
+
+    kind = np.where(rng.random(n_cells) < fault_rate, rng.integers(1, len(FAULT_TYPES) + 1, n_cells), 0)
+    onset = rng.integers(0, n_samples, n_cells)
+    duration = rng.integers(50, max(51, n_samples // 4), n_cells)
+    t = np.arange(n_samples)
+    active = (t >= onset[:, None]) & (t < (onset + duration)[:, None])
+    progress = np.clip((t - onset[:, None]) / duration[:, None], 0, 1)
+
+    # Overheating: temperature ramps up to +5..25 °C over the fault
+    hot = active & (kind == 1)[:, None]
+    temperature += np.where(hot, progress * rng.uniform(5, 25, n_cells)[:, None], 0.0)
+    # Voltage sag: sudden 0.3..0.6 V drop
+    sag = active & (kind == 2)[:, None]
+    voltage -= np.where(sag, rng.uniform(0.3, 0.6, n_cells)[:, None], 0.0)
+    # Current spike: +0.5..1.5 A overcurrent
+    spike = active & (kind == 3)[:, None]
+    current += np.where(spike, rng.uniform(0.5, 1.5, n_cells)[:, None], 0.0)
+
+    np.clip(temperature, 20, 60, out=temperature)
+    np.clip(voltage, 3.0, 4.2, out=voltage)
+    np.clip(current, 0.1, 2.0, out=current)
+    fault[hot | sag | spike] = np.broadcast_to(kind[:, None], fault.shape)[hot | sag | spike]
+    return fault
 
-# Remove last row since it has no next-step target
-df = df[:-1]
 
 # -----------------------
-# Save to CSV
+# Derived features + next-step targets
 # -----------------------
-df.to_csv('synthetic_battery_prediction_data.csv', index=False)
-print("✅ Realistic data generated successfully! Here's a preview:")
-print(df.head())
+def build_features(temperature, voltage, current):
+    power = voltage * current
+    deltas = [np.diff(a, axis=1, prepend=a[:, :1]) for a in (temperature, voltage, current)]
+    features = np.stack([temperature, voltage, current, power, *deltas], axis=-1)
+    targets = np.stack([temperature, voltage, current], axis=-1)[:, 1:]
+    # Remove last step since it has no next-step target
+    return features[:, :-1], targets
+
+
+def to_dataframe(features, targets, fault=None):
+    df = pd.DataFrame(features, columns=FEATURE_COLS)
+    df.insert(0, 'timestamp', np.arange(len(df)) * dt)
+    df[TARGET_COLS] = targets
+    if fault is not None:
+        df['fault'] = fault
+    return df
+
+
+def save_binary(features, targets, fault, prefix="battery"):
+    """Write all cells as flat float32 arrays plus per-cell segment lengths (memory-mappable)."""
+    n_cells, n_steps = features.shape[:2]
+    np.save(f"{prefix}_features.npy", features.reshape(-1, features.shape[-1]).astype(np.float32))
+    np.save(f"{prefix}_targets.npy", targets.reshape(-1, targets.shape[-1]).astype(np.float32))
+    np.save(f"{prefix}_faults.npy", fault[:, :-1].reshape(-1))
+    np.save(f"{prefix}_segments.npy", np.full(n_cells, n_steps, dtype=np.int64))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(seed)
+    t0 = time.perf_counter()
+    temperature, voltage, current, fault = generate_traces(n_cells, n_samples, rng, fault_rate)
+    features, targets = build_features(temperature, voltage, current)
+    elapsed = time.perf_counter() - t0
+    print(f"⏱️ Generated {n_cells} cell(s) × {n_samples} steps in {elapsed:.2f} s")
+
+    if save_csv:
+        df = to_dataframe(features[0], targets[0], fault[0, :-1] if fault_rate > 0 else None)
+        df.to_csv('synthetic_battery_prediction_data.csv', index=False)
+        print("✅ Realistic data generated successfully! Here's a preview:")
+        print(df.head())
+
+    if save_npy:
+        save_binary(features, targets, fault)
+        print(f"✅ Binary dataset saved: battery_features.npy {features.shape[0] * features.shape[1]} rows")
@@ -0,0 +1,244 @@
+import os
+import time
+import pickle
+import argparse
+import tempfile
+import numpy as np
+import torch
+import torch.nn as nn
+try:
+    from instrumentation import timed
+except ImportError:  # instrumentation.py sits at the repo root; without it the hooks are no-ops
+    def timed(name=None, **labels):
+        return lambda fn: fn
+
+# -----------------------
+# Paths (relative to this folder)
+# -----------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PARAMS_PATH = os.path.join(BASE_DIR, "model_params_gru.pkl")
+WEIGHTS_PATH = os.path.join(BASE_DIR, "best_gru_model.pth")
+SCALER_X_PATH = os.path.join(BASE_DIR, "scaler_X_gru.pkl")
+SCALER_Y_PATH = os.path.join(BASE_DIR, "scaler_y_gru.pkl")
+DATA_PATH = os.path.join(BASE_DIR, "synthetic_battery_prediction_data.csv")
+
+FEATURE_COLS = ['temperature', 'voltage', 'current', 'power', 'delta_temp', 'delta_voltage', 'delta_current']
+TARGET_COLS = ['temperature_next', 'voltage_next', 'current_next']
+
+DROPOUT_RATE = 0.35
+
+
+# ============================================================
+# MODEL DEFINITION (same as train_gru_model.ipynb)
+# ============================================================
+class BatteryGRU(nn.Module):
+    def __init__(self, input_size, hidden_size, num_layers, output_size, dropout=0.3, bidirectional=False):
+        super(BatteryGRU, self).__init__()
+        self.bidirectional = bidirectional
+        self.gru = nn.GRU(
+            input_size,
+            hidden_size,
+            num_layers,
+            batch_first=True,
+            dropout=dropout if num_layers > 1 else 0,
+            bidirectional=bidirectional
+        )
+        gru_output_size = hidden_size * 2 if bidirectional else hidden_size
+        self.dropout1 = nn.Dropout(dropout)
+        self.fc1 = nn.Linear(gru_output_size, gru_output_size // 2)
+        self.dropout2 = nn.Dropout(dropout * 0.8)
+        self.fc2 = nn.Linear(gru_output_size // 2, output_size)
+
+    def forward(self, x):
+        out, _ = self.gru(x)          # out: [batch, seq_len, hidden]
+        out = out[:, -1, :]            # take last timestep
+        out = self.dropout1(out)
+        out = self.fc1(out)
+        out = torch.relu(out)
+        out = self.dropout2(out)
+        out = self.fc2(out)
+        return out
+
+
+# ============================================================
+# LOADING HELPERS
+# ============================================================
+def load_model_params(params_path=PARAMS_PATH):
+    with open(params_path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_scalers(scaler_x_path=SCALER_X_PATH, scaler_y_path=SCALER_Y_PATH):
+    with open(scaler_x_path, "rb") as f:
+        scaler_X = pickle.load(f)
+    with open(scaler_y_path, "rb") as f:
+        scaler_y = pickle.load(f)
+    return scaler_X, scaler_y
+
+
+def load_battery_gru(weights_path=WEIGHTS_PATH, params_path=PARAMS_PATH):
+    """Rebuild BatteryGRU from model_params_gru.pkl and load trained weights (eval mode, CPU)."""
+    params = load_model_params(params_path)
+    model = BatteryGRU(
+        input_size=params['input_size'],
+        hidden_size=params['hidden_size'],
+        num_layers=params['num_layers'],
+        output_size=params['output_size'],
+        dropout=DROPOUT_RATE
+    )
+    model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+    model.eval()
+    return model
+
+
+# ============================================================
+# CPU RUNTIME CONFIGURATION
+# ============================================================
+def configure_cpu(num_threads=1, interop_threads=1):
+    # Pin thread counts so latency stays predictable on a Pi-class CPU.
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        # Can only be set once, before any parallel work has started
+        pass
+
+
+def quantize_dynamic_int8(model):
+    """Dynamic int8 quantization of the GRU and Linear layers (weights int8, activations float)."""
+    return torch.ao.quantization.quantize_dynamic(
+        model, {nn.GRU, nn.Linear}, dtype=torch.qint8
+    )
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+def export_torchscript(model, output_path, seq_length=10):
+    example = torch.zeros(1, seq_length, model.gru.input_size)
+    with torch.inference_mode():
+        scripted = torch.jit.trace(model, example)
+    scripted = torch.jit.freeze(scripted.eval())
+    scripted.save(output_path)
+    return output_path
+
+
+def load_torchscript(path):
+    return torch.jit.load(path, map_location="cpu").eval()
+
+
+def export_onnx(model, output_path, seq_length=10, opset=17):
+    example = torch.zeros(1, seq_length, model.gru.input_size)
+    torch.onnx.export(
+        model, (example,), output_path,
+        input_names=["x"],
+        output_names=["y"],
+        dynamic_axes={"x": {0: "batch"}, "y": {0: "batch"}},
+        opset_version=opset,
+        dynamo=False
+    )
+    return output_path
+
+
+def load_onnx_session(path, num_threads=1):
+    # onnxruntime is optional: only needed for the ONNX path
+    import onnxruntime as ort
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = num_threads
+    opts.inter_op_num_threads = 1
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+
+
+# ============================================================
+# INFERENCE
+# ============================================================
+@timed("inference", model="battery_gru")
+def predict_sequences(model, X_scaled, scaler_y=None):
+    """Run a (batch, seq_len, features) scaled array through the model; optionally inverse-scale."""
+    with torch.inference_mode():
+        out = model(torch.as_tensor(X_scaled, dtype=torch.float32)).numpy()
+    if scaler_y is not None:
+        out = scaler_y.inverse_transform(out)
+    return out
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+def benchmark(fn, x, n_runs=500, warmup=50):
+    for _ in range(warmup):
+        fn(x)
+    times = np.empty(n_runs)
+    for i in range(n_runs):
+        t0 = time.perf_counter()
+        fn(x)
+        times[i] = time.perf_counter() - t0
+    batch = x.shape[0]
+    return {
+        "mean_ms": float(times.mean() * 1e3),
+        "p50_ms": float(np.percentile(times, 50) * 1e3),
+        "p99_ms": float(np.percentile(times, 99) * 1e3),
+        "seq_per_s": float(batch / times.mean()),
+    }
+
+
+def run_benchmark(num_threads=1, batch_sizes=(1, 32), n_runs=500, out_dir=None):
+    """Export, parity-check and time every backend; exports go to out_dir, else a temporary directory."""
+    if out_dir is None:
+        with tempfile.TemporaryDirectory(prefix="battery_gru_") as tmp:
+            return run_benchmark(num_threads, batch_sizes, n_runs, tmp)
+    os.makedirs(out_dir, exist_ok=True)
+    configure_cpu(num_threads)
+    params = load_model_params()
+    seq_length = params['seq_length']
+
+    eager = load_battery_gru()
+    quantized = quantize_dynamic_int8(load_battery_gru())
+
+    ts_path = export_torchscript(eager, os.path.join(out_dir, "battery_gru_model.ts"), seq_length)
+    scripted = load_torchscript(ts_path)
+
+    def run_torch(m):
+        def fn(x):
+            with torch.inference_mode():
+                return m(x)
+        return fn
+
+    runners = {
+        "eager": run_torch(eager),
+        "torchscript": run_torch(scripted),
+        "eager_int8": run_torch(quantized),
+    }
+
+    try:
+        onnx_path = export_onnx(eager, os.path.join(out_dir, "battery_gru_model.onnx"), seq_length)
+        session = load_onnx_session(onnx_path, num_threads)
+        runners["onnxruntime"] = lambda x: session.run(None, {"x": x.numpy()})
+    except ImportError:
+        print("⚠️ onnx/onnxruntime not installed — skipping ONNX benchmark")
+
+    # Parity check against the eager model
+    x_check = torch.rand(8, seq_length, params['input_size'])
+    ref = run_torch(eager)(x_check).numpy()
+    for name, fn in runners.items():
+        out = fn(x_check)
+        out = out[0] if isinstance(out, list) else out.numpy()
+        print(f"🔎 {name:12s} max |Δ| vs eager = {np.abs(out - ref).max():.2e}")
+
+    print(f"\n⏱️ CPU latency (threads={num_threads})")
+    results = {}
+    for batch in batch_sizes:
+        x = torch.rand(batch, seq_length, params['input_size'])
+        for name, fn in runners.items():
+            r = benchmark(fn, x, n_runs=n_runs)
+            results[(name, batch)] = r
+            print(f"  batch={batch:3d} {name:12s} mean={r['mean_ms']:.3f} ms  "
+                  f"p99={r['p99_ms']:.3f} ms  {r['seq_per_s']:,.0f} seq/s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export and benchmark the battery GRU backends")
+    parser.add_argument("--out", default=None, help="keep battery_gru_model.ts/.onnx here (default: temporary)")
+    run_benchmark(out_dir=parser.parse_args().out)
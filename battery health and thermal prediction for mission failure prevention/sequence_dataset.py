@@ -0,0 +1,203 @@
+import os
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import Dataset, DataLoader, TensorDataset
+from sklearn.preprocessing import MinMaxScaler
+
+from gru_inference import DATA_PATH, FEATURE_COLS, TARGET_COLS
+
+
+# ============================================================
+# REFERENCE: LIST-BASED SEQUENCES (train_gru_model.ipynb)
+# ============================================================
+def create_sequences(X, y, seq_length):
+    X_seq, y_seq = [], []
+    for i in range(len(X) - seq_length):
+        X_seq.append(X[i:i+seq_length])
+        y_seq.append(y[i+seq_length])
+    return np.array(X_seq), np.array(y_seq)
+
+
+# ============================================================
+# ZERO-COPY SLIDING-WINDOW DATASET
+# ============================================================
+class SlidingWindowDataset(Dataset):
+    """
+    Windows of `seq_length` rows over a single contiguous feature buffer.
+
+    Sample i is (X[i:i+seq_length], y[i+seq_length]), the same pairs as
+    create_sequences, but every window is a view into the buffer:
+        - in-memory arrays: torch.Tensor.unfold over one float32 tensor
+        - memory-mapped .npy: numpy sliding_window_view, pages read on access
+    Only the DataLoader's collate step copies, one batch at a time.
+
+    `segment_lengths` marks independent traces stored back to back (e.g. the
+    cells written by generate_data_prediction.py); windows never cross them.
+    Fitted scalers are applied on the fly for memory-mapped (unscaled) data.
+    """
+
+    def __init__(self, X, y, seq_length, segment_lengths=None, scaler_X=None, scaler_y=None):
+        if len(X) != len(y):
+            raise ValueError(f"X and y lengths differ: {len(X)} != {len(y)}")
+        self.seq_length = seq_length
+        self.memmapped = isinstance(X, np.memmap)
+
+        if segment_lengths is None:
+            self.starts = np.arange(max(len(X) - seq_length, 0))
+        else:
+            if int(np.sum(segment_lengths)) != len(X):
+                raise ValueError("segment_lengths must sum to the number of rows")
+            offsets = np.concatenate([[0], np.cumsum(segment_lengths)[:-1]])
+            self.starts = np.concatenate([
+                off + np.arange(max(int(m) - seq_length, 0)) for off, m in zip(offsets, segment_lengths)
+            ]).astype(np.int64)
+        self.length = len(self.starts)
+        n_windows = max(len(X) - seq_length, 0)
+
+        if self.memmapped:
+            # Read-only mapping: keep numpy views, scale + convert per access
+            self.x_affine = None if scaler_X is None else (scaler_X.scale_, scaler_X.min_)
+            self.y_affine = None if scaler_y is None else (scaler_y.scale_, scaler_y.min_)
+            windows = np.lib.stride_tricks.sliding_window_view(X, seq_length, axis=0)
+            self.X_windows = windows.transpose(0, 2, 1)[:n_windows]
+            self.y = y[seq_length:]
+        else:
+            X = np.asarray(X, dtype=np.float32)
+            y = np.asarray(y, dtype=np.float32)
+            if scaler_X is not None:
+                X = scaler_X.transform(X)
+            if scaler_y is not None:
+                y = scaler_y.transform(y)
+            X_t = torch.as_tensor(np.ascontiguousarray(X, dtype=np.float32))
+            y_t = torch.as_tensor(np.ascontiguousarray(y, dtype=np.float32))
+            # unfold → (n_windows, n_features, seq_length); transpose to (n_windows, seq_length, n_features)
+            self.X_windows = X_t.unfold(0, seq_length, 1).transpose(1, 2)[:n_windows]
+            self.y = y_t[seq_length:]
+
+    @classmethod
+    def from_npy(cls, X_path, y_path, seq_length, segments_path=None, scaler_X=None, scaler_y=None):
+        """Open float32 .npy files as memory maps (no parsing, no full load)."""
+        X = np.load(X_path, mmap_mode="r")
+        y = np.load(y_path, mmap_mode="r")
+        segment_lengths = None if segments_path is None else np.load(segments_path)
+        return cls(X, y, seq_length, segment_lengths, scaler_X, scaler_y)
+
+    def __len__(self):
+        return self.length
+
+    @staticmethod
+    def _to_tensor(a, affine):
+        a = np.asarray(a, dtype=np.float32)
+        if affine is not None:
+            a = (a * affine[0] + affine[1]).astype(np.float32)
+        elif not a.flags.writeable:
+            a = a.copy()  # window views of the read-only mapping: torch needs writable memory
+        return torch.from_numpy(np.ascontiguousarray(a))
+
+    def __getitem__(self, idx):
+        start = self.starts[idx]
+        if self.memmapped:
+            return (self._to_tensor(self.X_windows[start], self.x_affine),
+                    self._to_tensor(self.y[start], self.y_affine))
+        return self.X_windows[start], self.y[start]
+
+    def get_batch(self, indices):
+        """Gather a whole batch with one fancy-index copy (faster than per-item collate)."""
+        starts = self.starts[np.asarray(indices)]
+        if self.memmapped:
+            return (self._to_tensor(self.X_windows[starts], self.x_affine),
+                    self._to_tensor(self.y[starts], self.y_affine))
+        idx = torch.from_numpy(starts)
+        return self.X_windows[idx], self.y[idx]
+
+
+def fit_minmax_scalers(X_path, y_path, chunk_rows=1_000_000):
+    """Fit MinMaxScalers over memory-mapped .npy files chunk by chunk (bounded RAM)."""
+    X = np.load(X_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r")
+    scaler_X, scaler_y = MinMaxScaler(), MinMaxScaler()
+    for i in range(0, len(X), chunk_rows):
+        scaler_X.partial_fit(X[i:i + chunk_rows])
+        scaler_y.partial_fit(y[i:i + chunk_rows])
+    return scaler_X, scaler_y
+
+
+# ============================================================
+# COMPARISON: MEMORY + THROUGHPUT
+# ============================================================
+def _epoch_time(loader):
+    t0 = time.perf_counter()
+    n = 0
+    for xb, _ in loader:
+        n += xb.shape[0]
+    return time.perf_counter() - t0, n
+
+
+if __name__ == "__main__":
+    seq_length = 10
+    df = pd.read_csv(DATA_PATH)
+    X_scaled = MinMaxScaler().fit_transform(df[FEATURE_COLS])
+    y_scaled = MinMaxScaler().fit_transform(df[TARGET_COLS])
+
+    # Long history: tile the dataset so differences are measurable
+    reps = 100
+    X_long = np.tile(X_scaled, (reps, 1))
+    y_long = np.tile(y_scaled, (reps, 1))
+
+    # --- List-based sequences + TensorDataset
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    X_seq, y_seq = create_sequences(X_long, y_long, seq_length)
+    ref_dataset = TensorDataset(torch.tensor(X_seq, dtype=torch.float32), torch.tensor(y_seq, dtype=torch.float32))
+    build_ref = time.perf_counter() - t0
+    peak_ref = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # --- Windowed views
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    win_dataset = SlidingWindowDataset(X_long, y_long, seq_length)
+    build_win = time.perf_counter() - t0
+    peak_win = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # --- Identical batches (same shuffle order)
+    loaders = [
+        DataLoader(ds, batch_size=32, shuffle=True, generator=torch.Generator().manual_seed(0))
+        for ds in (ref_dataset, win_dataset)
+    ]
+    for (xa, ya), (xb, yb) in zip(*loaders):
+        assert torch.equal(xa, xb) and torch.equal(ya, yb)
+    print(f"✅ Identical batches over {len(win_dataset):,} windows")
+
+    # --- Memory-mapped variant
+    tmp_dir = tempfile.TemporaryDirectory()
+    X_path = os.path.join(tmp_dir.name, "X_scaled.npy")
+    y_path = os.path.join(tmp_dir.name, "y_scaled.npy")
+    np.save(X_path, X_long.astype(np.float32))
+    np.save(y_path, y_long.astype(np.float32))
+    mm_dataset = SlidingWindowDataset.from_npy(X_path, y_path, seq_length)
+    xm, ym = mm_dataset.get_batch(np.arange(0, 64))
+    assert torch.equal(xm, ref_dataset.tensors[0][:64]) and torch.equal(ym, ref_dataset.tensors[1][:64])
+    print("✅ Memory-mapped windows match")
+
+    print(f"\n📦 create_sequences: build {build_ref:.2f} s, peak {peak_ref / 1e6:.1f} MB")
+    print(f"📦 SlidingWindow   : build {build_win * 1e3:.2f} ms, peak {peak_win / 1e6:.1f} MB")
+
+    for name, ds in [("TensorDataset", ref_dataset), ("SlidingWindow", win_dataset), ("SlidingWindow mmap", mm_dataset)]:
+        elapsed, n = _epoch_time(DataLoader(ds, batch_size=32, shuffle=True))
+        print(f"⏱️ {name:18s} epoch: {elapsed:.2f} s ({n / elapsed:,.0f} windows/s)")
+
+    t0 = time.perf_counter()
+    perm = np.random.permutation(len(win_dataset))
+    for i in range(0, len(perm), 32):
+        win_dataset.get_batch(perm[i:i + 32])
+    elapsed = time.perf_counter() - t0
+    print(f"⏱️ SlidingWindow get_batch epoch: {elapsed:.2f} s ({len(perm) / elapsed:,.0f} windows/s)")
+
+    del mm_dataset
+    tmp_dir.cleanup()
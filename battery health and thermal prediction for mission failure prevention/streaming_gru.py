@@ -0,0 +1,178 @@
+import time
+import numpy as np
+import pandas as pd
+import torch
+
+from gru_inference import (
+    load_battery_gru, load_scalers, load_model_params, configure_cpu, DATA_PATH, FEATURE_COLS
+)
+try:
+    from instrumentation import timed
+except ImportError:  # instrumentation.py sits at the repo root; without it the hooks are no-ops
+    def timed(name=None, **labels):
+        return lambda fn: fn
+
+
+# ============================================================
+# STREAMING BATTERY GRU
+# ============================================================
+class StreamingBatteryGRU:
+    """
+    Live battery forecaster that consumes one telemetry sample per call.
+
+    Modes:
+        - "exact":    seq_length staggered hidden states are advanced together in one
+                      batched GRU step. Each call emits the prediction of the window
+                      ending at this sample, identical to the trained 10-step model.
+        - "stateful": a single hidden state is carried forever (cheapest, batch=1).
+                      Every `rewindow_every` samples the state is rebuilt from the
+                      last seq_length samples so it does not drift from training.
+    """
+
+    def __init__(self, model=None, scaler_X=None, scaler_y=None, seq_length=None,
+                 mode="exact", rewindow_every=None):
+        if mode not in ("exact", "stateful"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if model is None:
+            model = load_battery_gru()
+        if scaler_X is None or scaler_y is None:
+            scaler_X, scaler_y = load_scalers()
+        if seq_length is None:
+            seq_length = load_model_params()['seq_length']
+
+        self.model = model.eval()
+        self.seq_length = seq_length
+        self.mode = mode
+        self.rewindow_every = rewindow_every
+
+        # MinMaxScaler as plain affine transforms (avoids sklearn call overhead per sample)
+        self.x_scale = scaler_X.scale_.astype(np.float32)
+        self.x_min = scaler_X.min_.astype(np.float32)
+        self.y_scale = scaler_y.scale_
+        self.y_min = scaler_y.min_
+
+        gru = self.model.gru
+        self.num_layers = gru.num_layers
+        self.hidden_size = gru.hidden_size
+        self.reset()
+
+    def reset(self):
+        n_states = self.seq_length if self.mode == "exact" else 1
+        self.h = torch.zeros(self.num_layers, n_states, self.hidden_size)
+        # Ring buffer of the last seq_length scaled feature vectors
+        self.window = np.zeros((self.seq_length, len(self.x_scale)), dtype=np.float32)
+        self.prev = None
+        self.n_seen = 0
+
+    # --------------------------------------------------------
+    # Incremental feature derivation (matches generate_data_prediction.py)
+    # --------------------------------------------------------
+    def _features(self, temperature, voltage, current):
+        if self.prev is None:
+            deltas = (0.0, 0.0, 0.0)   # diff().fillna(0) on the first row
+        else:
+            deltas = (temperature - self.prev[0], voltage - self.prev[1], current - self.prev[2])
+        self.prev = (temperature, voltage, current)
+        x = np.array([temperature, voltage, current, voltage * current, *deltas], dtype=np.float32)
+        return x * self.x_scale + self.x_min
+
+    def _head(self, last_hidden):
+        m = self.model
+        out = torch.relu(m.fc1(last_hidden))
+        return m.fc2(out).numpy()
+
+    def _inverse_y(self, y_scaled):
+        return (y_scaled - self.y_min) / self.y_scale
+
+    def rewindow(self):
+        """Rebuild the stateful hidden state from the buffered window (one full 10-step pass)."""
+        if self.mode != "stateful":
+            return
+        n = min(self.n_seen, self.seq_length)
+        # Ring buffer → chronological order
+        idx = (np.arange(self.n_seen - n, self.n_seen)) % self.seq_length
+        window = torch.from_numpy(self.window[idx][None])
+        with torch.inference_mode():
+            _, self.h = self.model.gru(window)
+
+    # --------------------------------------------------------
+    # One sample in → one forecast out
+    # --------------------------------------------------------
+    @timed("inference", model="battery_gru_streaming")
+    def update(self, temperature, voltage, current):
+        """
+        Push one telemetry sample. Returns [temperature_next, voltage_next, current_next]
+        in physical units, or None until seq_length samples have been seen.
+        """
+        x = self._features(temperature, voltage, current)
+        self.window[self.n_seen % self.seq_length] = x
+        self.n_seen += 1
+
+        with torch.inference_mode():
+            if self.mode == "exact":
+                # State k started k samples ago (mod seq_length); reset the slot that
+                # begins a new window at this sample before stepping.
+                slot = (self.n_seen - 1) % self.seq_length
+                self.h[:, slot] = 0.0
+                x_t = torch.from_numpy(np.broadcast_to(x, (self.seq_length, 1, x.size)).copy())
+                out, self.h = self.model.gru(x_t, self.h)
+                if self.n_seen < self.seq_length:
+                    return None
+                # The slot started seq_length-1 samples ago has seen exactly one full window
+                done = self.n_seen % self.seq_length
+                y = self._head(out[done:done + 1, -1])
+            else:
+                out, self.h = self.model.gru(torch.from_numpy(x[None, None]), self.h)
+                if self.rewindow_every and self.n_seen % self.rewindow_every == 0:
+                    self.rewindow()
+                    out = self.h[-1][:, None]
+                if self.n_seen < self.seq_length:
+                    return None
+                y = self._head(out[:, -1])
+
+        return self._inverse_y(y[0])
+
+
+# ============================================================
+# COMPARISON AGAINST THE WINDOWED MODEL
+# ============================================================
+def windowed_predictions(model, scaler_X, scaler_y, df, seq_length):
+    X = scaler_X.transform(df[FEATURE_COLS].values).astype(np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view(X, seq_length, axis=0).transpose(0, 2, 1)
+    with torch.inference_mode():
+        y = model(torch.from_numpy(np.ascontiguousarray(windows))).numpy()
+    return scaler_y.inverse_transform(y)
+
+
+if __name__ == "__main__":
+    configure_cpu(num_threads=1)
+    df = pd.read_csv(DATA_PATH)
+    model = load_battery_gru()
+    scaler_X, scaler_y = load_scalers()
+    seq_length = load_model_params()['seq_length']
+
+    ref = windowed_predictions(model, scaler_X, scaler_y, df, seq_length)
+    samples = df[['temperature', 'voltage', 'current']].values
+
+    for mode, rewindow_every in [("exact", None), ("stateful", None), ("stateful", seq_length)]:
+        stream = StreamingBatteryGRU(model, scaler_X, scaler_y, seq_length, mode, rewindow_every)
+        preds = []
+        t0 = time.perf_counter()
+        for t, v, c in samples:
+            y = stream.update(t, v, c)
+            if y is not None:
+                preds.append(y)
+        elapsed = time.perf_counter() - t0
+        preds = np.array(preds)
+        err = np.abs(preds - ref).max(axis=0)
+        print(f"📡 mode={mode:8s} rewindow={rewindow_every}: {elapsed / len(samples) * 1e6:.0f} µs/sample, "
+              f"max |Δ| vs windowed = T {err[0]:.4f} °C, V {err[1]:.5f} V, I {err[2]:.5f} A")
+
+    # Baseline: recompute the whole 10-step window for every new sample
+    X = scaler_X.transform(df[FEATURE_COLS].values).astype(np.float32)
+    t0 = time.perf_counter()
+    with torch.inference_mode():
+        for i in range(seq_length, len(X) + 1):
+            model(torch.from_numpy(X[None, i - seq_length:i]))
+    elapsed = time.perf_counter() - t0
+    print(f"🐢 full-window recompute: {elapsed / len(samples) * 1e6:.0f} µs/sample")
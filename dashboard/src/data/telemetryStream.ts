@@ -0,0 +1,116 @@
+// Live telemetry from the Python backend (telemetry_server.py at the repo root)
+// Receives a full snapshot on connect, then batches of delta frames (changed leaf paths)
+
+import type { CubeSatTelemetry } from '@/types'
+
+// e.g. ws://localhost:8765/ws (WebSocket) or http://localhost:8765/events (SSE); empty = simulated data
+export const TELEMETRY_STREAM_URL = process.env.NEXT_PUBLIC_TELEMETRY_URL ?? ''
+
+const RECONNECT_DELAY = 2000 // ms
+
+type WireTree = Record<string, unknown>
+
+interface DeltaFrame {
+  seq: number
+  set: Record<string, unknown>
+}
+
+type StreamMessage =
+  | { type: 'full'; seq: number; data: WireTree }
+  | { type: 'delta'; seq: number; frames: DeltaFrame[] }
+
+// Write every changed leaf path ("powerSystem.batteryLevel") into the wire snapshot
+const applyDelta = (tree: WireTree, changes: Record<string, unknown>) => {
+  for (const [path, value] of Object.entries(changes)) {
+    const keys = path.split('.')
+    const leaf = keys.pop() as string
+    let node = tree
+    for (const key of keys) {
+      if (typeof node[key] !== 'object' || node[key] === null) node[key] = {}
+      node = node[key] as WireTree
+    }
+    node[leaf] = value
+  }
+}
+
+// Wire format carries dates as ISO 8601 strings
+const toTelemetry = (tree: WireTree): CubeSatTelemetry => {
+  const data = structuredClone(tree) as unknown as CubeSatTelemetry
+  data.communicationSystem.lastContact = new Date(data.communicationSystem.lastContact)
+  data.aiRepairModule.anomaliesDetected = data.aiRepairModule.anomaliesDetected.map((a) => ({
+    ...a,
+    time: new Date(a.time),
+  }))
+  data.lastUpdated = new Date(data.lastUpdated)
+  return data
+}
+
+/**
+ * Follow the telemetry stream; returns a function that closes it.
+ * A gap in the frame sequence triggers a resync (full snapshot).
+ */
+export const connectTelemetryStream = (
+  url: string,
+  callback: (data: CubeSatTelemetry) => void
+) => {
+  let state: WireTree | null = null
+  let seq = 0
+  let closed = false
+  let socket: WebSocket | EventSource | null = null
+  let retry: ReturnType<typeof setTimeout> | null = null
+
+  // Returns false when frames were lost and a full snapshot is needed
+  const handle = (message: StreamMessage) => {
+    if (message.type === 'full') {
+      state = message.data
+      seq = message.seq
+    } else {
+      if (!state) return true
+      for (const frame of message.frames) {
+        if (frame.seq <= seq) continue
+        if (frame.seq !== seq + 1) return false
+        applyDelta(state, frame.set)
+        seq = frame.seq
+      }
+    }
+    callback(toTelemetry(state))
+    return true
+  }
+
+  const reconnect = () => {
+    if (closed || retry) return
+    retry = setTimeout(() => {
+      retry = null
+      open()
+    }, RECONNECT_DELAY)
+  }
+
+  const open = () => {
+    if (url.startsWith('ws')) {
+      const ws = new WebSocket(url)
+      ws.onmessage = (event) => {
+        if (!handle(JSON.parse(event.data))) ws.send('resync')
+      }
+      ws.onclose = reconnect
+      socket = ws
+    } else {
+      // EventSource reconnects by itself; the server sends a full snapshot on every connect
+      const source = new EventSource(url)
+      source.onmessage = (event) => {
+        if (!handle(JSON.parse(event.data))) {
+          source.close()
+          state = null
+          open()
+        }
+      }
+      socket = source
+    }
+  }
+
+  open()
+  return () => {
+    closed = true
+    if (retry) clearTimeout(retry)
+    socket?.close()
+  }
+}
@@ -8,10 +8,12 @@ import {
   startTelemetryUpdates,
   stopTelemetryUpdates,
 } from '@/data/cubesatData'
+import { TELEMETRY_STREAM_URL, connectTelemetryStream } from '@/data/telemetryStream'
 import { TELEMETRY_UPDATE_INTERVAL } from '@/lib/constants'
 
 /**
  * Hook to manage real-time telemetry data
+ * (streamed from telemetry_server.py when NEXT_PUBLIC_TELEMETRY_URL is set, simulated otherwise)
  */
 export const useTelemetry = () => {
   const [telemetryData, setTelemetryData] = useState<CubeSatTelemetry>(
@@ -22,6 +24,10 @@ export const useTelemetry = () => {
   useEffect(() => {
     if (!isLive) return
 
+    if (TELEMETRY_STREAM_URL) {
+      return connectTelemetryStream(TELEMETRY_STREAM_URL, setTelemetryData)
+    }
+
     const updateInterval = startTelemetryUpdates((newData) => {
       setTelemetryData(newData)
     })
@@ -36,6 +42,7 @@ export const useTelemetry = () => {
   }, [])
 
   const refresh = useCallback(() => {
+    if (TELEMETRY_STREAM_URL) return // the stream is already live
     const newData = generateTelemetry()
     setTelemetryData(newData)
   }, [])
@@ -49,12 +49,28 @@ export interface MissionSummary {
   repairedAnomalies: number
 }
 
+// Onboard model outputs (only sent by the Python telemetry server; null until the first result)
+export interface ModelPredictions {
+  powerNext720s: number | null // Watts, XGBoost power predictor
+  battery: {
+    temperatureNext: number | null // °C, battery GRU
+    voltageNext: number | null // V
+    currentNext: number | null // A
+  }
+  faultProbability: number | null // 0-1, FDIR detector
+  link: {
+    canSendAll: boolean | null
+    compressionRatio: number | null
+  }
+}
+
 export interface CubeSatTelemetry {
   powerSystem: PowerSystem
   thermalSystem: ThermalSystem
   communicationSystem: CommunicationSystem
   aiRepairModule: AIRepairModule
   missionSummary: MissionSummary
+  predictions?: ModelPredictions
   lastUpdated: Date
 }
 
@@ -0,0 +1,536 @@
+"""
+Unified onboard health monitor: one process, one telemetry bus, every model.
+
+Telemetry is ingested once into per-channel ring buffers in shared memory
+(TelemetryBus). Each model runs as a ModelTask on its own asyncio cadence and reads
+only what it needs from its channel: the newest rows, or every row since its last
+run. Light models run inline on the event loop, heavy ones in a thread or in a
+dedicated worker process that attaches to the same shared memory (no telemetry is
+pickled). Results are published to subscribers, and per-task latency, queue depth,
+drops and overruns show whether the loop keeps real time.
+
+    monitor = HealthMonitor(default_tasks())
+    metrics = asyncio.run(monitor.run(source))   # source: async iterator of {channel: row}
+"""
+import os
+import sys
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FDIR_DIR = os.path.join(BASE_DIR, "FDIR_VF", "anomaly_detection")
+BATTERY_DIR = os.path.join(BASE_DIR, "battery health and thermal prediction for mission failure prevention")
+CUBESAT_DIR = os.path.join(BASE_DIR, "CubeSat")
+POWER_DIR = os.path.join(BASE_DIR, "power")
+LINK_DIR = os.path.join(BASE_DIR, "Data compressing")
+for _d in (FDIR_DIR, BATTERY_DIR, CUBESAT_DIR):
+    if _d not in sys.path:
+        sys.path.append(_d)
+
+from tree_inference import load_ensemble  # noqa: E402
+
+POWER_MODEL_PATH = os.path.join(POWER_DIR, "xgboost_power_predictor_optimized.trees.npz")
+CAN_SEND_MODEL_PATH = os.path.join(LINK_DIR, "xgboost_can_send_all_model.trees.npz")
+RATIO_MODEL_PATH = os.path.join(LINK_DIR, "xgboost_recommended_compression_ratio_model.trees.npz")
+
+# Field layout of every bus channel (model input columns, in model order)
+CHANNELS = {
+    "power": ["orb_phase", "eclipse_flag", "sun_incidence_cos", "solar_irradiance_Wm2", "panel_temp_C",
+              "P_panel_pred", "mppt_eff", "payload_flag", "P_payload_pred", "P_base_pred", "SoC",
+              "P_panel_pred_rolling_mean", "P_panel_pred_rolling_std", "panel_temp_C_rolling_mean",
+              "irradiance_x_mppt"],
+    "battery": ["temperature", "voltage", "current"],
+    "fdir": ["Gx", "Gy", "Gz", "Ax", "Ay", "Az", "MagX", "MagY", "MagZ", "Temp_cpu", "Temp_batt",
+             "Temp_panels", "V_batt", "I_batt", "V_solar", "I_solar", "ADC", "Temp_BMP", "Press_BMP", "Light"],
+    "attitude": ["wx", "wy", "wz", "Bx", "By", "Bz"],
+    "link": ["pass_duration_s", "max_elevation_deg", "mean_elevation_deg", "range_km_at_max", "mean_range_km",
+             "doppler_rate_hz_s", "tx_freq_hz", "tx_power_dbm", "antenna_gain_tx_db", "antenna_gain_rx_db",
+             "pointing_error_deg", "modem_bandwidth_hz", "modem_modcod", "recent_mean_snr_db",
+             "recent_snr_std_db", "last_pass_packet_loss", "battery_voltage_v", "pa_temperature_C",
+             "payload_size_bytes", "payload_priority_pct", "local_time_of_day", "day_of_year",
+             "rain_rate_mmhr_at_GS", "cloud_cover_pct", "TEC_total", "kp_index", "rfi_flag", "snr_mean",
+             "snr_min", "snr_max", "snr_std", "snr_p10", "snr_p25", "snr_p50", "snr_p75", "snr_p90",
+             "fade_count", "outage_time_s", "snr_slope", "pass_start_ts", "pass_end_ts"],
+}
+# Link-model fields data_generation.py only writes for its aggregated passes, not for the
+# time-series passes the monitor replays: fed as 0, like non-numeric fields in train_XGBoost.py
+TS_PASS_ABSENT = ["mean_elevation_deg", "range_km_at_max", "mean_range_km", "doppler_rate_hz_s",
+                  "antenna_gain_tx_db", "antenna_gain_rx_db", "pointing_error_deg", "modem_modcod",
+                  "recent_snr_std_db", "last_pass_packet_loss", "payload_priority_pct", "local_time_of_day",
+                  "day_of_year", "cloud_cover_pct", "TEC_total", "kp_index", "rfi_flag", "pass_start_ts",
+                  "pass_end_ts"]
+
+
+def link_features(passes, absent=TS_PASS_ABSENT):
+    """
+    The CHANNELS["link"] columns of a pass table, in model order. Only columns listed in
+    `absent` may be missing (they are set to 0); any other missing column raises ValueError.
+    """
+    missing = [c for c in CHANNELS["link"] if c not in passes.columns]
+    unexpected = [c for c in missing if c not in absent]
+    if unexpected:
+        raise ValueError(f"pass table is missing link model columns {unexpected}")
+    return passes.assign(**dict.fromkeys(missing, 0))[CHANNELS["link"]]
+
+
+# ============================================================
+# SHARED-MEMORY TELEMETRY BUS
+# ============================================================
+class TelemetryBus:
+    """
+    Single-writer ring buffer of float64 records in shared memory.
+
+    Layout: two int64 counters, then `capacity` rows of [timestamp, *fields]: the
+    sequence counter (records ever written) and the reservation (records the writer has
+    started, bumped before it touches any row). Record k lives in row k % capacity, so
+    readers address data by sequence number and can tell when the writer has lapped them
+    (dropped samples) or overwrote a row while they were copying it (torn rows).
+    Timestamps are time.perf_counter(), a system-wide monotonic clock on Linux, so
+    worker processes can compute latencies against them.
+    """
+
+    HEADER = 16  # bytes: int64 sequence counter, int64 reservation
+
+    def __init__(self, fields, capacity=4096, name=None):
+        self.fields = list(fields)
+        self.capacity = int(capacity)
+        width = 1 + len(self.fields)
+        size = self.HEADER + self.capacity * width * 8
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Workers are children of the creating process and share its resource tracker
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self._seq = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)  # [seq, reserved]
+        self._rows = np.ndarray((self.capacity, width), dtype=np.float64, buffer=self.shm.buf, offset=self.HEADER)
+        if self.owner:
+            self._seq[:] = 0
+
+    @classmethod
+    def attach(cls, spec):
+        """Open a bus created elsewhere from its spec() (name, fields, capacity)."""
+        name, fields, capacity = spec
+        return cls(fields, capacity, name=name)
+
+    def spec(self):
+        return self.name, self.fields, self.capacity
+
+    @property
+    def seq(self):
+        return int(self._seq[0])
+
+    def publish(self, values, timestamp=None):
+        """Append one record; returns its sequence number."""
+        k = int(self._seq[0])
+        self._seq[1] = k + 1  # reservation first: readers discard the row this overwrites
+        row = self._rows[k % self.capacity]
+        row[0] = time.perf_counter() if timestamp is None else timestamp
+        row[1:] = values
+        self._seq[0] = k + 1  # counter last: readers never see a half-written row as new
+        return k
+
+    def publish_many(self, rows, timestamp=None):
+        """Append a block of records sharing one timestamp; returns the first sequence number."""
+        rows = np.atleast_2d(rows)
+        k, n = int(self._seq[0]), len(rows)
+        keep = rows[-self.capacity:]  # a block longer than the ring only leaves its tail
+        idx = np.arange(k + n - len(keep), k + n) % self.capacity
+        self._seq[1] = k + n
+        self._rows[idx, 0] = time.perf_counter() if timestamp is None else timestamp
+        self._rows[idx, 1:] = keep
+        self._seq[0] = k + n
+        return k
+
+    def read(self, start, end=None):
+        """
+        Records [start, end) as (timestamps, rows, dropped). Records already overwritten,
+        or overwritten while being copied, are skipped and counted in `dropped`.
+        """
+        end = self.seq if end is None else end
+        first = max(start, end - self.capacity)
+        idx = np.arange(first, end) % self.capacity
+        block = self._rows[idx]
+        # Re-check after the copy: every record below reserved - capacity was overwritten,
+        # or is being overwritten, while we copied it (a torn row)
+        lapped = max(0, int(self._seq[1]) - self.capacity - first)
+        block = block[min(lapped, len(block)):]
+        return block[:, 0], block[:, 1:], end - start - len(block)
+
+    def latest(self, n=1):
+        end = self.seq
+        return self.read(max(0, end - n), end)
+
+    def close(self):
+        if self._rows is None:
+            return
+        self._seq = self._rows = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ============================================================
+# MODEL CONSUMERS (callable(timestamps, rows) -> result dict)
+# ============================================================
+def _warm(ensemble):
+    """First predict compiles the Numba kernel: do it at load time, not on the event loop."""
+    ensemble.predict(np.zeros(ensemble.n_features))
+    return ensemble
+
+
+class PowerForecaster:
+    """XGBoost power predictor (flat-array export) on every record it is given."""
+
+    def __init__(self, model_path=POWER_MODEL_PATH):
+        self.model = _warm(load_ensemble(model_path))
+
+    def __call__(self, timestamps, rows):
+        return {"P_future_720s": float(self.model.predict(rows)[-1])}
+
+
+class BatteryForecaster:
+    """Streaming battery GRU, fed every battery record in order (exact 10-step windows)."""
+
+    def __init__(self, num_threads=1):
+        from gru_inference import configure_cpu
+        from streaming_gru import StreamingBatteryGRU
+        configure_cpu(num_threads=num_threads)
+        self.stream = StreamingBatteryGRU()
+        self.last = None
+
+    def __call__(self, timestamps, rows):
+        for temperature, voltage, current in rows:
+            y = self.stream.update(temperature, voltage, current)
+            if y is not None:
+                self.last = y
+        if self.last is None:
+            return None
+        return dict(zip(["temperature_next", "voltage_next", "current_next"], map(float, self.last)))
+
+
+class FaultDetector:
+    """Binary FDIR detector over the 10-sample sensor window, every record scored."""
+
+    def __init__(self, threshold=0.5):
+        from fdir_cascade import load_detector
+        from streaming_fdir import StreamingFDIR
+        detector, sensors = load_detector(compiled=True)
+        _warm(detector)
+        self.engine = StreamingFDIR(detector, sensors, batch_size=256, max_delay=float("inf"),
+                                    threshold=threshold)
+
+    def __call__(self, timestamps, rows):
+        detections = []
+        for t, sample in zip(timestamps, rows):
+            detections += self.engine.push(sample, timestamp=t)
+        detections += self.engine.flush()
+        return {"fault_probability": float(self.engine.last_probability[0]),
+                "faults": [d.sample for d in detections]}
+
+
+class DetumblingController:
+    """Exported SAC actor on the newest attitude record."""
+
+    def __init__(self):
+        from policy_runtime import load_policy
+        self.policy = load_policy()
+
+    def __call__(self, timestamps, rows):
+        return {"dipole": self.policy(rows[-1]).tolist()}
+
+
+class LinkDecision:
+    """can_send_all + recommended compression ratio, one decision per pass record."""
+
+    def __init__(self):
+        self.can_send = _warm(load_ensemble(CAN_SEND_MODEL_PATH))
+        self.ratio = _warm(load_ensemble(RATIO_MODEL_PATH))
+
+    def __call__(self, timestamps, rows):
+        can_send_all = self.can_send.predict(rows) >= 0.5
+        ratio = np.where(can_send_all, 1.0, self.ratio.predict(rows))
+        return {"can_send_all": bool(can_send_all[-1]), "compression_ratio": float(ratio[-1])}
+
+
+# ============================================================
+# TASKS + WORKER SIDE (shared by inline, thread and process offload)
+# ============================================================
+class ModelTask:
+    """
+    One model on one channel.
+
+    period:  seconds between runs.
+    consume: "latest" reads the newest `window` records, "all" reads every record
+             published since the previous run (stateful models such as the GRU).
+    offload: "inline" (event loop), "thread" or "process" (dedicated worker process).
+    """
+
+    def __init__(self, name, channel, period, consumer, consumer_kwargs=None, consume="latest",
+                 window=1, offload="inline"):
+        if consume not in ("latest", "all"):
+            raise ValueError(f"Unknown consume mode: {consume}")
+        if offload not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown offload: {offload}")
+        self.name = name
+        self.channel = channel
+        self.period = period
+        self.consumer = consumer
+        self.consumer_kwargs = consumer_kwargs or {}
+        self.consume = consume
+        self.window = window
+        self.offload = offload
+
+
+# name -> (consumer, bus); one registry per process (the main one or a worker)
+_WORKERS = {}
+
+
+def _init_worker(name, consumer, consumer_kwargs, bus_spec):
+    bus = TelemetryBus.attach(bus_spec) if isinstance(bus_spec, tuple) else bus_spec
+    _WORKERS[name] = (consumer(**consumer_kwargs), bus)
+
+
+def _run_step(name, start, end):
+    """Read records [start, end) from the task's bus and run its model on them."""
+    model, bus = _WORKERS[name]
+    timestamps, rows, dropped = bus.read(start, end)
+    if len(rows) == 0:
+        return None, 0, dropped, np.nan, 0
+    t0 = time.perf_counter()
+    result = model(timestamps, rows)
+    return result, time.perf_counter() - t0, dropped, float(timestamps[-1]), len(rows)
+
+
+def default_tasks():
+    """Every shipped model at an onboard-style cadence; the GRU (torch) in its own process."""
+    return [
+        ModelTask("fdir", "fdir", 0.1, FaultDetector, consume="all"),
+        ModelTask("detumbling", "attitude", 0.1, DetumblingController),
+        ModelTask("battery", "battery", 1.0, BatteryForecaster, consume="all", offload="process"),
+        ModelTask("power", "power", 1.0, PowerForecaster),
+        ModelTask("link", "link", 5.0, LinkDecision, offload="thread"),
+    ]
+
+
+# ============================================================
+# MONITOR
+# ============================================================
+class HealthMonitor:
+    """
+    Ingests telemetry into one TelemetryBus per channel and schedules every ModelTask.
+
+    Metrics per task:
+        latency:     result time − ingest time of the newest record consumed.
+        compute:     model time inside the worker.
+        queue depth: records waiting on the channel when the task wakes up.
+        dropped:     records overwritten before an "all" task read them.
+        overruns:    wake-ups that were more than one period late (cycles skipped).
+    """
+
+    def __init__(self, tasks, channels=CHANNELS, capacity=4096):
+        self.tasks = list(tasks)
+        self.buses = {ch: TelemetryBus(fields, capacity) for ch, fields in channels.items()}
+        self.results = {}
+        self.subscribers = []
+        self.ingested = 0
+        self.metrics = {t.name: {"runs": 0, "records": 0, "latency": [], "compute": [], "queue_depth": [],
+                                 "dropped": 0, "overruns": 0, "period": t.period} for t in self.tasks}
+        self.elapsed = np.nan
+        self._executors = {}
+        self._cursors = {t.name: 0 for t in self.tasks}
+
+    def publish(self, channel, values, timestamp=None):
+        """Publish one record (fields,) or a block of records (n, fields) on a channel."""
+        if np.ndim(values) == 2:
+            self.ingested += len(values)
+            return self.buses[channel].publish_many(values, timestamp)
+        self.ingested += 1
+        return self.buses[channel].publish(values, timestamp)
+
+    def backlog(self, channel):
+        """Records published on `channel` that its slowest consume="all" task has not read yet."""
+        cursors = [self._cursors[t.name] for t in self.tasks if t.channel == channel and t.consume == "all"]
+        return self.buses[channel].seq - min(cursors) if cursors else 0
+
+    def subscribe(self, maxsize=0):
+        """asyncio.Queue receiving (task name, result) for every result published."""
+        queue = asyncio.Queue(maxsize)
+        self.subscribers.append(queue)
+        return queue
+
+    def _start_workers(self):
+        ctx = multiprocessing.get_context("spawn")  # no fork of a process holding threads/torch state
+        for task in self.tasks:
+            bus = self.buses[task.channel]
+            if task.offload == "process":
+                self._executors[task.name] = ProcessPoolExecutor(
+                    1, mp_context=ctx, initializer=_init_worker,
+                    initargs=(task.name, task.consumer, task.consumer_kwargs, bus.spec()))
+                # Block until the model is loaded so start-up is not counted as latency
+                self._executors[task.name].submit(time.sleep, 0).result()
+            else:
+                _init_worker(task.name, task.consumer, task.consumer_kwargs, bus)
+                if task.offload == "thread":
+                    self._executors[task.name] = ThreadPoolExecutor(1, thread_name_prefix=task.name)
+
+    async def _run_task(self, task, stop):
+        loop = asyncio.get_running_loop()
+        bus = self.buses[task.channel]
+        m = self.metrics[task.name]
+        executor = self._executors.get(task.name)
+        next_wake = loop.time()
+        # After the source ends, keep going until everything published has been consumed
+        while not (stop.is_set() and self._cursors[task.name] >= bus.seq):
+            late = loop.time() - next_wake
+            if late > task.period:
+                m["overruns"] += 1
+                next_wake = loop.time()
+
+            end = bus.seq
+            depth = end - self._cursors[task.name]
+            m["queue_depth"].append(depth)
+            if depth > 0:
+                start = self._cursors[task.name] if task.consume == "all" else max(0, end - task.window)
+                if executor is None:
+                    out = _run_step(task.name, start, end)
+                else:
+                    out = await loop.run_in_executor(executor, _run_step, task.name, start, end)
+                result, compute, dropped, newest, n_records = out
+                self._cursors[task.name] = end
+                m["runs"] += 1
+                m["records"] += n_records
+                m["compute"].append(compute)
+                m["latency"].append(time.perf_counter() - newest)
+                if task.consume == "all":
+                    m["dropped"] += dropped
+                if result is not None:
+                    self.results[task.name] = result
+                    for queue in self.subscribers:
+                        if not queue.full():
+                            queue.put_nowait((task.name, result))
+
+            next_wake += task.period
+            if not stop.is_set():
+                await asyncio.sleep(max(0.0, next_wake - loop.time()))
+
+    async def _ingest(self, source, stop):
+        async for tick in source:
+            now = time.perf_counter()
+            for channel, values in tick.items():
+                self.publish(channel, values, now)
+            if stop.is_set():
+                break
+        stop.set()
+
+    async def run(self, source, duration=None):
+        """Ingest `source` and run every task until the source ends or `duration` s elapse."""
+        self._start_workers()
+        t0 = time.perf_counter()
+        stop = asyncio.Event()
+        jobs = [asyncio.create_task(self._run_task(t, stop)) for t in self.tasks]
+        jobs.append(asyncio.create_task(self._ingest(source, stop)))
+        try:
+            if duration is None:
+                await stop.wait()
+            else:
+                try:
+                    await asyncio.wait_for(stop.wait(), duration)
+                except asyncio.TimeoutError:
+                    stop.set()
+            await asyncio.gather(*jobs)
+            self.elapsed = time.perf_counter() - t0
+        finally:
+            self.close()
+        return self.summary()
+
+    def summary(self):
+        """Per-task percentiles (ms) and whether the task kept its cadence."""
+        table = {}
+        for name, m in self.metrics.items():
+            lat = np.asarray(m["latency"]) * 1e3
+            comp = np.asarray(m["compute"]) * 1e3
+            depth = np.asarray(m["queue_depth"])
+            table[name] = {
+                "runs": m["runs"], "records": m["records"], "records_per_s": m["records"] / self.elapsed,
+                "latency_p50_ms": pct(lat, 50), "latency_p99_ms": pct(lat, 99),
+                "compute_p50_ms": pct(comp, 50), "compute_p99_ms": pct(comp, 99),
+                "queue_depth_mean": float(depth.mean()) if len(depth) else np.nan,
+                "queue_depth_max": int(depth.max()) if len(depth) else 0,
+                "dropped": m["dropped"], "overruns": m["overruns"],
+                "realtime": bool(m["dropped"] == 0 and m["overruns"] == 0
+                                 and pct(comp, 99) < m["period"] * 1e3),
+            }
+        return table
+
+    def close(self):
+        for executor in self._executors.values():
+            executor.shutdown()
+        self._executors.clear()
+        _WORKERS.clear()
+        for bus in self.buses.values():
+            bus.close()
+
+
+def pct(values, q):
+    return float(np.percentile(values, q)) if len(values) else np.nan
+
+
+# ============================================================
+# DEMO SOURCE (the CSVs the models were trained on + synthetic channels)
+# ============================================================
+def demo_ticks(n_ticks, seed=0):
+    """
+    {channel: row} ticks: power and battery rows replayed from their generated CSVs,
+    synthetic FDIR sensors and decaying tumble rates, link features from the generated
+    pass tables (fields they do not carry are 0, see TS_PASS_ABSENT).
+    """
+    import pandas as pd
+    from streaming_fdir import synthetic_sensor_stream
+
+    rng = np.random.default_rng(seed)
+    power = pd.read_csv(os.path.join(POWER_DIR, "generated_data", "sim_power_data_enhanced.csv"))
+    power = power[CHANNELS["power"]].to_numpy(np.float64)
+    battery = pd.read_csv(os.path.join(BATTERY_DIR, "synthetic_battery_prediction_data.csv"))
+    battery = battery[CHANNELS["battery"]].to_numpy(np.float64)
+    passes = pd.read_csv(os.path.join(LINK_DIR, "generated_dataset", "timeseries_passes_meta.csv")).merge(
+        pd.read_csv(os.path.join(LINK_DIR, "generated_dataset", "ts_features.csv")), on="pass_id")
+    link = link_features(passes).to_numpy(np.float64)
+    sensors = synthetic_sensor_stream(n_ticks, 1, rng)[:, 0]
+    omega = 0.3 * rng.normal(size=3) * np.exp(-np.arange(n_ticks) / (0.5 * n_ticks))[:, None]
+    field = rng.normal(size=(n_ticks, 3))
+    return [{"power": power[i % len(power)], "battery": battery[i % len(battery)], "fdir": sensors[i],
+             "attitude": np.concatenate([omega[i], field[i]]), "link": link[i % len(link)]}
+            for i in range(n_ticks)]
+
+
+async def paced(ticks, rate_hz):
+    """Yield prepared ticks at `rate_hz` (sleeping on the event loop between ticks)."""
+    period = 1.0 / rate_hz
+    start = time.perf_counter()
+    for i, tick in enumerate(ticks):
+        yield tick
+        await asyncio.sleep(max(0.0, start + (i + 1) * period - time.perf_counter()))
+
+
+if __name__ == "__main__":
+    for rate_hz in (10.0, 100.0):
+        monitor = HealthMonitor(default_tasks())
+        results = monitor.subscribe()
+        t0 = time.perf_counter()
+        summary = asyncio.run(monitor.run(paced(demo_ticks(int(rate_hz * 10)), rate_hz)))
+        elapsed = time.perf_counter() - t0
+        print(f"\n🛰️ {rate_hz:.0f} Hz telemetry, 5 channels: {monitor.ingested:,} records ingested in {elapsed:.1f} s "
+              f"(incl. worker start-up), {results.qsize()} results published")
+        print(f"{'task':12s} {'runs':>5s} {'lat p50':>8s} {'lat p99':>8s} {'cpu p50':>8s} {'cpu p99':>8s} "
+              f"{'queue':>6s} {'max':>5s} {'drop':>5s} {'late':>5s}  real time")
+        for name, s in summary.items():
+            print(f"{name:12s} {s['runs']:5d} {s['latency_p50_ms']:8.2f} {s['latency_p99_ms']:8.2f} "
+                  f"{s['compute_p50_ms']:8.2f} {s['compute_p99_ms']:8.2f} {s['queue_depth_mean']:6.1f} "
+                  f"{s['queue_depth_max']:5d} {s['dropped']:5d} {s['overruns']:5d}  {'✅' if s['realtime'] else '❌'}")
+        print("📤 latest results:", {k: v for k, v in monitor.results.items() if k != "fdir"})
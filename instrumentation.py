@@ -0,0 +1,350 @@
+"""
+Lightweight timers, counters and optional profiling for the pipeline and inference paths.
+
+Disabled by default: every hook is then a single flag test (timer() hands back a shared
+no-op context manager, timed() calls straight through), so the instrumented scripts
+run as before. Enable with CUBESAT_METRICS or enable():
+
+    from instrumentation import timer, timed, count
+    with timer("send.closest_pass"):
+        ...
+    @timed("compress", codec="zstd")
+    def compress_zstd(...): ...
+    count("bytes_in", len(data), codec="zstd")
+
+    CUBESAT_METRICS=1             python train_XGBoost.py    # summary table at exit
+    CUBESAT_METRICS=metrics.json  python train_XGBoost.py    # JSON report at exit
+    CUBESAT_METRICS=metrics.prom  python train_XGBoost.py    # Prometheus text format
+    CUBESAT_PROFILE=cprofile,tracemalloc ...                 # + whole-run capture
+
+`python instrumentation.py` measures the per-call overhead, disabled and enabled.
+"""
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+ENABLED = False
+
+_lock = threading.Lock()
+_timers = {}     # (name, labels) -> [count, total, min, max]
+_counters = {}   # (name, labels) -> value
+_profile = {}    # results of the last capture
+_active = {}     # running whole-run capture: {"cprofile": Profile, "tracemalloc": True}
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _profile.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+def _record(key, seconds):
+    with _lock:
+        stats = _timers.get(key)
+        if stats is None:
+            _timers[key] = [1, seconds, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds < stats[2]:
+                stats[2] = seconds
+            if seconds > stats[3]:
+                stats[3] = seconds
+
+
+# ============================================================
+# HOOKS
+# ============================================================
+class _NullTimer:
+    __slots__ = ()
+    elapsed = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    start = __enter__
+
+    def stop(self):
+        return 0.0
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("key", "t0", "elapsed")
+
+    def __init__(self, key):
+        self.key = key
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.t0
+        _record(self.key, self.elapsed)
+        return False
+
+    start = __enter__
+
+    def stop(self):
+        self.__exit__()
+        return self.elapsed
+
+
+def timer(name, **labels):
+    """
+    Context manager timing its block under `name` (+ labels); a shared no-op when disabled.
+    For spans of top-level script code: t = timer("stage").start() ... t.stop().
+    """
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(_key(name, labels))
+
+
+def timed(name=None, **labels):
+    """Decorator timing every call (default name: the function's qualified name)."""
+    def decorator(fn):
+        key = _key(name or fn.__qualname__, labels)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(key, time.perf_counter() - t0)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1, **labels):
+    """Add `value` to a counter (bytes, rows, files…)."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def count_file_bytes(input_path, output_path, **labels):
+    """bytes_in / bytes_out counters from file sizes (stat only when enabled)."""
+    if not ENABLED:
+        return
+    count("bytes_in", os.path.getsize(input_path), **labels)
+    count("bytes_out", os.path.getsize(output_path), **labels)
+
+
+# ============================================================
+# PROFILING CAPTURE (cProfile / tracemalloc)
+# ============================================================
+def _start_capture(cprofile=True, memory=False):
+    state = {}
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        state["tracemalloc"] = True
+    if cprofile:
+        state["cprofile"] = cProfile.Profile()
+        state["cprofile"].enable()
+    return state
+
+
+def _stop_capture(state, top=15):
+    result = {}
+    if "cprofile" in state:
+        state["cprofile"].disable()
+        stats = pstats.Stats(state["cprofile"]).stats
+        rows = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top]
+        result["cprofile"] = [
+            {"function": f"{os.path.basename(f)}:{line}({fn})", "calls": nc,
+             "self_s": round(tt, 6), "cumulative_s": round(ct, 6)}
+            for (f, line, fn), (cc, nc, tt, ct, _) in rows
+        ]
+    if state.get("tracemalloc"):
+        current, peak = tracemalloc.get_traced_memory()
+        lines = tracemalloc.take_snapshot().statistics("lineno")[:top]
+        tracemalloc.stop()
+        result["tracemalloc"] = {
+            "current_mb": round(current / 2 ** 20, 3), "peak_mb": round(peak / 2 ** 20, 3),
+            "top": [{"line": f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+                     "size_kb": round(s.size / 1024, 1), "count": s.count} for s in lines],
+        }
+    with _lock:
+        _profile.update(result)
+    return result
+
+
+@contextmanager
+def capture(cprofile=True, memory=False, top=15):
+    """Profile the block (cProfile hot functions, tracemalloc peak + top allocation sites)."""
+    state = _start_capture(cprofile, memory)
+    try:
+        yield _profile
+    finally:
+        _stop_capture(state, top)
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+def snapshot():
+    with _lock:
+        timers = [{"name": n, "labels": dict(l), "count": c, "total_s": t, "mean_s": t / c, "min_s": lo, "max_s": hi}
+                  for (n, l), (c, t, lo, hi) in sorted(_timers.items())]
+        counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(_counters.items())]
+        return {"timers": timers, "counters": counters, **({"profile": dict(_profile)} if _profile else {})}
+
+
+def to_json(indent=1):
+    return json.dumps(snapshot(), indent=indent)
+
+
+def _metric_name(name):
+    return "cubesat_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    esc = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, esc)) + "}"
+
+
+def to_prometheus():
+    """Prometheus text exposition format: one summary for all timers, one counter family per name."""
+    snap = snapshot()
+    out = ["# HELP cubesat_duration_seconds Wall time of instrumented stages.",
+           "# TYPE cubesat_duration_seconds summary"]
+    for t in snap["timers"]:
+        labels = _labels({"stage": t["name"], **t["labels"]})
+        out.append(f"cubesat_duration_seconds_count{labels} {t['count']}")
+        out.append(f"cubesat_duration_seconds_sum{labels} {t['total_s']:.9f}")
+    out += ["# HELP cubesat_duration_seconds_max Longest single call of instrumented stages.",
+            "# TYPE cubesat_duration_seconds_max gauge"]
+    for t in snap["timers"]:
+        out.append(f"cubesat_duration_seconds_max{_labels({'stage': t['name'], **t['labels']})} {t['max_s']:.9f}")
+    families = {}
+    for c in snap["counters"]:
+        families.setdefault(_metric_name(c["name"]) + "_total", []).append(c)
+    for metric, rows in families.items():
+        out.append(f"# TYPE {metric} counter")
+        out += [f"{metric}{_labels(c['labels'])} {c['value']}" for c in rows]
+    return "\n".join(out) + "\n"
+
+
+def write(path):
+    """Write the report as Prometheus text (.prom / .txt) or JSON (anything else)."""
+    text = to_prometheus() if path.endswith((".prom", ".txt")) else to_json()
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+
+def report(file=sys.stderr):
+    """Human-readable table of timers and counters."""
+    snap = snapshot()
+    print("\n⏱️ Instrumentation", file=file)
+    for t in snap["timers"]:
+        label = t["name"] + "".join(f" {k}={v}" for k, v in t["labels"].items())
+        print(f"   {label:55s} n={t['count']:<7d} total {t['total_s'] * 1e3:10.2f} ms  "
+              f"mean {t['mean_s'] * 1e3:9.3f} ms  max {t['max_s'] * 1e3:9.3f} ms", file=file)
+    for c in snap["counters"]:
+        label = c["name"] + "".join(f" {k}={v}" for k, v in c["labels"].items())
+        print(f"   {label:55s} {c['value']:,}", file=file)
+    for row in snap.get("profile", {}).get("cprofile", [])[:10]:
+        print(f"   🔥 {row['function']:60s} {row['cumulative_s'] * 1e3:10.1f} ms cum  ({row['calls']} calls)", file=file)
+    mem = snap.get("profile", {}).get("tracemalloc")
+    if mem:
+        print(f"   🧠 peak traced memory {mem['peak_mb']:.1f} MB; top: "
+              + ", ".join(f"{r['line']} {r['size_kb']:.0f} kB" for r in mem["top"][:3]), file=file)
+
+
+# ============================================================
+# ENVIRONMENT CONFIGURATION (CUBESAT_METRICS / CUBESAT_PROFILE)
+# ============================================================
+def _finish(target):
+    if _active:
+        _stop_capture(_active)
+        _active.clear()
+    if target and target.lower() not in ("1", "true", "yes", "on"):
+        write(target)
+        print(f"📊 Metrics written to {target}", file=sys.stderr)
+    else:
+        report()
+
+
+def _configure_from_env():
+    target = os.environ.get("CUBESAT_METRICS", "")
+    modes = {m.strip().lower() for m in os.environ.get("CUBESAT_PROFILE", "").split(",") if m.strip()}
+    if not target and not modes:
+        return
+    enable()
+    if modes:
+        _active.update(_start_capture("cprofile" in modes, "tracemalloc" in modes))
+    atexit.register(_finish, target)
+
+
+_configure_from_env()
+
+
+# ============================================================
+# OVERHEAD BENCHMARK
+# ============================================================
+if __name__ == "__main__":
+    def bare(x):
+        return x
+
+    hooked = timed("bench.fn")(bare)
+    n = 1_000_000
+
+    def per_call(fn):
+        t0 = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        return (time.perf_counter() - t0) / n * 1e9
+
+    def with_timer(i):
+        with timer("bench.block"):
+            return i
+
+    def with_count(i):
+        count("bench.items", 1)
+        return i
+
+    base = per_call(bare)
+    for state in ("disabled", "enabled"):
+        enable() if state == "enabled" else disable()
+        print(f"🔧 {state:8s}: timed() +{per_call(hooked) - base:6.0f} ns | timer() +{per_call(with_timer) - base:6.0f} ns"
+              f" | count() +{per_call(with_count) - base:6.0f} ns per call (bare call {base:.0f} ns)")
+    print(to_prometheus())
@@ -0,0 +1,417 @@
+"""
+Incremental training pipeline backed by a content-addressed artifact cache.
+
+Every stage (a dataset generator, a training script or notebook) declares its
+inputs, outputs, parameters and source files. Its key is the SHA-256 of all of
+them, so a stage only re-executes when something it depends on changed. Outputs
+(datasets, scalers, .pkl/.pth models) are stored once per content digest in the
+cache; a key seen before restores its outputs instead of recomputing them, and a
+stage whose rebuilt inputs come out byte-identical does not invalidate the stages
+after it. The cache is bounded: least recently used results are evicted first.
+
+    python pipeline.py                       # bring every stage up to date
+    python pipeline.py link_train --dry-run  # what would run for the link models
+    python pipeline.py power_train --force power_train
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import platform
+import subprocess
+from importlib.metadata import version, PackageNotFoundError
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LINK_DIR = os.path.join(BASE_DIR, "Data compressing")
+POWER_DIR = os.path.join(BASE_DIR, "power")
+BATTERY_DIR = os.path.join(BASE_DIR, "battery health and thermal prediction for mission failure prevention")
+
+CACHE_DIR = os.environ.get("PIPELINE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "cubesat_pipeline"))
+CACHE_MAX_BYTES = int(float(os.environ.get("PIPELINE_CACHE_GB", "5")) * 1024 ** 3)
+
+
+# ============================================================
+# HASHING
+# ============================================================
+class DigestIndex:
+    """
+    File digests memoized on (size, mtime): unchanged multi-GB datasets are not
+    re-read on every run, only stat()ed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def digest(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        entry = self.entries.get(path)
+        if entry and entry[:2] == stamp:
+            return entry[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.entries[path] = stamp + [h.hexdigest()]
+        return h.hexdigest()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+
+def _package_version(name):
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+# ============================================================
+# CONTENT-ADDRESSED STORE
+# ============================================================
+class ArtifactCache:
+    """
+    objects/ab/abcd…   one blob per distinct output content (shared across stages/keys)
+    stages/<stage>-<key>.json   manifest: output path -> blob digest
+
+    Manifest mtimes are the LRU clock; evict() deletes blobs no manifest references
+    (left behind when a re-run overwrites a manifest), then drops the oldest manifests
+    and the blobs only they referenced until the store fits in max_bytes.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "stages"), exist_ok=True)
+        self.index = DigestIndex(os.path.join(root, "digests.json"))
+
+    def _blob(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def _manifest(self, stage, key):
+        return os.path.join(self.root, "stages", f"{stage}-{key}.json")
+
+    def put(self, path):
+        digest = self.index.digest(path)
+        blob = self._blob(digest)
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            shutil.copyfile(path, blob + ".tmp")
+            os.replace(blob + ".tmp", blob)
+        return digest
+
+    def restore(self, digest, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        shutil.copyfile(self._blob(digest), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        st = os.stat(path)  # known content: record it so the next run does not re-hash the file
+        self.index.entries[os.path.abspath(path)] = [st.st_size, st.st_mtime_ns, digest]
+
+    def lookup(self, stage, key):
+        """Manifest for (stage, key) if it and all its blobs are present; marks it recently used."""
+        path = self._manifest(stage, key)
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not all(os.path.exists(self._blob(d)) for d in manifest["outputs"].values()):
+            return None
+        os.utime(path)
+        return manifest
+
+    def record(self, stage, key, outputs, duration):
+        manifest = {"stage": stage, "key": key, "duration": duration, "created": time.time(),
+                    "outputs": {rel: self.put(path) for rel, path in outputs.items()}}
+        tmp = self._manifest(stage, key) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, self._manifest(stage, key))
+        return manifest
+
+    def size(self):
+        total = 0
+        for folder, _, files in os.walk(os.path.join(self.root, "objects")):
+            total += sum(os.path.getsize(os.path.join(folder, f)) for f in files)
+        return total
+
+    def evict(self, keep=()):
+        """
+        Delete unreferenced blobs, then drop least recently used manifests (never those
+        in `keep`) until every blob under objects/ fits in max_bytes.
+        """
+        stages_dir = os.path.join(self.root, "stages")
+        manifests = []
+        for name in os.listdir(stages_dir):
+            path = os.path.join(stages_dir, name)
+            with open(path) as f:
+                manifests.append((os.path.getmtime(path), path, json.load(f)))
+        manifests.sort(key=lambda m: m[0])
+        refs = {}
+        for _, _, m in manifests:
+            for d in m["outputs"].values():
+                refs[d] = refs.get(d, 0) + 1
+        sizes = {}
+        for folder, _, files in os.walk(os.path.join(self.root, "objects")):
+            for name in files:
+                sizes[name] = os.path.getsize(os.path.join(folder, name))
+        for d in [d for d in sizes if d not in refs]:
+            os.remove(self._blob(d))
+            del sizes[d]
+        total = sum(sizes.values())
+        evicted = 0
+        for _, path, m in manifests:
+            if total <= self.max_bytes:
+                break
+            if (m["stage"], m["key"]) in keep:
+                continue
+            os.remove(path)
+            evicted += 1
+            for d in m["outputs"].values():
+                refs[d] -= 1
+                if refs[d] == 0 and d in sizes:
+                    os.remove(self._blob(d))
+                    total -= sizes.pop(d)
+        return evicted, total
+
+
+# ============================================================
+# STAGES
+# ============================================================
+class Stage:
+    """
+    One pipeline step, run as `python <script>` from `cwd` (notebooks: their code cells).
+
+    inputs/outputs: files relative to cwd (absolute paths allowed). Stages producing
+                    another stage's inputs are its upstream.
+    sources:        extra code the script imports (hashed along with the script).
+    params:         environment variables passed to the run and hashed into the key.
+    packages:       libraries whose installed version is hashed into the key.
+    main:           run with __name__ == "__main__" (False skips interactive demos).
+    """
+
+    def __init__(self, name, cwd, script, inputs=(), outputs=(), sources=(), params=None,
+                 packages=("numpy", "pandas"), main=True):
+        self.name = name
+        self.cwd = cwd
+        self.script = script
+        self.inputs = [os.path.join(cwd, p) for p in inputs]
+        self.outputs = {p: os.path.join(cwd, p) for p in outputs}
+        self.sources = [os.path.join(cwd, p) for p in (script, *sources)]
+        self.params = params or {}
+        self.packages = packages
+        self.main = main
+
+    def key(self, index):
+        h = hashlib.sha256()
+        h.update(json.dumps({
+            "stage": self.name, "script": self.script, "main": self.main, "params": self.params,
+            "outputs": sorted(self.outputs), "python": platform.python_version(),
+            "packages": {p: _package_version(p) for p in self.packages},
+        }, sort_keys=True).encode())
+        for path in self.sources + self.inputs:
+            h.update(os.path.relpath(path, self.cwd).encode())
+            h.update(index.digest(path).encode())
+        return h.hexdigest()[:32]
+
+    def execute(self):
+        cmd = [sys.executable, os.path.abspath(__file__), "--exec", self.script]
+        if not self.main:
+            cmd.append("--no-main")
+        env = dict(os.environ, MPLBACKEND="Agg", **{k: str(v) for k, v in self.params.items()})
+        subprocess.run(cmd, cwd=self.cwd, env=env, check=True)
+        missing = [rel for rel, path in self.outputs.items() if not os.path.exists(path)]
+        if missing:
+            raise RuntimeError(f"Stage {self.name} did not write {', '.join(missing)}")
+
+
+def notebook_source(path):
+    """Code cells of a notebook as one script; IPython magics and shell lines are commented out."""
+    with open(path, encoding="utf-8") as f:
+        cells = json.load(f)["cells"]
+    lines = []
+    for cell in cells:
+        if cell["cell_type"] != "code":
+            continue
+        for line in "".join(cell["source"]).splitlines():
+            lines.append("# " + line if line.lstrip().startswith(("%", "!")) else line)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _exec(script, run_name):
+    sys.path.insert(0, os.getcwd())
+    if script.endswith(".ipynb"):
+        exec(compile(notebook_source(script), script, "exec"), {"__name__": run_name})
+    else:
+        import runpy
+        runpy.run_path(script, run_name=run_name)
+
+
+def default_stages():
+    """The three training pipelines of the repository, in dependency order."""
+    from tree_inference import SHIPPED_MODELS, compiled_path
+    gen = "generated_dataset"
+    return [
+        # Objective 1: link prediction
+        Stage("link_dataset", LINK_DIR, "data_generation.py",
+              outputs=[f"{gen}/aggregated_passes.csv", f"{gen}/timeseries_passes_meta.csv",
+                       f"{gen}/timeseries_passes_profiles.csv"]),
+        Stage("link_ts_features", LINK_DIR, "extract_ts_features.py",
+              inputs=[f"{gen}/timeseries_passes_profiles.csv"],
+              outputs=[f"{gen}/ts_features.csv"]),
+        Stage("link_merge", LINK_DIR, "merge_ts_into_aggregated.py",
+              inputs=[f"{gen}/aggregated_passes.csv", f"{gen}/ts_features.csv"],
+              outputs=[f"{gen}/aggregated_passes_enriched.csv"]),
+        Stage("link_train", LINK_DIR, "train_XGBoost.py", main=False,
+              inputs=[f"{gen}/aggregated_passes_enriched.csv"],
+              outputs=["xgboost_can_send_all_model.pkl", "xgboost_recommended_compression_ratio_model.pkl"],
+              packages=("numpy", "pandas", "xgboost")),
+        # Objective 2: power
+        Stage("power_dataset", POWER_DIR, "generate_enhanced_data.py",
+              outputs=["sim_power_data_enhanced.csv"]),
+        Stage("power_train", POWER_DIR, "train_optimized_model.ipynb",
+              inputs=["sim_power_data_enhanced.csv"],
+              outputs=["xgboost_power_predictor_optimized.pkl", "prediction_comparison.csv"],
+              packages=("numpy", "pandas", "xgboost", "scikit-learn", "scipy")),
+        # Objective 3: battery GRU
+        Stage("battery_dataset", BATTERY_DIR, "generate_data_prediction.py",
+              outputs=["synthetic_battery_prediction_data.csv"]),
+        Stage("battery_train", BATTERY_DIR, "train_gru_model.ipynb", sources=["sequence_dataset.py", "gru_inference.py"],
+              inputs=["synthetic_battery_prediction_data.csv"],
+              outputs=["best_gru_model.pth", "battery_gru_model.pth", "scaler_X_gru.pkl",
+                       "scaler_y_gru.pkl", "model_params_gru.pkl"],
+              packages=("numpy", "pandas", "torch", "scikit-learn")),
+        # Onboard flat-array copies of every boosted-tree model
+        Stage("export_trees", BASE_DIR, "tree_inference.py", inputs=SHIPPED_MODELS,
+              outputs=[compiled_path(p) for p in SHIPPED_MODELS], packages=("numpy", "xgboost", "lightgbm")),
+    ]
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+class Pipeline:
+    def __init__(self, stages, cache=None):
+        self.stages = stages
+        self.cache = cache or ArtifactCache()
+        self.producer = {}
+        for stage in stages:
+            for path in stage.outputs.values():
+                self.producer[path] = stage.name
+
+    def upstream(self, names):
+        """`names` plus every stage they (transitively) depend on, in pipeline order."""
+        by_name = {s.name: s for s in self.stages}
+        unknown = set(names) - set(by_name)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        needed, todo = set(), list(names)
+        while todo:
+            name = todo.pop()
+            if name not in needed:
+                needed.add(name)
+                todo += [self.producer[p] for p in by_name[name].inputs if p in self.producer]
+        return [s for s in self.stages if s.name in needed]
+
+    def run(self, targets=None, force=(), dry_run=False, adopt=False):
+        """
+        Bring the selected stages up to date. Per stage, one of:
+          fresh     outputs on disk already are the cached result for the current key
+          restored  key seen before: outputs copied back from the cache
+          ran       executed, outputs stored in the cache
+          adopted   (adopt=True) outputs on disk recorded as the result for the current key
+        """
+        stages = self.upstream(targets) if targets else self.stages
+        index = self.cache.index
+        report, used, stale = [], set(), set()
+        try:
+            for stage in stages:
+                if any(self.producer.get(p) in stale for p in stage.inputs) or \
+                        any(not os.path.exists(p) for p in stage.inputs + stage.sources):
+                    if not dry_run:
+                        raise FileNotFoundError(f"Stage {stage.name}: missing inputs")
+                    report.append((stage.name, "would run (inputs pending)", 0.0))
+                    stale.add(stage.name)
+                    continue
+                key = stage.key(index)
+                manifest = None if stage.name in force else self.cache.lookup(stage.name, key)
+                if manifest and all(os.path.exists(p) and index.digest(p) == manifest["outputs"][rel]
+                                    for rel, p in stage.outputs.items()):
+                    status, seconds = "fresh", 0.0
+                elif manifest:
+                    t0 = time.perf_counter()
+                    if not dry_run:
+                        for rel, path in stage.outputs.items():
+                            self.cache.restore(manifest["outputs"][rel], path)
+                    status, seconds = ("would restore" if dry_run else "restored"), time.perf_counter() - t0
+                    if dry_run:
+                        stale.add(stage.name)
+                elif dry_run:
+                    status, seconds = "would run", 0.0
+                    stale.add(stage.name)
+                elif adopt and stage.name not in force and all(os.path.exists(p) for p in stage.outputs.values()):
+                    self.cache.record(stage.name, key, stage.outputs, None)
+                    status, seconds = "adopted", 0.0
+                else:
+                    print(f"🚀 {stage.name}: running {stage.script}", flush=True)
+                    t0 = time.perf_counter()
+                    stage.execute()
+                    seconds = time.perf_counter() - t0
+                    self.cache.record(stage.name, key, stage.outputs, seconds)
+                    status = "ran"
+                used.add((stage.name, key))
+                report.append((stage.name, status, seconds))
+        finally:
+            if not dry_run:
+                self.cache.evict(keep=used)
+            index.save()
+        return report
+
+
+def print_report(report, cache):
+    icons = {"fresh": "⏭️", "restored": "♻️", "ran": "🚀", "adopted": "📥"}
+    print("\n📋 Pipeline:")
+    for name, status, seconds in report:
+        print(f"   {icons.get(status, '🔎')} {name:18s} {status:26s} {seconds:8.1f} s")
+    print(f"💾 Cache: {cache.size() / 1024 ** 2:.1f} MB of {cache.max_bytes / 1024 ** 3:.2f} GB in {cache.root}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental training pipeline with an artifact cache")
+    parser.add_argument("stages", nargs="*", help="target stages (default: all); upstream stages are included")
+    parser.add_argument("--force", nargs="*", default=[], help="re-execute these stages regardless of the cache")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would run")
+    parser.add_argument("--adopt", action="store_true",
+                        help="record outputs already on disk as up to date instead of recomputing them")
+    parser.add_argument("--cache", default=CACHE_DIR)
+    parser.add_argument("--cache-gb", type=float, default=CACHE_MAX_BYTES / 1024 ** 3)
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--exec", help=argparse.SUPPRESS)
+    parser.add_argument("--no-main", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.exec:
+        _exec(args.exec, "__pipeline__" if args.no_main else "__main__")
+        sys.exit(0)
+
+    pipeline = Pipeline(default_stages(), ArtifactCache(args.cache, int(args.cache_gb * 1024 ** 3)))
+    if args.list:
+        for stage in pipeline.stages:
+            print(f"{stage.name:18s} {os.path.relpath(stage.cwd, BASE_DIR)}/{stage.script}")
+        sys.exit(0)
+    report = pipeline.run(args.stages or None, force=set(args.force), dry_run=args.dry_run, adopt=args.adopt)
+    print_report(report, pipeline.cache)
@@ -0,0 +1,257 @@
+"""
+Telemetry replay harness: the generated datasets as one time-ordered stream.
+
+    power/generated_data/sim_power_data_enhanced.csv          one record / 720 s
+    .../synthetic_battery_prediction_data.csv                  one record / 1 s
+    Data compressing/generated_dataset/timeseries_passes_profiles.csv
+                                                               one SNR sample / 5 s during passes
+
+Records are laid out on a common mission clock (datasets shorter than the replay
+loop around) and pushed through a HealthMonitor at `speedup` × real time, or as fast
+as the consumers allow (speedup=None, with backpressure). The report gives sustained
+records/s and end-to-end latency (ingest → result) for the power, battery and link
+consumers, plus how far the replay fell behind its schedule.
+
+    python telemetry_replay.py --speedup 600 --hours 6
+"""
+import os
+import time
+import asyncio
+import argparse
+import numpy as np
+import pandas as pd
+
+from health_monitor import (BATTERY_DIR, CAN_SEND_MODEL_PATH, CHANNELS, LINK_DIR, POWER_DIR, RATIO_MODEL_PATH,
+                            TS_PASS_ABSENT, BatteryForecaster, HealthMonitor, LinkDecision, ModelTask,
+                            PowerForecaster, _warm, link_features, load_ensemble, pct)
+
+POWER_CSV = os.path.join(POWER_DIR, "generated_data", "sim_power_data_enhanced.csv")
+BATTERY_CSV = os.path.join(BATTERY_DIR, "synthetic_battery_prediction_data.csv")
+PROFILES_CSV = os.path.join(LINK_DIR, "generated_dataset", "timeseries_passes_profiles.csv")
+PASS_META_CSV = os.path.join(LINK_DIR, "generated_dataset", "timeseries_passes_meta.csv")
+TS_FEATURES_CSV = os.path.join(LINK_DIR, "generated_dataset", "ts_features.csv")
+
+POWER_DT = 720      # s per row (generate_enhanced_data.py t_step)
+BATTERY_DT = 1      # s per row (generate_data_prediction.py dt)
+PROFILE_DT = 5      # s per SNR sample (data_generation.py TS_SAMPLING)
+PASS_INTERVAL = 5700  # s between pass starts: one ground-station pass per ~95 min orbit
+
+PROFILE_FIELDS = ["pass_index", "t_s", "snr_db", "range_km", "elev_deg"]
+
+
+# ============================================================
+# LINK CONSUMER FOR RAW PASS PROFILES
+# ============================================================
+SNR_FEATURES = ["snr_mean", "snr_min", "snr_max", "snr_std", "snr_p10", "snr_p25", "snr_p50", "snr_p75",
+                "snr_p90", "fade_count", "outage_time_s", "snr_slope"]
+
+
+def pass_index(pass_ids):
+    """Integer pass index from pass ids such as TS_PASS_00042 (the profiles' pass_index field)."""
+    return pd.Series(pass_ids).str.rsplit("_", n=1).str[-1].astype(int).to_numpy()
+
+
+def snr_features(t_s, snr):
+    """Per-pass SNR statistics, as in extract_ts_features.py."""
+    return {
+        "snr_mean": np.mean(snr), "snr_min": np.min(snr), "snr_max": np.max(snr), "snr_std": np.std(snr),
+        "snr_p10": np.percentile(snr, 10), "snr_p25": np.percentile(snr, 25), "snr_p50": np.percentile(snr, 50),
+        "snr_p75": np.percentile(snr, 75), "snr_p90": np.percentile(snr, 90),
+        "fade_count": np.sum(snr < 0),
+        "outage_time_s": np.sum(snr < -2) * (t_s[1] - t_s[0] if len(t_s) > 1 else PROFILE_DT),
+        "snr_slope": (snr[-1] - snr[0]) / (t_s[-1] - t_s[0] + 1e-6),
+    }
+
+
+class PassLinkPredictor:
+    """
+    Link decision from the raw SNR profile: samples are accumulated per pass and, when a
+    pass ends, its SNR features + pass metadata go through can_send_all / compression ratio.
+    Each call returns the newest decision with every decision of the block under "decisions"
+    (a fast replay block can span several pass ends), or None when no pass ended.
+    """
+
+    def __init__(self, meta_path=PASS_META_CSV):
+        meta = pd.read_csv(meta_path)
+        # SNR features are computed from the profile when the pass ends
+        self.meta = link_features(meta, TS_PASS_ABSENT + SNR_FEATURES).to_numpy(np.float64)
+        self.snr_columns = [CHANNELS["link"].index(c) for c in SNR_FEATURES]
+        self.row = {k: i for i, k in enumerate(pass_index(meta["pass_id"]))}  # pass index -> meta row
+        self.duration = meta["pass_duration_s"].to_numpy()
+        self.can_send = _warm(load_ensemble(CAN_SEND_MODEL_PATH))
+        self.ratio = _warm(load_ensemble(RATIO_MODEL_PATH))
+        self.current = None
+        self.samples = []
+        self.decisions = 0
+
+    def _decide(self):
+        profile = np.array(self.samples)
+        x = self.meta[[self.row[self.current]]].copy()
+        features = snr_features(profile[:, 0], profile[:, 1])
+        x[0, self.snr_columns] = [features[c] for c in SNR_FEATURES]
+        can_send_all = bool(self.can_send.predict(x)[0] >= 0.5)
+        ratio = 1.0 if can_send_all else float(self.ratio.predict(x)[0])
+        self.decisions += 1
+        self.samples = []
+        return {"pass": self.current, "can_send_all": can_send_all, "compression_ratio": ratio}
+
+    def __call__(self, timestamps, rows):
+        decisions = []
+        for k, t_s, snr, _, _ in rows:
+            k = int(k)
+            if self.current is not None and k != self.current and self.samples:
+                decisions.append(self._decide())
+            self.current = k
+            self.samples.append((t_s, snr))
+            if t_s + PROFILE_DT >= self.duration[self.row[k]]:  # last sample of the pass
+                decisions.append(self._decide())
+        return {**decisions[-1], "decisions": decisions} if decisions else None
+
+
+# ============================================================
+# MISSION-TIME SCHEDULE
+# ============================================================
+def _tile(rows, dt, duration):
+    """Rows repeated as needed to cover `duration` s at one row per `dt` s."""
+    n = int(duration // dt)
+    return np.arange(n) * float(dt), rows[np.arange(n) % len(rows)]
+
+
+def load_schedule(duration, pass_interval=PASS_INTERVAL, profiles_path=PROFILES_CSV):
+    """
+    {channel: (mission times, rows)} covering `duration` s of mission time.
+
+    Link records come from the raw pass profiles ("link_profile" channel) when the CSV
+    exists. Otherwise (it is not shipped: Data compressing/data_generation.py writes it)
+    each pass is one "link" record of meta + precomputed ts_features at LOS.
+    """
+    power = pd.read_csv(POWER_CSV)[CHANNELS["power"]].to_numpy(np.float64)
+    battery = pd.read_csv(BATTERY_CSV)[CHANNELS["battery"]].to_numpy(np.float64)
+    schedule = {"power": _tile(power, POWER_DT, duration), "battery": _tile(battery, BATTERY_DT, duration)}
+
+    n_passes = int(duration // pass_interval)
+    if os.path.exists(profiles_path):
+        profiles = pd.read_csv(profiles_path)
+        profiles["pass_index"] = pass_index(profiles["pass_id"])
+        by_pass = [g[PROFILE_FIELDS].to_numpy(np.float64) for _, g in profiles.groupby("pass_index")]
+        times, rows = [], []
+        for k in range(n_passes):
+            g = by_pass[k % len(by_pass)]
+            times.append(k * pass_interval + g[:, 1])
+            rows.append(g)
+        schedule["link_profile"] = (np.concatenate(times), np.concatenate(rows)) if rows else \
+            (np.zeros(0), np.zeros((0, len(PROFILE_FIELDS))))
+    else:
+        passes = pd.read_csv(PASS_META_CSV).merge(pd.read_csv(TS_FEATURES_CSV), on="pass_id")
+        link = link_features(passes).to_numpy(np.float64)
+        k = np.arange(n_passes)
+        duration_s = link[k % len(link), CHANNELS["link"].index("pass_duration_s")]
+        schedule["link"] = (k * float(pass_interval) + duration_s, link[k % len(link)])
+    return schedule
+
+
+def _merge(schedule):
+    """Flatten the schedule into (time, channel index, row index) sorted by mission time."""
+    channels = list(schedule)
+    times = np.concatenate([schedule[ch][0] for ch in channels])
+    which = np.concatenate([np.full(len(schedule[ch][0]), i) for i, ch in enumerate(channels)])
+    index = np.concatenate([np.arange(len(schedule[ch][0])) for ch in channels])
+    order = np.argsort(times, kind="stable")
+    return channels, times[order], which[order], index[order]
+
+
+async def replay(schedule, speedup=None, monitor=None, tick=0.01, chunk=60.0, max_backlog=256, lag=None):
+    """
+    Yield {channel: rows (n, fields)} blocks in mission-time order.
+
+    Paced (speedup given): record at mission time t is released at start + t / speedup,
+    together with every record due by then, at most one block per `tick` wall seconds.
+    The delay of each block behind its schedule is appended to `lag`.
+    Unpaced (speedup=None): blocks of `chunk` mission seconds, held back while any
+    consumer of `monitor` has more than `max_backlog` unread records.
+    """
+    channels, times, which, index = _merge(schedule)
+    start = last = time.perf_counter()
+    i, n = 0, len(times)
+    while i < n:
+        if speedup is None:
+            while monitor is not None and max(monitor.backlog(ch) for ch in channels) > max_backlog:
+                await asyncio.sleep(0.001)
+            j = np.searchsorted(times, times[i] + chunk, side="left")
+        else:
+            wake = max(start + times[i] / speedup, last + tick)
+            await asyncio.sleep(max(0.0, wake - time.perf_counter()))
+            last = time.perf_counter()
+            due = (last - start) * speedup
+            j = max(np.searchsorted(times, due, side="right"), i + 1)
+            if lag is not None:
+                lag.append(last - (start + times[i] / speedup))
+        block = {}
+        for c in np.unique(which[i:j]):
+            sel = index[i:j][which[i:j] == c]
+            block[channels[c]] = schedule[channels[c]][1][sel]
+        yield block
+        i = j
+        if speedup is None:
+            await asyncio.sleep(0)
+
+
+def replay_tasks(link_channel, period=0.05, meta_path=PASS_META_CSV):
+    """Power, battery and link consumers reading every record ("all") every `period` s."""
+    if link_channel == "link_profile":
+        link = ModelTask("link", "link_profile", period, PassLinkPredictor, {"meta_path": meta_path},
+                         consume="all", offload="thread")
+    else:
+        link = ModelTask("link", "link", period, LinkDecision, consume="all", offload="thread")
+    return [
+        ModelTask("power", "power", period, PowerForecaster, consume="all"),
+        ModelTask("battery", "battery", period, BatteryForecaster, consume="all", offload="process"),
+        link,
+    ]
+
+
+def run_replay(speedup=None, hours=6.0, profiles_path=PROFILES_CSV, meta_path=PASS_META_CSV, capacity=16384):
+    """Replay `hours` of mission time; returns (per-consumer summary, replay stats)."""
+    schedule = load_schedule(hours * 3600, profiles_path=profiles_path)
+    link_channel = "link_profile" if "link_profile" in schedule else "link"
+    channels = {ch: CHANNELS.get(ch, PROFILE_FIELDS) for ch in schedule}
+    monitor = HealthMonitor(replay_tasks(link_channel, meta_path=meta_path), channels, capacity)
+    lag = []
+    summary = asyncio.run(monitor.run(replay(schedule, speedup, monitor, lag=lag)))
+    stats = {"records": monitor.ingested, "wall_s": monitor.elapsed,
+             "records_per_s": monitor.ingested / monitor.elapsed, "link_channel": link_channel,
+             "lag_p99_ms": pct(np.asarray(lag) * 1e3, 99), "lag_max_ms": max(lag, default=0.0) * 1e3}
+    return summary, stats
+
+
+def print_report(speedup, summary, stats):
+    label = "max" if speedup is None else f"{speedup:g}×"
+    print(f"\n🛰️ speedup {label}: {stats['records']:,} records in {stats['wall_s']:.2f} s → "
+          f"{stats['records_per_s']:,.0f} records/s sustained (link from {stats['link_channel']}), "
+          f"schedule lag p99 {stats['lag_p99_ms']:.1f} ms")
+    print(f"{'consumer':10s} {'records':>8s} {'rec/s':>9s} {'lat p50':>8s} {'lat p99':>8s} {'cpu p99':>8s} "
+          f"{'queue max':>9s} {'drop':>5s}  kept up")
+    for name, s in summary.items():
+        # Unpaced runs saturate the slowest consumer by design: only drops matter there
+        kept_up = s["dropped"] == 0 and (speedup is None or s["overruns"] == 0)
+        print(f"{name:10s} {s['records']:8d} {s['records_per_s']:9,.0f} {s['latency_p50_ms']:8.2f} "
+              f"{s['latency_p99_ms']:8.2f} {s['compute_p99_ms']:8.2f} {s['queue_depth_max']:9d} "
+              f"{s['dropped']:5d}  {'✅' if kept_up else '❌'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay generated telemetry through the onboard models")
+    parser.add_argument("--speedup", type=float, nargs="*", default=[600, 6000, 0],
+                        help="× real time; 0 = as fast as the consumers allow")
+    parser.add_argument("--hours", type=float, default=6.0, help="mission time to replay")
+    parser.add_argument("--profiles", default=PROFILES_CSV, help="timeseries_passes_profiles.csv")
+    parser.add_argument("--meta", default=PASS_META_CSV, help="timeseries_passes_meta.csv")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.profiles):
+        print(f"⚠️ {args.profiles} not found (run data_generation.py) — link records are per-pass "
+              f"meta + ts_features instead of raw SNR samples")
+    for speedup in args.speedup:
+        speedup = speedup or None
+        summary, stats = run_replay(speedup, args.hours, args.profiles, args.meta)
+        print_report(speedup, summary, stats)
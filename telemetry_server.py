@@ -0,0 +1,712 @@
+"""
+Live telemetry server for the dashboard: the onboard models' output as CubeSatTelemetry.
+
+A MissionFeed replays the generated datasets (telemetry_replay.load_schedule, looped)
+plus a synthetic FDIR sensor stream with injected faults through a HealthMonitor
+running the power, battery, FDIR cascade and link models. Every 1/rate s the
+TelemetryHub builds one CubeSatTelemetry snapshot (dashboard/src/types/index.ts) and
+encodes it once as a delta against the previous one (changed leaf paths only).
+Deltas go out in batches. Each batch is serialized and framed once and the same bytes
+are written to every client, so hundreds of WebSocket / SSE clients cost one
+json.dumps plus one socket write each. A client whose socket backs up is skipped and
+sent a full snapshot once it drains, so a slow browser never holds the others back.
+Standard library transport only (no websockets / aiohttp).
+
+    GET /ws        WebSocket (text frames; send "resync" to get a full snapshot)
+    GET /events    Server-Sent Events
+    GET /snapshot  current snapshot (JSON)
+    GET /stats     fan-out counters (JSON)
+
+    {"type": "full",  "seq": 41, "data": {...CubeSatTelemetry}}
+    {"type": "delta", "seq": 45, "frames": [{"seq": 42, "set": {"powerSystem.batteryLevel": 97.31}}, ...]}
+
+    python telemetry_server.py --port 8765 --speedup 60 --rate 4 --batch 4
+    python telemetry_server.py --benchmark 100 500      # in-process clients, delta vs full snapshots
+"""
+import os
+import json
+import time
+import base64
+import struct
+import asyncio
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+import numpy as np
+import pandas as pd
+
+from instrumentation import count, timer
+from health_monitor import CHANNELS, HealthMonitor, ModelTask, _warm, pct
+from telemetry_replay import PASS_META_CSV, PROFILE_DT, PROFILE_FIELDS, load_schedule, replay, replay_tasks
+
+FDIR_DT = 1              # s per FDIR sensor record
+FDIR_WINDOW = 10         # samples per detector window (streaming_fdir.WINDOW)
+FAULT_RATE = 0.01        # fraction of FDIR records inside an injected fault episode
+NOISE_FIGURE_DB = 2.0    # ground receiver: SNR → received power in dBm
+MAX_ANOMALIES = 10       # anomalies kept in the snapshot, newest first (as in cubesatData.ts)
+
+# FDIR fault groups (fdir_cascade.FAULT_GROUPS) → dashboard subsystem
+SUBSYSTEMS = {"gyro": "ADCS", "accelerometer": "ADCS", "magnetometer": "ADCS", "thermal": "Thermal",
+              "battery": "Power", "solar": "Power", "adc": "OBC", "pressure": "Sensors", "light": "Sensors"}
+SEVERITIES = [(0.95, "critical"), (0.85, "high"), (0.7, "medium"), (0.0, "low")]  # by detector probability
+SEVERITY_RANK = {label: i for i, (_, label) in enumerate(SEVERITIES)}
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _iso(ts):
+    """Unix time → ISO 8601 UTC string (parsed back into a Date by the dashboard)."""
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _num(x, digits=2):
+    return None if x is None or not np.isfinite(x) else round(float(x), digits)
+
+
+def dumps(message):
+    return json.dumps(message, separators=(",", ":")).encode()
+
+
+# ============================================================
+# FDIR: CASCADE CONSUMER + ANOMALY LOG
+# ============================================================
+class FaultIsolator:
+    """
+    FDIR cascade (detector → isolation → recovery) fed every sensor record in order.
+    Uses fdir_cascade's synthetic stand-in isolation model when fault_isolation_model.pkl
+    is not shipped.
+    """
+
+    def __init__(self, threshold=0.5):
+        from fdir_cascade import FDIRCascade, load_detector, load_or_train_isolation_model
+        detector, sensors = load_detector(compiled=True)
+        _warm(detector)
+        isolator, classes = load_or_train_isolation_model(detector)
+        self.engine = FDIRCascade(detector, isolator, classes, sensors, batch_size=256,
+                                  max_delay=float("inf"), threshold=threshold)
+
+    def __call__(self, timestamps, rows):
+        faults = []
+        for t, sample in zip(timestamps, rows):
+            faults += self.engine.push(sample, timestamp=t)
+        faults += self.engine.flush()
+        return {"fault_probability": float(self.engine.last_probability[0]),
+                "sample": self.engine.samples_seen - 1,
+                "faults": [(f.sample, f.probability, f.fault_class, f.action.action) for f in faults]}
+
+
+def severity(probability):
+    return next(label for threshold, label in SEVERITIES if probability >= threshold)
+
+
+class AnomalyLog:
+    """
+    FDIR reports grouped into dashboard anomalies. Flagged windows less than one window
+    apart belong to one anomaly. The anomaly counts as repaired once a full window
+    passes without a flag.
+    """
+
+    def __init__(self, window=FDIR_WINDOW, limit=MAX_ANOMALIES):
+        self.window = window
+        self.limit = limit
+        self.recent = []    # newest first
+        self.total = 0
+        self.repaired = 0
+        self.open = None    # [last flagged sample, anomaly] of the anomaly in progress
+
+    def update(self, result, now):
+        for sample, probability, fault_class, action in result["faults"]:
+            if self.open is not None and sample - self.open[0] <= self.window:
+                self.open[0] = sample
+                anomaly = self.open[1]
+                if SEVERITY_RANK[severity(probability)] < SEVERITY_RANK[anomaly["severity"]]:
+                    anomaly["severity"] = severity(probability)
+                continue
+            self._close()
+            anomaly = {"time": now, "system": SUBSYSTEMS.get(fault_class, fault_class.title()),
+                       "severity": severity(probability), "actionTaken": action.capitalize()}
+            self.recent.insert(0, anomaly)
+            del self.recent[self.limit:]
+            self.total += 1
+            self.open = [sample, anomaly]
+        if self.open is not None and result["sample"] - self.open[0] > self.window:
+            self._close()
+
+    def _close(self):
+        if self.open is not None:
+            self.repaired += 1
+            self.open = None
+
+
+# ============================================================
+# MISSION FEED (replay → HealthMonitor → CubeSatTelemetry)
+# ============================================================
+def fdir_schedule(duration, fault_rate=FAULT_RATE, seed=0):
+    """One FDIR sensor record per FDIR_DT s with injected faults (sensor_data.csv is not shipped)."""
+    from fdir_cascade import load_detector, synthetic_fault_streams
+    n = int(duration // FDIR_DT)
+    streams, _ = synthetic_fault_streams(load_detector()[0], n, 1, fault_rate, np.random.default_rng(seed))
+    return np.arange(n) * float(FDIR_DT), streams[:, 0]
+
+
+def pass_windows(schedule, link_channel):
+    """(AOS, LOS) mission times of every replayed pass."""
+    times, rows = schedule[link_channel]
+    if link_channel == "link":
+        return times - rows[:, CHANNELS["link"].index("pass_duration_s")], times
+    first = np.r_[True, (np.diff(rows[:, 0]) != 0) | (np.diff(times) > 2 * PROFILE_DT)]
+    starts = np.flatnonzero(first)
+    return times[starts], times[np.r_[starts[1:] - 1, len(times) - 1]]
+
+
+class MissionFeed:
+    """
+    The replayed mission through the onboard models, read back as CubeSatTelemetry.
+
+    Mission time runs at `speedup` × real time and the `hours`-long schedule loops.
+    Model results are drained from a HealthMonitor subscription on every snapshot, so
+    no FDIR report is missed between two snapshots.
+    """
+
+    def __init__(self, speedup=60.0, hours=24.0, period=0.25, fault_rate=FAULT_RATE, seed=0):
+        self.speedup = speedup
+        self.duration = hours * 3600
+        self.schedule = load_schedule(self.duration)
+        self.schedule["fdir"] = fdir_schedule(self.duration, fault_rate, seed)
+        self.link_channel = "link_profile" if "link_profile" in self.schedule else "link"
+        self.aos, self.los = pass_windows(self.schedule, self.link_channel)
+        self.bandwidth = pd.read_csv(PASS_META_CSV)["modem_bandwidth_hz"].to_numpy(np.float64)
+        self.channels = {ch: CHANNELS.get(ch, PROFILE_FIELDS) for ch in self.schedule}
+        tasks = replay_tasks(self.link_channel, period) + [
+            ModelTask("fdir", "fdir", period, FaultIsolator, consume="all", offload="thread")]
+        self.monitor = HealthMonitor(tasks, self.channels, capacity=16384)
+        self.results = self.monitor.subscribe()
+        self.latest = {}
+        self.anomalies = AnomalyLog()
+        self.running = False
+        self.started = time.time()
+        self.t0 = None
+        self.last_contact = None
+        self.job = None
+
+    async def _source(self):
+        self.t0 = time.perf_counter()
+        while self.running:
+            async for block in replay(self.schedule, self.speedup):
+                if not self.running:
+                    break
+                yield block
+
+    async def start(self):
+        """Start the monitor in the background; the models are loaded when this returns."""
+        self.running = True
+        self.job = asyncio.ensure_future(self.monitor.run(self._source()))
+        await asyncio.sleep(0)  # HealthMonitor.run loads every model before its first await
+        if self.job.done():
+            self.job.result()  # start-up failed: raise it here
+
+    async def stop(self):
+        self.running = False
+        if self.job is not None:
+            await self.job
+
+    @property
+    def mission_s(self):
+        return 0.0 if self.t0 is None else (time.perf_counter() - self.t0) * self.speedup
+
+    def in_contact(self, mission_s):
+        t = mission_s % self.duration
+        k = np.searchsorted(self.aos, t, side="right") - 1
+        return bool(k >= 0 and t <= self.los[k])
+
+    def _row(self, channel):
+        _, rows, _ = self.monitor.buses[channel].latest()
+        return dict(zip(self.channels[channel], rows[0])) if len(rows) else dict.fromkeys(self.channels[channel], 0.0)
+
+    def _signal_dbm(self, link):
+        """Received power of the newest link record: SNR + thermal noise floor of the modem bandwidth."""
+        if self.link_channel == "link_profile":
+            snr, bandwidth = link["snr_db"], self.bandwidth[int(link["pass_index"]) % len(self.bandwidth)]
+        else:
+            snr, bandwidth = link["snr_mean"], link["modem_bandwidth_hz"] or np.median(self.bandwidth)
+        return snr - 174.0 + 10 * np.log10(bandwidth) + NOISE_FIGURE_DB
+
+    def snapshot(self):
+        """Current CubeSatTelemetry, JSON-ready (dates as ISO 8601 strings)."""
+        now = _iso(time.time())
+        while not self.results.empty():
+            name, result = self.results.get_nowait()
+            self.latest[name] = result
+            if name == "fdir":
+                self.anomalies.update(result, now)
+
+        power, battery, fdir = self._row("power"), self._row("battery"), self._row("fdir")
+        link = self._row(self.link_channel)
+        mission_s = self.mission_s
+        contact = self.in_contact(mission_s)
+        if contact:
+            self.last_contact = now
+
+        solar = power["P_panel_pred"]
+        load = power["P_payload_pred"] + power["P_base_pred"]
+        balance = solar - load
+        fault_p = self.latest.get("fdir", {}).get("fault_probability", np.nan)
+        ai_status = "idle" if "fdir" not in self.latest else "repairing" if self.anomalies.open else "monitoring"
+        p = self.latest.get("power", {})
+        b = self.latest.get("battery", {})
+        k = self.latest.get("link", {})
+        return {
+            "powerSystem": {
+                "batteryLevel": _num(100 * power["SoC"]),
+                "solarPanelOutput": _num(solar),
+                "powerConsumption": _num(load),
+                "chargingStatus": "charging" if balance > 1 else "discharging" if balance < -1 else "idle",
+            },
+            "thermalSystem": {
+                "cpuTemp": _num(fdir["Temp_cpu"], 1),
+                "batteryTemp": _num(battery["temperature"], 1),
+                "internalTemp": _num(fdir["Temp_BMP"], 1),
+            },
+            "communicationSystem": {
+                "signalStrength": _num(self._signal_dbm(link), 1),
+                "uplinkStatus": "connected" if contact else "lost",
+                "downlinkStatus": "connected" if contact else "lost",
+                "lastContact": self.last_contact or _iso(self.started),
+            },
+            "aiRepairModule": {
+                "anomaliesDetected": [dict(a) for a in self.anomalies.recent],
+                "aiStatus": ai_status,
+                "confidenceScore": _num(max(fault_p, 1 - fault_p), 3),
+            },
+            "missionSummary": {
+                "missionTime": _num(mission_s / 3600, 3),
+                "totalAnomalies": self.anomalies.total,
+                "repairedAnomalies": self.anomalies.repaired,
+            },
+            "predictions": {
+                "powerNext720s": _num(p.get("P_future_720s")),
+                "battery": {"temperatureNext": _num(b.get("temperature_next")),
+                            "voltageNext": _num(b.get("voltage_next"), 3),
+                            "currentNext": _num(b.get("current_next"), 3)},
+                "faultProbability": _num(fault_p, 3),
+                "link": {"canSendAll": k.get("can_send_all"), "compressionRatio": _num(k.get("compression_ratio"), 3)},
+            },
+            "lastUpdated": now,
+        }
+
+
+# ============================================================
+# DELTA ENCODING
+# ============================================================
+def flatten(tree, prefix="", out=None):
+    """Leaf paths of a snapshot ("powerSystem.batteryLevel" → value); lists are leaves."""
+    out = {} if out is None else out
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            flatten(value, prefix + key + ".", out)
+        else:
+            out[prefix + key] = value
+    return out
+
+
+def apply_delta(tree, changes):
+    """Client side of DeltaEncoder: write every changed leaf path into `tree` (in place)."""
+    for path, value in changes.items():
+        *parents, leaf = path.split(".")
+        node = tree
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = value
+    return tree
+
+
+_MISSING = object()
+
+
+class DeltaEncoder:
+    """Snapshots → sequence-numbered frames carrying only the leaves that changed."""
+
+    def __init__(self):
+        self.seq = 0
+        self.leaves = {}
+        self.snapshot = None
+
+    def encode(self, snapshot):
+        leaves = flatten(snapshot)
+        changed = {k: v for k, v in leaves.items() if self.leaves.get(k, _MISSING) != v}
+        self.seq += 1
+        self.leaves, self.snapshot = leaves, snapshot
+        return {"seq": self.seq, "set": changed}
+
+
+# ============================================================
+# TRANSPORT (RFC 6455 WebSocket frames, SSE, plain HTTP)
+# ============================================================
+def ws_frame(payload, opcode=0x1):
+    """Unmasked server → client WebSocket frame (FIN set)."""
+    n = len(payload)
+    if n < 126:
+        head = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return head + payload
+
+
+async def read_ws_frame(reader, max_size=1 << 16):
+    """Next WebSocket frame as (opcode, unmasked payload)."""
+    b1, b2 = await reader.readexactly(2)
+    n = b2 & 0x7F
+    if n == 126:
+        n, = struct.unpack("!H", await reader.readexactly(2))
+    elif n == 127:
+        n, = struct.unpack("!Q", await reader.readexactly(8))
+    if n > max_size:
+        raise ConnectionError(f"WebSocket frame of {n} bytes")
+    mask = await reader.readexactly(4) if b2 & 0x80 else None
+    data = await reader.readexactly(n)
+    if mask is not None:
+        data = bytes(c ^ mask[i & 3] for i, c in enumerate(data))
+    return b1 & 0x0F, data
+
+
+def sse_event(payload):
+    return b"data: " + payload + b"\n\n"
+
+
+FRAMING = {"ws": ws_frame, "sse": sse_event}
+
+
+def parse_request(head):
+    """(method, target, lower-cased headers) of an HTTP/1.1 request head."""
+    request_line, *lines = head.decode("latin-1").split("\r\n")
+    method, target, _ = request_line.split(" ", 2)
+    headers = {}
+    for line in lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+async def respond(writer, status, body=b"", content_type="application/json"):
+    writer.write((f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                  "Access-Control-Allow-Origin: *\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n").encode()
+                 + body)
+    await writer.drain()
+
+
+# ============================================================
+# FAN-OUT HUB
+# ============================================================
+class _Client:
+    __slots__ = ("writer", "kind", "stale_since")
+
+    def __init__(self, writer, kind):
+        self.writer = writer
+        self.kind = kind
+        self.stale_since = None
+
+
+class TelemetryHub:
+    """
+    Builds a snapshot every 1/rate_hz s and sends batches of `batch` delta frames
+    (delta=False: one full snapshot per tick, for comparison) to every client.
+
+    A client with more than `high_water` bytes queued on its socket is skipped. Once
+    the queue is below high_water / 4 it gets a full snapshot and then deltas again.
+    A client stuck for `stale_timeout` s is disconnected.
+    """
+
+    def __init__(self, snapshot, rate_hz=4.0, batch=4, delta=True, high_water=256 * 1024, stale_timeout=30.0):
+        self.snapshot = snapshot
+        self.rate_hz = rate_hz
+        self.batch = batch if delta else 1
+        self.delta = delta
+        self.high_water = high_water
+        self.stale_timeout = stale_timeout
+        self.encoder = DeltaEncoder()
+        self.pending = []
+        self.clients = set()
+        self.sent = (0, None)         # (seq, snapshot) of the last broadcast
+        self._full = (0, {})          # (seq, {kind: framed full message})
+        self.broadcast_times = []
+        self.stats = {"ticks": 0, "broadcasts": 0, "messages": 0, "bytes": 0, "skipped": 0, "resyncs": 0,
+                      "disconnected": 0, "connections": 0}
+
+    def _full_message(self, kind):
+        seq, framed = self._full
+        if seq != self.encoder.seq:
+            seq, framed = self.encoder.seq, {}
+            self._full = (seq, framed)
+        if kind not in framed:
+            payload = dumps({"type": "full", "seq": seq, "data": self.encoder.snapshot})
+            framed[kind] = FRAMING[kind](payload)
+        return framed[kind]
+
+    def tick(self):
+        frame = self.encoder.encode(self.snapshot())
+        self.stats["ticks"] += 1
+        if not self.delta:
+            self.broadcast(None)
+            return
+        self.pending.append(frame)
+        if len(self.pending) >= self.batch:
+            self.broadcast(dumps({"type": "delta", "seq": frame["seq"], "frames": self.pending}))
+            self.pending = []
+
+    def broadcast(self, payload):
+        """Write one message to every client (payload=None: the full snapshot)."""
+        t0 = time.perf_counter()
+        framed = {}
+        n_messages = n_bytes = 0
+        now = time.monotonic()
+        for client in list(self.clients):
+            transport = client.writer.transport
+            if transport.is_closing():
+                self.clients.discard(client)
+                continue
+            queued = transport.get_write_buffer_size()
+            if client.stale_since is not None:
+                if queued > self.high_water // 4:
+                    self.stats["skipped"] += 1
+                    if now - client.stale_since > self.stale_timeout:
+                        self.stats["disconnected"] += 1
+                        self.clients.discard(client)
+                        transport.abort()
+                    continue
+                client.stale_since = None
+                self.stats["resyncs"] += 1
+                data = self._full_message(client.kind)
+            elif queued > self.high_water:
+                client.stale_since = now
+                self.stats["skipped"] += 1
+                continue
+            elif payload is None:
+                data = self._full_message(client.kind)
+            else:
+                data = framed.get(client.kind)
+                if data is None:
+                    data = framed[client.kind] = FRAMING[client.kind](payload)
+            client.writer.write(data)
+            n_messages += 1
+            n_bytes += len(data)
+        self.sent = (self.encoder.seq, self.encoder.snapshot)
+        self.stats["broadcasts"] += 1
+        self.stats["messages"] += n_messages
+        self.stats["bytes"] += n_bytes
+        count("stream.messages", n_messages)
+        count("stream.bytes_out", n_bytes)
+        self.broadcast_times.append(time.perf_counter() - t0)
+
+    async def run(self, stop=None):
+        """Tick at rate_hz until `stop` (asyncio.Event) is set."""
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.rate_hz
+        next_tick = loop.time()
+        while stop is None or not stop.is_set():
+            with timer("stream.tick"):
+                self.tick()
+            next_tick = max(next_tick + period, loop.time())
+            await asyncio.sleep(next_tick - loop.time())
+
+    # --- connections -------------------------------------------------------
+    def _join(self, writer, kind):
+        client = _Client(writer, kind)
+        if self.encoder.snapshot is not None:
+            writer.write(self._full_message(kind))
+        self.clients.add(client)
+        self.stats["connections"] += 1
+        return client
+
+    async def handle(self, reader, writer):
+        """One HTTP connection: WebSocket upgrade, SSE stream or a one-shot JSON response."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10.0)
+            method, target, headers = parse_request(head)
+            path = urlsplit(target).path
+            if method != "GET":
+                await respond(writer, "405 Method Not Allowed")
+            elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._websocket(reader, writer, headers)
+            elif path == "/events":
+                await self._sse(reader, writer)
+            elif path == "/snapshot" and self.encoder.snapshot is not None:
+                await respond(writer, "200 OK", dumps(self.encoder.snapshot))
+            elif path == "/stats":
+                await respond(writer, "200 OK", dumps({**self.stats, "clients": len(self.clients)}))
+            else:
+                await respond(writer, "404 Not Found")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError,
+                ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            await respond(writer, "400 Bad Request")
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        client = self._join(writer, "ws")
+        try:
+            while True:
+                opcode, data = await read_ws_frame(reader)
+                if opcode == 0x8:      # close: echo the status code back
+                    writer.write(ws_frame(data[:2], 0x8))
+                    break
+                if opcode == 0x9:      # ping
+                    writer.write(ws_frame(data, 0xA))
+                elif opcode == 0x1 and data.strip() == b"resync":
+                    client.stale_since = time.monotonic()
+        finally:
+            self.clients.discard(client)
+
+    async def _sse(self, reader, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: keep-alive\r\nAccess-Control-Allow-Origin: *\r\n\r\nretry: 2000\n\n")
+        client = self._join(writer, "sse")
+        try:
+            while await reader.read(1024):  # nothing expected from the browser; EOF = it went away
+                pass
+        finally:
+            self.clients.discard(client)
+
+
+async def serve(feed, hub, host="127.0.0.1", port=8765):
+    await feed.start()
+    server = await asyncio.start_server(hub.handle, host, port, backlog=1024)
+    print(f"📡 Telemetry on ws://{host}:{port}/ws and http://{host}:{port}/events "
+          f"({hub.rate_hz:g} Hz, {'batches of ' + str(hub.batch) + ' deltas' if hub.delta else 'full snapshots'}, "
+          f"mission at {feed.speedup:g}× real time)")
+    async with server:
+        await hub.run()
+
+
+# ============================================================
+# FAN-OUT BENCHMARK (in-process clients)
+# ============================================================
+async def bench_client(port, kind, state):
+    """Follow the stream like the dashboard does: full snapshot, then deltas applied in order."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 22)
+    if kind == "ws":
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write(f"GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode())
+    else:
+        writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+    await reader.readuntil(b"\r\n\r\n")
+    try:
+        while True:
+            if kind == "ws":
+                _, payload = await read_ws_frame(reader, max_size=1 << 22)
+                state["bytes"] += len(payload) + 2
+            else:
+                event = await reader.readuntil(b"\n\n")
+                state["bytes"] += len(event)
+                if not event.startswith(b"data: "):
+                    continue
+                payload = event[6:-2]
+            message = json.loads(payload)
+            if message["type"] == "full":
+                state["data"], state["seq"] = message["data"], message["seq"]
+                continue
+            for frame in message["frames"]:
+                if frame["seq"] <= state["seq"]:
+                    continue
+                if frame["seq"] != state["seq"] + 1:
+                    state["gaps"] += 1
+                apply_delta(state["data"], frame["set"])
+                state["seq"] = frame["seq"]
+    finally:
+        writer.close()
+
+
+async def bench_fanout(feed, n_clients, delta, rate_hz, batch, duration, port):
+    hub = TelemetryHub(feed.snapshot, rate_hz, batch, delta)
+    server = await asyncio.start_server(hub.handle, "127.0.0.1", port, backlog=4096)
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(hub.run(stop))
+    await asyncio.sleep(2 * batch / rate_hz)  # clients join a running stream
+    states = [{"bytes": 0, "seq": 0, "data": None, "gaps": 0} for _ in range(n_clients)]
+    clients = [asyncio.create_task(bench_client(port, "ws" if i % 2 == 0 else "sse", s))
+               for i, s in enumerate(states)]
+    await asyncio.sleep(1.0)
+    bytes0, messages0 = sum(s["bytes"] for s in states), hub.stats["messages"]
+    hub.broadcast_times.clear()
+    t0 = time.perf_counter()
+    await asyncio.sleep(duration)
+    received = sum(s["bytes"] for s in states) - bytes0
+    messages = hub.stats["messages"] - messages0
+    elapsed = time.perf_counter() - t0
+    bt = np.asarray(hub.broadcast_times) * 1e3
+    stop.set()
+    await ticker
+    await asyncio.sleep(0.5)  # last broadcast reaches every client
+    for task in clients:
+        task.cancel()
+    await asyncio.gather(*clients, return_exceptions=True)
+    server.close()
+    await server.wait_closed()
+
+    seq, snapshot = hub.sent
+    expected = json.loads(dumps(snapshot))
+    in_sync = sum(s["seq"] == seq and s["data"] == expected for s in states)
+    return {"clients": n_clients, "mode": f"delta ×{batch}" if delta else "full",
+            "bytes_per_client_s": received / n_clients / elapsed,
+            "messages_per_client_s": messages / n_clients / elapsed,
+            "broadcast_p50_ms": pct(bt, 50), "fanout_ms_per_s": bt.sum() / elapsed,
+            "skipped": hub.stats["skipped"], "resyncs": hub.stats["resyncs"],
+            "gaps": sum(s["gaps"] for s in states), "in_sync": in_sync}
+
+
+async def run_benchmark(args):
+    feed = MissionFeed(args.speedup, args.hours)
+    await feed.start()
+    rows = []
+    try:
+        for n_clients in args.benchmark:
+            for delta in (False, True):
+                rows.append(await bench_fanout(feed, n_clients, delta, args.rate, args.batch, args.duration,
+                                               args.port))
+                r = rows[-1]
+                print(f"{r['clients']:7d} {r['mode']:>9s} {r['bytes_per_client_s']:10,.0f} "
+                      f"{r['messages_per_client_s']:8.2f} {r['broadcast_p50_ms']:8.2f} {r['fanout_ms_per_s']:9.1f} "
+                      f"{r['skipped']:6d} {r['resyncs']:6d} {r['gaps']:5d}  {r['in_sync']}/{r['clients']}",
+                      flush=True)
+    finally:
+        await feed.stop()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream live telemetry and model predictions to the dashboard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speedup", type=float, default=60.0, help="mission time × real time")
+    parser.add_argument("--hours", type=float, default=24.0, help="mission time replayed before looping")
+    parser.add_argument("--rate", type=float, default=4.0, help="snapshots per second")
+    parser.add_argument("--batch", type=int, default=4, help="delta frames per message")
+    parser.add_argument("--full", action="store_true", help="send a full snapshot every tick instead of deltas")
+    parser.add_argument("--benchmark", type=int, nargs="+", metavar="CLIENTS",
+                        help="measure fan-out with this many in-process clients (half WebSocket, half SSE)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured per benchmark run")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"🛰️ {args.rate:g} Hz snapshots, mission at {args.speedup:g}×, {args.duration:g} s per run")
+        print(f"{'clients':>7s} {'mode':>9s} {'B/client/s':>10s} {'msg/s':>8s} {'bc p50':>8s} {'fan-out':>9s} "
+              f"{'skip':>6s} {'resync':>6s} {'gaps':>5s}  in sync")
+        asyncio.run(run_benchmark(args))
+    else:
+        feed = MissionFeed(args.speedup, args.hours)
+        hub = TelemetryHub(feed.snapshot, args.rate, args.batch, delta=not args.full)
+        try:
+            asyncio.run(serve(feed, hub, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,384 @@
+"""
+Framework-free inference for the project's gradient-boosted tree models.
+
+Each XGBoost / LightGBM ensemble is flattened into a handful of NumPy arrays (one
+row per node, trees stored back to back) and saved as `<model>.trees.npz` next to
+its pickle. Prediction then needs NumPy only:
+
+    from tree_inference import load_ensemble
+    model = load_ensemble("power/xgboost_power_predictor_optimized.trees.npz")
+    y = model.predict(X)              # ndarray or DataFrame (columns reordered by name)
+
+`python tree_inference.py` converts every shipped model, checks parity against the
+original framework and reports cold-start time and per-row latency.
+"""
+import os
+import json
+import time
+import importlib.util
+import numpy as np
+import instrumentation
+
+# numba is imported lazily (only when the JIT kernel is requested) to keep cold start short
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SHIPPED_MODELS = [
+    os.path.join(BASE_DIR, "Data compressing", "xgboost_can_send_all_model.pkl"),
+    os.path.join(BASE_DIR, "Data compressing", "xgboost_recommended_compression_ratio_model.pkl"),
+    os.path.join(BASE_DIR, "power", "xgboost_power_predictor_optimized.pkl"),
+    os.path.join(BASE_DIR, "FDIR_VF", "anomaly_detection", "lgb_anomaly_model.pkl"),
+]
+
+# ============================================================
+# FLAT ENSEMBLE
+# ============================================================
+class TreeEnsemble:
+    """
+    Sum-of-trees model stored as flat node arrays.
+
+    Nodes are numbered breadth-first within each tree, so the children of node i are
+    left[i] and left[i] + 1. A split goes left when `x < threshold` (XGBoost) or
+    `x <= threshold` (LightGBM); NaN, and 0 on zero-as-missing splits, follow
+    default_left. Leaves point to themselves and carry value[i], so all trees can be
+    walked together for `max_depth` steps without branching.
+    """
+
+    CHUNK_ROWS = 256  # NumPy path: (rows × trees) work arrays stay cache-sized
+    ARRAYS = ["feature", "threshold", "left", "value", "default_left", "zero_missing", "roots"]
+
+    def __init__(self, feature, threshold, left, value, default_left, zero_missing, roots,
+                 max_depth, base_score, less_equal, transform="identity", feature_names=None,
+                 dtype="float64", use_numba=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=dtype)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.zero_missing = np.asarray(zero_missing, dtype=bool)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.base_score = float(base_score)
+        self.less_equal = bool(less_equal)
+        self.transform = str(transform)
+        self.feature_names = None if feature_names is None else [str(f) for f in feature_names]
+        self.dtype = np.dtype(dtype)
+        self.n_features = int(self.feature.max()) + 1 if feature_names is None else len(self.feature_names)
+        self.has_zero_missing = bool(self.zero_missing.any())
+        self.name = "tree_ensemble"  # metrics label; load_ensemble uses the file name
+
+        if use_numba is None:
+            use_numba = HAS_NUMBA
+        if use_numba and not HAS_NUMBA:
+            raise ImportError("use_numba=True requires numba (pip install numba)")
+        self._kernel = _get_numba_kernel() if use_numba else None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _prepare(self, X):
+        if hasattr(X, "columns") and self.feature_names is not None:
+            # Reorder by name like the source model; a missing column is an error, not a 0
+            missing = [f for f in self.feature_names if f not in X.columns]
+            if missing:
+                raise ValueError(f"{self.name}: input is missing feature columns {missing}")
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=self.dtype)
+        return X[None, :] if X.ndim == 1 else X
+
+    def raw_predict(self, X):
+        """Sum of leaf values + base score (margin), one value per row."""
+        X = self._prepare(X)
+        if self._kernel is not None:
+            return self._kernel(np.ascontiguousarray(X), self.feature, self.threshold, self.left, self.value,
+                                self.default_left, self.zero_missing, self.roots, self.less_equal,
+                                self.base_score)
+
+        if len(X) > self.CHUNK_ROWS:
+            return np.concatenate([self.raw_predict(X[i:i + self.CHUNK_ROWS])
+                                   for i in range(0, len(X), self.CHUNK_ROWS)])
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            t = self.threshold[node]
+            go_left = (x <= t) if self.less_equal else (x < t)
+            missing = np.isnan(x)
+            if self.has_zero_missing:
+                missing |= self.zero_missing[node] & (x == 0)
+            go_left = np.where(missing, self.default_left[node], go_left)
+            child = self.left[node]
+            # Leaves point to themselves: stay put instead of stepping to a child
+            node = np.where(child == node, node, child + ~go_left)
+        return self.value[node].sum(axis=1) + self.base_score
+
+    def predict(self, X):
+        if instrumentation.ENABLED:  # inline flag test: this is the per-row hot path
+            with instrumentation.timer("inference", model=self.name):
+                return self._predict(X)
+        return self._predict(X)
+
+    def _predict(self, X):
+        margin = self.raw_predict(X)
+        if self.transform == "sigmoid":
+            return 1.0 / (1.0 + np.exp(-margin))
+        return margin
+
+    def save(self, path):
+        meta = {"max_depth": self.max_depth, "base_score": self.base_score, "less_equal": self.less_equal,
+                "transform": self.transform, "feature_names": self.feature_names, "dtype": self.dtype.name}
+        np.savez(path, meta=np.array(json.dumps(meta)), **{k: getattr(self, k) for k in self.ARRAYS})
+        return path
+
+
+def load_ensemble(path, use_numba=None):
+    """Load a TreeEnsemble written by TreeEnsemble.save (NumPy only)."""
+    with np.load(path) as f:
+        meta = json.loads(str(f["meta"]))
+        arrays = {k: f[k] for k in TreeEnsemble.ARRAYS}
+    ensemble = TreeEnsemble(**arrays, **meta, use_numba=use_numba)
+    ensemble.name = os.path.basename(path).split(".")[0]
+    return ensemble
+
+
+# ============================================================
+# OPTIONAL NUMBA KERNEL (early exit at leaves)
+# ============================================================
+def _build_numba_kernel():
+    import numba
+
+    @numba.njit(cache=True)
+    def walk(X, feature, threshold, left, value, default_left, zero_missing, roots, less_equal, base_score):
+        n_rows = X.shape[0]
+        out = np.full(n_rows, base_score)
+        # Blocks of rows × tree-outer loop: each tree's nodes and the block's rows stay in cache
+        for start in range(0, n_rows, 64):
+            stop = min(start + 64, n_rows)
+            for root in roots:
+                for r in range(start, stop):
+                    node = root
+                    child = left[node]
+                    while child != node:
+                        x = X[r, feature[node]]
+                        if np.isnan(x) or (x == 0.0 and zero_missing[node]):
+                            go_left = default_left[node]
+                        elif less_equal:
+                            go_left = x <= threshold[node]
+                        else:
+                            go_left = x < threshold[node]
+                        node = child + (not go_left)
+                        child = left[node]
+                    out[r] += value[node]
+        return out
+
+    return walk
+
+
+_numba_walk = None
+
+
+def _get_numba_kernel():
+    global _numba_walk
+    if _numba_walk is None:
+        _numba_walk = _build_numba_kernel()
+    return _numba_walk
+
+
+# ============================================================
+# CONVERTERS
+# ============================================================
+def _flatten(trees, threshold_dtype, **kwargs):
+    """
+    Concatenate trees given as per-node lists (children = -1 at leaves) into a
+    TreeEnsemble, renumbering each tree breadth-first so siblings are adjacent.
+    """
+    cols = {k: [] for k in ("feature", "threshold", "left", "value", "default_left", "zero_missing")}
+    roots, max_depth = [], 0
+    for tree in trees:
+        offset = len(cols["feature"])
+        roots.append(offset)
+        order, depth = [0], {0: 0}
+        for old in order:  # BFS; `order` grows while iterating
+            if tree["left"][old] != -1:
+                for c in (tree["left"][old], tree["right"][old]):
+                    depth[c] = depth[old] + 1
+                    order.append(c)
+        new_id = {old: offset + i for i, old in enumerate(order)}
+        for old in order:
+            leaf = tree["left"][old] == -1
+            cols["feature"].append(0 if leaf else tree["feature"][old])
+            cols["threshold"].append(0.0 if leaf else tree["threshold"][old])
+            cols["left"].append(new_id[old] if leaf else new_id[tree["left"][old]])
+            cols["value"].append(tree["value"][old] if leaf else 0.0)
+            cols["default_left"].append(bool(tree["default_left"][old]))
+            cols["zero_missing"].append(bool(tree["zero_missing"][old]))
+            if not leaf:
+                assert new_id[tree["right"][old]] == new_id[tree["left"][old]] + 1
+        max_depth = max(max_depth, max(depth.values()))
+    cols["threshold"] = np.asarray(cols["threshold"], dtype=threshold_dtype)
+    return TreeEnsemble(**cols, roots=roots, max_depth=max_depth, dtype=threshold_dtype, **kwargs)
+
+
+def from_xgboost(model):
+    """Flatten an XGBRegressor / Booster (gbtree, single output) from its JSON model."""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    gbtree = learner["gradient_booster"]
+    if gbtree["name"] != "gbtree":
+        raise ValueError(f"Unsupported booster: {gbtree['name']}")
+    trees = gbtree["model"]["trees"]
+    best = getattr(model, "best_iteration", None)
+    if best is not None:
+        trees = trees[:best + 1]  # sklearn predict() stops at the best iteration
+
+    flat = []
+    for tree in trees:
+        if any(tree["split_type"]):
+            raise ValueError("Categorical splits are not supported")
+        n = len(tree["left_children"])
+        flat.append({
+            "feature": tree["split_indices"], "threshold": tree["split_conditions"],
+            "left": tree["left_children"], "right": tree["right_children"],
+            "value": tree["split_conditions"],  # a leaf's value is stored in split_conditions
+            "default_left": tree["default_left"], "zero_missing": [False] * n,
+        })
+
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+    objective = learner["objective"]["name"]
+    if objective.startswith("binary:logistic"):
+        transform, base_score = "sigmoid", float(np.log(base_score / (1 - base_score)))
+    elif objective.startswith("reg:squarederror") or objective.startswith("reg:absoluteerror"):
+        transform = "identity"
+    else:
+        raise ValueError(f"Unsupported objective: {objective}")
+
+    # XGBoost compares float32 inputs against float32 thresholds
+    return _flatten(flat, "float32", base_score=base_score, less_equal=False, transform=transform,
+                    feature_names=booster.feature_names)
+
+
+def from_lightgbm(model):
+    """Flatten an LGBMClassifier/Regressor or Booster (numerical splits) from dump_model()."""
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    dump = booster.dump_model()
+    if dump["num_tree_per_iteration"] != 1:
+        raise ValueError("Multiclass LightGBM models are not supported")
+
+    flat = []
+    for info in dump["tree_info"]:
+        tree = {k: [] for k in ("feature", "threshold", "left", "right", "value", "default_left", "zero_missing")}
+
+        def add(node):
+            i = len(tree["feature"])
+            for k in tree:
+                tree[k].append(0)
+            if "leaf_value" in node:
+                tree["left"][i] = tree["right"][i] = -1
+                tree["value"][i] = node["leaf_value"]
+                return i
+            if node["decision_type"] != "<=":
+                raise ValueError(f"Unsupported decision type: {node['decision_type']}")
+            tree["feature"][i] = node["split_feature"]
+            tree["threshold"][i] = node["threshold"]
+            if node["missing_type"] == "None":
+                # No missing branch: LightGBM treats NaN as 0
+                tree["default_left"][i] = 0.0 <= node["threshold"]
+            else:
+                tree["default_left"][i] = node["default_left"]
+                tree["zero_missing"][i] = node["missing_type"] == "Zero"
+            tree["left"][i] = add(node["left_child"])
+            tree["right"][i] = add(node["right_child"])
+            return i
+
+        add(info["tree_structure"])
+        flat.append(tree)
+
+    objective = dump["objective"].split()[0]
+    if objective == "binary":
+        transform = "sigmoid"
+    elif objective in ("regression", "regression_l1", "huber"):
+        transform = "identity"
+    else:
+        raise ValueError(f"Unsupported objective: {dump['objective']}")
+    return _flatten(flat, "float64", base_score=0.0, less_equal=True, transform=transform,
+                    feature_names=dump["feature_names"])
+
+
+def convert(model):
+    """Dispatch on the model type (plain or wrapped in a {'model': ...} dict as in FDIR)."""
+    if isinstance(model, dict):
+        model = model["model"]
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        return from_xgboost(model)
+    if module.startswith("lightgbm"):
+        return from_lightgbm(model)
+    raise TypeError(f"Unsupported model type: {type(model)}")
+
+
+def compiled_path(pickle_path):
+    return os.path.splitext(pickle_path)[0] + ".trees.npz"
+
+
+# ============================================================
+# CONVERT + PARITY + TIMING FOR EVERY SHIPPED MODEL
+# ============================================================
+def _cold_start_ms(code):
+    import subprocess
+    import sys
+    cmd = f"import time; t0 = time.perf_counter(); {code}; print((time.perf_counter() - t0) * 1e3)"
+    return float(subprocess.check_output([sys.executable, "-W", "ignore", "-c", cmd], cwd=BASE_DIR, text=True))
+
+
+if __name__ == "__main__":
+    import warnings
+    import joblib
+    warnings.filterwarnings("ignore")
+
+    rng = np.random.default_rng(0)
+    for path in SHIPPED_MODELS:
+        original = joblib.load(path)
+        estimator = original["model"] if isinstance(original, dict) else original
+        flat = convert(original)
+        out = flat.save(compiled_path(path))
+        name = os.path.relpath(path, BASE_DIR)
+        print(f"\n🌲 {name}: {flat.n_trees} trees, {len(flat.feature)} nodes, depth {flat.max_depth} → {os.path.relpath(out, BASE_DIR)}")
+
+        # Rows spanning the split thresholds of every feature, with some missing values
+        n_rows = 5000
+        X = np.zeros((n_rows, flat.n_features))
+        for j in range(flat.n_features):
+            t = flat.threshold[(flat.feature == j) & (flat.left != np.arange(len(flat.left)))].astype(np.float64)
+            X[:, j] = rng.choice(t, n_rows) + rng.normal(0, 1e-3, n_rows) if len(t) else rng.normal(size=n_rows)
+        X[rng.random(X.shape) < 0.01] = np.nan
+
+        if hasattr(estimator, "predict_proba"):
+            ref = estimator.predict_proba(X)[:, 1]
+        else:
+            ref = estimator.predict(X)
+        for label, engine in [("NumPy", load_ensemble(out, use_numba=False))] + \
+                             ([("Numba", load_ensemble(out, use_numba=True))] if HAS_NUMBA else []):
+            pred = engine.predict(X)
+            diff = np.abs(pred - ref).max()
+            engine.predict(X[:1])  # JIT warm-up
+            t0 = time.perf_counter()
+            for i in range(200):
+                engine.predict(X[i])
+            single = (time.perf_counter() - t0) / 200 * 1e6
+            t0 = time.perf_counter()
+            engine.predict(X)
+            batch = (time.perf_counter() - t0) / n_rows * 1e6
+            print(f"   {label:5s} max |Δ| = {diff:.1e} | 1 row {single:8.1f} µs | batch {batch:6.2f} µs/row")
+            # XGBoost sums leaves in float32: compare relative to the output scale
+            assert diff <= 1e-5 * max(1.0, np.abs(ref).max())
+
+        t0 = time.perf_counter()
+        for i in range(200):
+            (estimator.predict_proba if hasattr(estimator, "predict_proba") else estimator.predict)(X[i:i + 1])
+        print(f"   {'orig':5s}                  | 1 row {(time.perf_counter() - t0) / 200 * 1e6:8.1f} µs")
+
+        rel = os.path.relpath(path, BASE_DIR)
+        cold_orig = _cold_start_ms(f"import joblib; joblib.load({rel!r})")
+        cold_flat = _cold_start_ms(f"import tree_inference; tree_inference.load_ensemble({os.path.relpath(out, BASE_DIR)!r}, use_numba=False)")
+        print(f"   cold start: joblib.load {cold_orig:.0f} ms | load_ensemble {cold_flat:.0f} ms")